@@ -0,0 +1,117 @@
+# Generated by Django 4.2 on 2026-10-19 17:34
+
+from django.db import migrations, models
+import garpix_user.utils.current_date
+from garpix_user.utils.confirmation_migration import get_challenge_lifetime, make_link_hash
+
+
+def copy_pending_challenges(apps, schema_editor):
+    UserSession = apps.get_model('garpix_user', 'UserSession')
+    ConfirmationChallenge = apps.get_model('garpix_user', 'ConfirmationChallenge')
+
+    challenges = []
+    pending = UserSession.objects.filter(
+        models.Q(email_confirmation_code__isnull=False) | models.Q(phone_confirmation_code__isnull=False) | models.Q(
+            restore_password_confirm_code__isnull=False))
+    for user_session in pending.iterator(chunk_size=2000):
+        if user_session.email_confirmation_code and user_session.email_code_send_date:
+            challenges.append(ConfirmationChallenge(
+                subject_type='user_session', subject_id=user_session.pk, channel='email',
+                code=user_session.email_confirmation_code,
+                target=user_session.new_email or user_session.email or '',
+                link_hash=make_link_hash(user_session.email, user_session.email_confirmation_code),
+                sent_at=user_session.email_code_send_date,
+                expires_at=user_session.email_code_send_date + get_challenge_lifetime('email')
+            ))
+        if user_session.phone_confirmation_code and user_session.phone_code_send_date:
+            challenges.append(ConfirmationChallenge(
+                subject_type='user_session', subject_id=user_session.pk, channel='phone',
+                code=user_session.phone_confirmation_code,
+                target=str(user_session.new_phone or user_session.phone or ''),
+                sent_at=user_session.phone_code_send_date,
+                expires_at=user_session.phone_code_send_date + get_challenge_lifetime('phone')
+            ))
+        if user_session.restore_password_confirm_code and user_session.restore_date:
+            challenges.append(ConfirmationChallenge(
+                subject_type='user_session', subject_id=user_session.pk, channel='restore_password',
+                code=user_session.restore_password_confirm_code,
+                target=str(getattr(user_session, user_session.restore_by) or ''),
+                is_confirmed=user_session.is_restore_code_confirmed,
+                sent_at=user_session.restore_date,
+                expires_at=user_session.restore_date + get_challenge_lifetime(user_session.restore_by)
+            ))
+        if len(challenges) >= 2000:
+            ConfirmationChallenge.objects.bulk_create(challenges)
+            challenges = []
+    ConfirmationChallenge.objects.bulk_create(challenges)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('garpix_user', '0021_alter_accesstoken_options_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ConfirmationChallenge',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('subject_type', models.CharField(choices=[('user', 'User'), ('user_session', 'User session')], max_length=12, verbose_name='Subject type')),
+                ('subject_id', models.PositiveBigIntegerField(verbose_name='Subject id')),
+                ('channel', models.CharField(choices=[('email', 'Email'), ('phone', 'Phone number'), ('restore_password', 'Restore password')], max_length=16, verbose_name='Channel')),
+                ('code', models.CharField(max_length=255, verbose_name='Code')),
+                ('target', models.CharField(blank=True, default='', max_length=254, verbose_name='Code was sent to')),
+                ('link_hash', models.CharField(blank=True, db_index=True, max_length=128, null=True, verbose_name='Confirmation link hash')),
+                ('is_confirmed', models.BooleanField(default=False, verbose_name='Code confirmed')),
+                ('sent_at', models.DateTimeField(default=garpix_user.utils.current_date.set_current_date, verbose_name='Code sent date')),
+                ('expires_at', models.DateTimeField(db_index=True, verbose_name='Expires at')),
+            ],
+            options={
+                'verbose_name': 'Код подтверждения | Confirmation challenge',
+                'verbose_name_plural': 'Коды подтверждения | Confirmation challenges',
+                'unique_together': {('subject_type', 'subject_id', 'channel')},
+            },
+        ),
+        migrations.RunPython(copy_pending_challenges, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='usersession',
+            name='email_code_send_date',
+        ),
+        migrations.RemoveField(
+            model_name='usersession',
+            name='email_confirmation_code',
+        ),
+        migrations.RemoveField(
+            model_name='usersession',
+            name='is_restore_code_confirmed',
+        ),
+        migrations.RemoveField(
+            model_name='usersession',
+            name='new_email',
+        ),
+        migrations.RemoveField(
+            model_name='usersession',
+            name='new_phone',
+        ),
+        migrations.RemoveField(
+            model_name='usersession',
+            name='phone_code_send_date',
+        ),
+        migrations.RemoveField(
+            model_name='usersession',
+            name='phone_confirmation_code',
+        ),
+        migrations.RemoveField(
+            model_name='usersession',
+            name='restore_by',
+        ),
+        migrations.RemoveField(
+            model_name='usersession',
+            name='restore_date',
+        ),
+        migrations.RemoveField(
+            model_name='usersession',
+            name='restore_password_confirm_code',
+        ),
+    ]
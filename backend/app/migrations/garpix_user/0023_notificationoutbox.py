@@ -0,0 +1,42 @@
+# Generated by Django 4.2 on 2026-10-19 17:38
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import garpix_user.utils.current_date
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('garpix_user', '0022_confirmationchallenge'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationOutbox',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event', models.IntegerField(verbose_name='Event')),
+                ('channel', models.CharField(choices=[('email', 'Email'), ('phone', 'Phone number')], max_length=8, verbose_name='Channel')),
+                ('context', models.JSONField(blank=True, default=dict, verbose_name='Context')),
+                ('email', models.EmailField(blank=True, default='', max_length=254, verbose_name='Email')),
+                ('phone', models.CharField(blank=True, default='', max_length=32, verbose_name='Phone number')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('failed', 'Failed')], default='pending', max_length=8, verbose_name='Status')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='Attempts')),
+                ('last_error', models.TextField(blank=True, default='', verbose_name='Last error')),
+                ('available_at', models.DateTimeField(default=garpix_user.utils.current_date.set_current_date, verbose_name='Available at')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Date created')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL, verbose_name='User')),
+            ],
+            options={
+                'verbose_name': 'Очередь уведомлений | Notification outbox',
+                'verbose_name_plural': 'Очередь уведомлений | Notification outbox',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='notificationoutbox',
+            index=models.Index(fields=['status', 'available_at'], name='garpix_user_outbox_pending'),
+        ),
+    ]
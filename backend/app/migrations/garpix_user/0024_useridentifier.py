@@ -0,0 +1,94 @@
+# Generated by Django 4.2 on 2026-10-19 17:41
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import migrations, models
+import django.db.models.deletion
+from phonenumber_field.phonenumber import to_python
+
+
+def _normalize(kind, value):
+    value = str(value).strip() if value else ''
+    if value and kind == 'phone':
+        phone = to_python(value)
+        return phone.as_e164 if phone.is_valid() else value
+    return value.lower()
+
+
+def _insert_identifiers(UserIdentifier, owners, shared, collisions, login_kinds):
+    """
+    Inserts the chunk of log in identifiers {(kind, value): user_id} and other identifiers [(kind, value, user_id)];
+    log in identifiers already taken by an earlier user go to `collisions`
+    """
+    for kind in login_kinds:
+        values = [value for _kind, value in owners if _kind == kind]
+        for value, user_id in UserIdentifier.objects.filter(kind=kind, value__in=values, is_login=True).values_list(
+                'value', 'user_id'):
+            collisions.append((kind, value, user_id, owners.pop((kind, value))))
+    UserIdentifier.objects.bulk_create([
+        UserIdentifier(user_id=user_id, kind=kind, value=value) for (kind, value), user_id in owners.items()
+    ] + [
+        UserIdentifier(user_id=user_id, kind=kind, value=value, is_login=False) for kind, value, user_id in shared
+    ])
+
+
+def fill_user_identifiers(apps, schema_editor):
+    User = apps.get_model(settings.AUTH_USER_MODEL)
+    UserIdentifier = apps.get_model('garpix_user', 'UserIdentifier')
+    # only the fields users log in by belong to one user, the historical model doesn't carry USERNAME_FIELDS
+    login_kinds = [kind for kind in ('email', 'phone', 'username') if kind in get_user_model().USERNAME_FIELDS]
+
+    owners, shared, collisions = {}, [], []
+    for user in User.objects.order_by('pk').values('pk', 'email', 'phone', 'username').iterator(chunk_size=5000):
+        for kind in ('email', 'phone', 'username'):
+            if value := _normalize(kind, user[kind]):
+                if kind not in login_kinds:
+                    shared.append((kind, value, user['pk']))
+                elif (kind, value) in owners:
+                    collisions.append((kind, value, owners[(kind, value)], user['pk']))
+                else:
+                    owners[(kind, value)] = user['pk']
+        if len(owners) + len(shared) >= 5000:
+            _insert_identifiers(UserIdentifier, owners, shared, collisions, login_kinds)
+            owners, shared = {}, []
+    _insert_identifiers(UserIdentifier, owners, shared, collisions, login_kinds)
+
+    if collisions:
+        # the identifier stays with the user with the lowest id, the others can't log in or restore password by it
+        print(f'\n  {len(collisions)} user identifiers are shared by several users and were kept for the first user only:')
+        for kind, value, owner_id, user_id in collisions:
+            print(f'    {kind} {value}: kept for user {owner_id}, skipped for user {user_id}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('garpix_user', '0023_notificationoutbox'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserIdentifier',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('email', 'Email'), ('phone', 'Phone number'), ('username', 'Username')], max_length=8, verbose_name='Kind')),
+                ('value', models.CharField(max_length=254, verbose_name='Value')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='identifiers', to=settings.AUTH_USER_MODEL, verbose_name='User')),
+                ('is_login', models.BooleanField(default=True, verbose_name='Log in identifier')),
+            ],
+            options={
+                'verbose_name': 'Идентификатор пользователя | User identifier',
+                'verbose_name_plural': 'Идентификаторы пользователей | User identifiers',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='useridentifier',
+            constraint=models.UniqueConstraint(condition=models.Q(('is_login', True)), fields=('kind', 'value'), name='garpix_user_identifier_unique'),
+        ),
+        migrations.AddIndex(
+            model_name='useridentifier',
+            index=models.Index(fields=['kind', 'value'], name='garpix_user_identifier_value'),
+        ),
+        migrations.RunPython(fill_user_identifiers, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 4.2 on 2026-10-19 17:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('garpix_user', '0024_useridentifier'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskRun',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('task', models.CharField(max_length=255, verbose_name='Task')),
+                ('status', models.CharField(choices=[('success', 'Success'), ('failed', 'Failed')], default='success', max_length=8, verbose_name='Status')),
+                ('started_at', models.DateTimeField(verbose_name='Started at')),
+                ('finished_at', models.DateTimeField(verbose_name='Finished at')),
+                ('duration', models.FloatField(verbose_name='Duration, s')),
+                ('rows_scanned', models.PositiveIntegerField(default=0, verbose_name='Rows scanned')),
+                ('rows_affected', models.PositiveIntegerField(default=0, verbose_name='Rows affected')),
+                ('batches', models.PositiveIntegerField(default=0, verbose_name='Batches')),
+                ('peak_rss_growth', models.PositiveBigIntegerField(blank=True, null=True, verbose_name='Peak RSS growth, bytes')),
+                ('tracemalloc_peak', models.PositiveBigIntegerField(blank=True, null=True, verbose_name='Tracemalloc peak, bytes')),
+                ('error', models.TextField(blank=True, default='', verbose_name='Error')),
+            ],
+            options={
+                'verbose_name': 'Выполнение задачи | Task run',
+                'verbose_name_plural': 'Выполнения задач | Task runs',
+                'ordering': ['-started_at'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='taskrun',
+            index=models.Index(fields=['task', 'started_at'], name='garpix_user_task_run_started'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 4.2 on 2026-10-19 17:56
+
+import django.core.serializers.json
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('garpix_user', '0025_taskrun'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedUser',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('user_id', models.BigIntegerField(unique=True, verbose_name='User id')),
+                ('username', models.CharField(blank=True, default='', max_length=150, verbose_name='Username')),
+                ('email', models.CharField(blank=True, default='', max_length=254, verbose_name='Email')),
+                ('phone', models.CharField(blank=True, default='', max_length=32, verbose_name='Phone number')),
+                ('deleted_at', models.DateTimeField(blank=True, null=True, verbose_name='Deleted at')),
+                ('archived_at', models.DateTimeField(auto_now_add=True, verbose_name='Archived at')),
+                ('data', models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder, verbose_name='Data')),
+            ],
+            options={
+                'verbose_name': 'Архивный пользователь | Archived user',
+                'verbose_name_plural': 'Архивные пользователи | Archived users',
+            },
+        ),
+    ]
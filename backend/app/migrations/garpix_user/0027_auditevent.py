@@ -0,0 +1,43 @@
+# Generated by Django 4.2 on 2026-10-19 17:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('garpix_user', '0026_archiveduser'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuditEvent',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('time', models.DateTimeField(verbose_name='Time')),
+                ('action_id', models.IntegerField(verbose_name='Action id')),
+                ('action', models.CharField(blank=True, default='', max_length=255, verbose_name='Action')),
+                ('action_type', models.CharField(blank=True, default='', max_length=64, verbose_name='Action type')),
+                ('level', models.CharField(blank=True, default='', max_length=64, verbose_name='Level')),
+                ('subject', models.CharField(blank=True, default='', max_length=255, verbose_name='Subject')),
+                ('subject_address', models.CharField(blank=True, default='', max_length=64, verbose_name='Subject address')),
+                ('object', models.CharField(blank=True, default='', max_length=255, verbose_name='Object')),
+                ('object_address', models.CharField(blank=True, default='', max_length=512, verbose_name='Object address')),
+                ('result', models.CharField(blank=True, default='', max_length=64, verbose_name='Result')),
+                ('change', models.TextField(blank=True, default='', verbose_name='Change')),
+                ('message', models.TextField(blank=True, default='', verbose_name='Message')),
+            ],
+            options={
+                'verbose_name': 'Событие ИБ | Audit event',
+                'verbose_name_plural': 'События ИБ | Audit events',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='auditevent',
+            index=models.Index(fields=['subject', 'action_id', 'time'], name='garpix_user_audit_subject'),
+        ),
+        migrations.AddIndex(
+            model_name='auditevent',
+            index=models.Index(fields=['time', 'id'], name='garpix_user_audit_time'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2 on 2026-10-19 18:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('garpix_user', '0027_auditevent'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='referraltype',
+            name='referral_hash',
+            field=models.CharField(db_index=True, max_length=32),
+        ),
+    ]
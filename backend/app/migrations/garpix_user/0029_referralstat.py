@@ -0,0 +1,63 @@
+# Generated by Django 4.2 on 2026-10-19 18:13
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+def fill_link_created_at(apps, schema_editor):
+    ReferralUserLink = apps.get_model('garpix_user', 'ReferralUserLink')
+    UserSession = apps.get_model('garpix_user', 'UserSession')
+    # the click time was not stored; the user registration (or the last access of a guest session) is the closest
+    # known time after it, so the existing links do not all fall on the day of the migration
+    session = UserSession.objects.filter(pk=models.OuterRef('user_id'))
+    ReferralUserLink.objects.filter(user__user__isnull=False).update(
+        created_at=models.Subquery(session.values('user__date_joined')[:1]))
+    ReferralUserLink.objects.filter(user__user__isnull=True).update(
+        created_at=models.Subquery(session.values('last_access')[:1]))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('garpix_user', '0028_referraltype_referral_hash_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReferralStatState',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('last_link_id', models.BigIntegerField(default=0, verbose_name='Last counted referral link id')),
+                ('last_user_id', models.BigIntegerField(default=0, verbose_name='Last counted user id')),
+                ('last_confirmed_at', models.DateTimeField(blank=True, null=True, verbose_name='Last counted email confirmation')),
+            ],
+            options={
+                'verbose_name': 'Состояние статистики рефералов | Referral statistics state',
+            },
+        ),
+        migrations.AddField(
+            model_name='referraluserlink',
+            name='created_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, verbose_name='Created at'),
+        ),
+        migrations.RunPython(fill_link_created_at, migrations.RunPython.noop),
+        migrations.CreateModel(
+            name='ReferralStat',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='Date')),
+                ('clicks', models.PositiveIntegerField(default=0, verbose_name='Clicks')),
+                ('sessions', models.PositiveIntegerField(default=0, verbose_name='Unique sessions')),
+                ('registrations', models.PositiveIntegerField(default=0, verbose_name='Registrations')),
+                ('confirmations', models.PositiveIntegerField(default=0, verbose_name='Email confirmations')),
+                ('referral_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stats', to='garpix_user.referraltype', verbose_name='Referral type')),
+            ],
+            options={
+                'verbose_name': 'Статистика реферальной ссылки | Referral statistics',
+                'verbose_name_plural': 'Статистика реферальных ссылок | Referral statistics',
+                'ordering': ['-date'],
+                'unique_together': {('referral_type', 'date')},
+            },
+        ),
+    ]
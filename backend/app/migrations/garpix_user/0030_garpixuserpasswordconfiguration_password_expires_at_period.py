@@ -0,0 +1,36 @@
+# Generated by Django 4.2 on 2026-10-19 18:42
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def set_password_expires_at_period(apps, schema_editor):
+    # password_expires_at is filled with the period in effect by the user model migration,
+    # so the first recompute doesn't have to rewrite every user
+    GarpixUserPasswordConfiguration = apps.get_model('garpix_user', 'GarpixUserPasswordConfiguration')
+    GARPIX_USER_SETTINGS = getattr(settings, 'GARPIX_USER', {})
+
+    config = GarpixUserPasswordConfiguration.objects.first()
+    if GARPIX_USER_SETTINGS.get('ADMIN_PASSWORD_SETTINGS', False):
+        password_validity_period = config.password_validity_period if config else -1
+    else:
+        password_validity_period = GARPIX_USER_SETTINGS.get('PASSWORD_VALIDITY_PERIOD', -1)
+
+    GarpixUserPasswordConfiguration.objects.update_or_create(
+        pk=config.pk if config else 1, defaults={'password_expires_at_period': password_validity_period})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('garpix_user', '0029_referralstat'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='garpixuserpasswordconfiguration',
+            name='password_expires_at_period',
+            field=models.IntegerField(editable=False, null=True, verbose_name='Срок действия пароля, по которому рассчитаны даты истечения'),
+        ),
+        migrations.RunPython(set_password_expires_at_period, migrations.RunPython.noop),
+    ]
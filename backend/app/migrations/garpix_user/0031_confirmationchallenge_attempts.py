@@ -0,0 +1,18 @@
+# Generated by Django 4.2 on 2026-10-19 19:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('garpix_user', '0030_garpixuserpasswordconfiguration_password_expires_at_period'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='confirmationchallenge',
+            name='attempts',
+            field=models.PositiveSmallIntegerField(default=0, verbose_name='Checks of the code'),
+        ),
+    ]
@@ -182,7 +182,7 @@ AUTHENTICATION_BACKENDS = (
     # Django
     'rest_framework_social_oauth2.backends.DjangoOAuth2',
     'garpix_user.utils.backends.CustomAuthenticationBackend',
-    'django.contrib.auth.backends.ModelBackend',
+    'garpix_user.utils.backends.CachedModelBackend',
 )
 
 SOCIAL_AUTH_PIPELINE = (
@@ -6,6 +6,14 @@ from .user import UserAdmin  # noqa
 
 from .password_history import PasswordHistoryAdmin  # noqa
 
+from .notification_outbox import NotificationOutboxAdmin  # noqa
+
+from .task_run import TaskRunAdmin  # noqa
+
+from .archived_user import ArchivedUserAdmin  # noqa
+
+from .audit_event import AuditEventAdmin  # noqa
+
 from .group import GarpixGroupAdmin
 
 
@@ -0,0 +1,17 @@
+from django.contrib import admin
+from garpix_utils.logs.mixins.log_admin import LogAdminMixin
+
+from ..models import ArchivedUser
+
+
+@admin.register(ArchivedUser)
+class ArchivedUserAdmin(LogAdminMixin):
+    list_display = ['user_id', 'username', 'email', 'phone', 'deleted_at', 'archived_at']
+    search_fields = ['username', 'email', 'phone']
+    exclude = ['data']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
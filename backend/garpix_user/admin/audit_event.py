@@ -0,0 +1,79 @@
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.contrib import admin
+from django.db.models import Q
+from django.template.response import TemplateResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from garpix_utils.logs.enums.get_enums import Action
+
+from ..models import AuditEvent
+
+
+@admin.register(AuditEvent)
+class AuditEventAdmin(admin.ModelAdmin):
+    """
+    Read-only event list paginated by (time, id) keyset instead of OFFSET, so every page costs one index range scan
+    """
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+    @staticmethod
+    def get_filtered_queryset(params):
+        queryset = AuditEvent.objects.all()
+        if params.get('subject'):
+            queryset = queryset.filter(subject=params['subject'])
+        if params.get('action_id', '').isdigit():
+            queryset = queryset.filter(action_id=params['action_id'])
+        if params.get('subject_address'):
+            queryset = queryset.filter(subject_address=params['subject_address'])
+        date_from, date_to = parse_date(params.get('date_from', '')), parse_date(params.get('date_to', ''))
+        # plain datetime bounds keep the (time, id) and (subject, action_id, time) indexes usable
+        if date_from:
+            queryset = queryset.filter(time__gte=timezone.make_aware(datetime.combine(date_from, time.min)))
+        if date_to:
+            queryset = queryset.filter(
+                time__lt=timezone.make_aware(datetime.combine(date_to + timedelta(days=1), time.min)))
+        return queryset
+
+    def changelist_view(self, request, extra_context=None):
+        if not self.has_view_permission(request):
+            return super().changelist_view(request, extra_context)
+
+        page_size = settings.GARPIX_USER.get('AUDIT_EVENT_PAGE_SIZE', 100)
+        queryset = self.get_filtered_queryset(request.GET)
+
+        cursor_time, _, cursor_id = request.GET.get('before', '').partition('_')
+        cursor_time = parse_datetime(cursor_time)
+        if cursor_time and cursor_id.isdigit():
+            queryset = queryset.filter(Q(time__lt=cursor_time) | Q(time=cursor_time, id__lt=int(cursor_id)))
+
+        events = list(queryset.order_by('-time', '-id')[:page_size + 1])
+        next_cursor = None
+        if len(events) > page_size:
+            events = events[:page_size]
+            next_cursor = f'{events[-1].time.isoformat()}_{events[-1].pk}'
+
+        params = request.GET.copy()
+        params.pop('before', None)
+
+        context = dict(
+            self.admin_site.each_context(request),
+            opts=self.model._meta,
+            title=self.model._meta.verbose_name_plural,
+            events=events,
+            actions=[action.value for action in Action],
+            filters=request.GET,
+            params=params.urlencode(),
+            next_cursor=next_cursor,
+            **(extra_context or {})
+        )
+        return TemplateResponse(request, 'admin/garpix_user/auditevent/change_list.html', context)
@@ -2,14 +2,17 @@ from django.contrib import admin
 from django.contrib.auth.admin import GroupAdmin
 from django.contrib.auth.models import Group
 from garpix_utils.logs.enums.get_enums import Action
-from garpix_utils.logs.loggers import ib_logger
+from garpix_user.utils.audit_log import ib_logger
 from garpix_utils.logs.mixins.create_log import CreateLogMixin
 
+from garpix_user.mixins.admin import BulkActionAdminMixin
+from garpix_user.utils.permission_cache import invalidate_all_permissions
+
 admin.site.unregister(Group)
 
 
 @admin.register(Group)
-class GarpixGroupAdmin(CreateLogMixin, GroupAdmin):
+class GarpixGroupAdmin(BulkActionAdminMixin, CreateLogMixin, GroupAdmin):
 
     def save_model(self, request, obj, form, change):
         log = self.log_change_or_create(ib_logger, request, obj, change,
@@ -23,6 +26,7 @@ class GarpixGroupAdmin(CreateLogMixin, GroupAdmin):
             log = self.log_change_m2m_field(ib_logger, request, super(), form, formsets, change,
                                             action_change=Action.group_change.value,)
             ib_logger.write_string(log)
+            invalidate_all_permissions()
         else:
             super().save_related(request, form, formsets, change)
 
@@ -30,13 +34,11 @@ class GarpixGroupAdmin(CreateLogMixin, GroupAdmin):
         action = Action.group_delete.value
         log = self.log_delete(ib_logger, request, obj, action)
         super().delete_model(request, obj)
+        invalidate_all_permissions()
         ib_logger.write_string(log)
 
     def delete_queryset(self, request, queryset):
-        action = Action.group_delete.value
-        logs = []
-        for obj in queryset:
-            logs.append(self.log_delete(ib_logger, request, obj, action))
+        pks = self.get_selected_pks(queryset)
         super().delete_queryset(request, queryset)
-        for log in logs:
-            ib_logger.write_string(log)
+        invalidate_all_permissions()
+        self.log_bulk_action(request, Action.group_delete.value, queryset.model, pks, 'Группы были удалены')
@@ -0,0 +1,20 @@
+from django.contrib import admin
+from garpix_utils.logs.mixins.log_admin import LogAdminMixin
+
+from ..mixins.admin import PerformanceAdminMixin
+from ..models import NotificationOutbox
+
+
+@admin.register(NotificationOutbox)
+class NotificationOutboxAdmin(PerformanceAdminMixin, LogAdminMixin):
+    change_list_template = 'admin/garpix_user/keyset_change_list.html'
+    list_display = ['event', 'channel', 'email', 'phone', 'status', 'attempts', 'available_at', 'created_at']
+    list_filter = ['status', 'channel']
+    readonly_fields = ['last_error']
+    raw_id_fields = ['user']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
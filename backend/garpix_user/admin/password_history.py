@@ -1,12 +1,17 @@
 from django.contrib import admin
 from garpix_utils.logs.mixins.log_admin import LogAdminMixin
 
+from ..mixins.admin import PerformanceAdminMixin
 from ..models import PasswordHistory
 
 
 @admin.register(PasswordHistory)
-class PasswordHistoryAdmin(LogAdminMixin):
+class PasswordHistoryAdmin(PerformanceAdminMixin, LogAdminMixin):
+    change_list_template = 'admin/garpix_user/keyset_change_list.html'
     list_display = ['user', 'created_at']
+    list_select_related = ['user']
+    raw_id_fields = ['user']
+    identifier_search_prefix = 'user__'
 
     def has_delete_permission(self, request, obj=None):
         return True
@@ -1,9 +1,53 @@
+from datetime import timedelta
+
+from django.conf import settings
 from django.contrib import admin
+from django.db.models import Sum
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
 
+from ..models.referral_stat import ReferralStat
 from ..models.refferal import ReferralType
 
 
+class ReferralStatInline(admin.TabularInline):
+    model = ReferralStat
+    fields = readonly_fields = ['date', 'clicks', 'sessions', 'registrations', 'confirmations']
+    extra = 0
+    can_delete = False
+    verbose_name_plural = _('Statistics for the last days')
+
+    def get_queryset(self, request):
+        days = settings.GARPIX_USER.get('REFERRAL_STATS_ADMIN_DAYS', 30)
+        return super().get_queryset(request).filter(date__gt=timezone.localdate() - timedelta(days=days))
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+
 @admin.register(ReferralType)
 class ReferralTypeAdmin(admin.ModelAdmin):
-    list_display = ['title']
+    list_display = ['title', 'total_clicks', 'total_sessions', 'total_registrations', 'total_confirmations']
     fields = ['title']
+    inlines = [ReferralStatInline]
+
+    def get_queryset(self, request):
+        # totals come from the daily rollup, not from the link and user tables
+        return super().get_queryset(request).annotate(**{
+            f'total_{counter}': Sum(f'stats__{counter}') for counter in ReferralStat.COUNTERS})
+
+    @admin.display(description=_('Clicks'), ordering='total_clicks')
+    def total_clicks(self, obj):
+        return obj.total_clicks or 0
+
+    @admin.display(description=_('Unique sessions'), ordering='total_sessions')
+    def total_sessions(self, obj):
+        return obj.total_sessions or 0
+
+    @admin.display(description=_('Registrations'), ordering='total_registrations')
+    def total_registrations(self, obj):
+        return obj.total_registrations or 0
+
+    @admin.display(description=_('Email confirmations'), ordering='total_confirmations')
+    def total_confirmations(self, obj):
+        return obj.total_confirmations or 0
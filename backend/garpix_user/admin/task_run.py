@@ -0,0 +1,57 @@
+from django.contrib import admin
+from django.db.models import Avg, Count, Max, Sum
+from django.db.models.functions import TruncDay
+from django.template.response import TemplateResponse
+from django.urls import path
+from garpix_utils.logs.mixins.log_admin import LogAdminMixin
+
+from ..models import TaskRun
+
+
+@admin.register(TaskRun)
+class TaskRunAdmin(LogAdminMixin):
+    list_display = ['task', 'status', 'started_at', 'duration', 'rows_scanned', 'rows_affected', 'batches',
+                    'peak_rss_growth', 'tracemalloc_peak']
+    list_filter = ['status', 'task']
+    date_hierarchy = 'started_at'
+    change_list_template = 'admin/garpix_user/taskrun/change_list.html'
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def get_urls(self):
+        return [
+            path('trend/', self.admin_site.admin_view(self.trend_view), name='garpix_user_taskrun_trend'),
+        ] + super().get_urls()
+
+    def trend_view(self, request):
+        """
+        Daily aggregates per task, to see which task gets slower or heavier as the user table grows
+        """
+        queryset = TaskRun.objects.all()
+        task = request.GET.get('task')
+        if task:
+            queryset = queryset.filter(task=task)
+
+        rows = queryset.annotate(day=TruncDay('started_at')).values('task', 'day').annotate(
+            runs=Count('id'),
+            avg_duration=Avg('duration'),
+            max_duration=Max('duration'),
+            rows_scanned=Sum('rows_scanned'),
+            rows_affected=Sum('rows_affected'),
+            peak_rss=Max('peak_rss_growth'),
+            tracemalloc_peak=Max('tracemalloc_peak'),
+        ).order_by('task', '-day')
+
+        context = dict(
+            self.admin_site.each_context(request),
+            opts=self.model._meta,
+            title='Task run trend',
+            rows=rows,
+            tasks=TaskRun.objects.order_by('task').values_list('task', flat=True).distinct(),
+            task=task,
+        )
+        return TemplateResponse(request, 'admin/garpix_user/taskrun/trend.html', context)
@@ -1,24 +1,40 @@
 from garpix_utils.logs.enums.get_enums import Action, ActionResult
-from garpix_utils.logs.loggers import ib_logger
+from garpix_user.utils.audit_log import ib_logger
 from garpix_utils.logs.mixins.create_log import CreateLogMixin
 from garpix_utils.logs.services.logger_iso import LoggerIso
 from garpix_utils.models import AdminDeleteMixin
+from django.conf import settings
+from django.contrib import admin, messages
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
+from django.db import transaction
+from django.db.models import Q
 from django.utils.translation import gettext_lazy as _
 
+from garpix_user.mixins.admin import BulkActionAdminMixin, PerformanceAdminMixin
+from garpix_user.models import AccessToken, RefreshToken
+from garpix_user.tasks import resend_confirmations
+from garpix_user.utils.current_date import set_current_date
 from garpix_user.utils.get_password_settings import get_password_settings
+from garpix_user.utils.permission_cache import invalidate_user_permissions
 
 
-class UserAdmin(AdminDeleteMixin, BaseUserAdmin, CreateLogMixin):
+class UserAdmin(BulkActionAdminMixin, PerformanceAdminMixin, AdminDeleteMixin, BaseUserAdmin, CreateLogMixin):
     change_form_template = "garpix_user/send_confirm.html"
+    change_list_template = "admin/garpix_user/keyset_change_list.html"
+    identifier_search_prefix = ''
+    actions = AdminDeleteMixin.actions + (
+        'block_users', 'unblock_users', 'force_password_update', 'reset_login_attempts',
+        'revoke_tokens', 'send_confirmations',
+    )
 
     fieldsets = (
         (None, {'fields': ('username', 'password')}),
         (_('Personal info'), {'fields': ('first_name', 'last_name', 'email', 'phone')}),
         (_('Permissions'), {
             'fields': (
-                'is_active', 'is_deleted', 'is_staff', 'is_superuser',
-                'is_blocked', 'login_attempts_count', 'password_updated_date', 'needs_password_update',
+                'is_active', 'is_deleted', 'deleted_at', 'is_staff', 'is_superuser',
+                'is_blocked', 'login_attempts_count', 'password_updated_date', 'password_expires_at',
+                'needs_password_update',
                 'groups', 'user_permissions', 'keycloak_auth_only'
             ),
         }),
@@ -33,7 +49,8 @@ class UserAdmin(AdminDeleteMixin, BaseUserAdmin, CreateLogMixin):
                 'is_email_confirmed', 'email_confirmation_code', 'is_phone_confirmed', 'phone_confirmation_code'),
         }),
     )
-    readonly_fields = ['telegram_secret', 'get_telegram_connect_user_help'] + list(BaseUserAdmin.readonly_fields)
+    readonly_fields = ['telegram_secret', 'get_telegram_connect_user_help', 'email_confirmation_code',
+                       'phone_confirmation_code', 'password_expires_at', 'deleted_at'] + list(BaseUserAdmin.readonly_fields)
 
     def delete_model(self, request, obj):
         action = Action.user_delete.value
@@ -42,13 +59,64 @@ class UserAdmin(AdminDeleteMixin, BaseUserAdmin, CreateLogMixin):
         ib_logger.write_string(log)
 
     def delete_queryset(self, request, queryset):
-        action = Action.user_delete.value
-        logs = []
-        for obj in queryset:
-            logs.append(self.log_delete(ib_logger, request, obj, action))
-        super().delete_queryset(request, queryset)
-        for log in logs:
-            ib_logger.write_string(log)
+        # same soft delete as GarpixUser.delete, done as one UPDATE; already deleted users keep their deleted_at
+        self.update_selected(request, queryset.filter(is_deleted=False), Action.user_delete.value, 'Пользователи были удалены',
+                             is_deleted=True, is_active=False, deleted_at=set_current_date())
+
+    @admin.action(description=_('Block selected users'))
+    def block_users(self, request, queryset):
+        updated = self.update_selected(request, queryset, Action.user_access.value,
+                                       'Пользователи были заблокированы', is_blocked=True)
+        self.message_user(request, _('%d users were blocked') % updated, messages.SUCCESS)
+
+    @admin.action(description=_('Unblock selected users'))
+    def unblock_users(self, request, queryset):
+        updated = self.update_selected(request, queryset, Action.user_access.value,
+                                       'Пользователи были разблокированы', is_blocked=False, login_attempts_count=0)
+        self.message_user(request, _('%d users were unblocked') % updated, messages.SUCCESS)
+
+    @admin.action(description=_('Require password change from selected users'))
+    def force_password_update(self, request, queryset):
+        updated = self.update_selected(request, queryset, Action.user_change.value,
+                                       'Пользователям была назначена смена пароля', needs_password_update=True)
+        self.message_user(request, _('%d users have to change the password') % updated, messages.SUCCESS)
+
+    @admin.action(description=_('Reset invalid log in attempts of selected users'))
+    def reset_login_attempts(self, request, queryset):
+        updated = self.update_selected(request, queryset, Action.user_change.value,
+                                       'Пользователям был сброшен счетчик попыток входа', login_attempts_count=0)
+        self.message_user(request, _('%d users had log in attempts reset') % updated, messages.SUCCESS)
+
+    @admin.action(description=_('Revoke tokens of selected users'))
+    def revoke_tokens(self, request, queryset):
+        pks = self.get_selected_pks(queryset)
+        users = queryset.order_by().values('pk')
+        with transaction.atomic():
+            AccessToken.objects.filter(user__in=users).delete()
+            RefreshToken.objects.filter(user__in=users).delete()
+        self.log_bulk_action(request, Action.user_access.value, queryset.model, pks,
+                             'Токены пользователей были отозваны')
+        self.message_user(request, _('Tokens of %d users were revoked') % len(pks), messages.SUCCESS)
+
+    @admin.action(description=_('Resend confirmations to selected users'))
+    def send_confirmations(self, request, queryset):
+        unconfirmed = Q()
+        if settings.GARPIX_USER.get('USE_EMAIL_CONFIRMATION', False):
+            unconfirmed |= Q(is_email_confirmed=False) & ~Q(email='') & Q(email__isnull=False)
+        if settings.GARPIX_USER.get('USE_PHONE_CONFIRMATION', False):
+            unconfirmed |= Q(is_phone_confirmed=False) & ~Q(phone='') & Q(phone__isnull=False)
+        if not unconfirmed:
+            self.message_user(request, _('Email and phone confirmations are disabled'), messages.WARNING)
+            return
+
+        pks = self.get_selected_pks(queryset.filter(unconfirmed))
+        batch_size = settings.GARPIX_USER.get('ADMIN_BULK_ACTION_BATCH_SIZE', 1000)
+        for first in range(0, len(pks), batch_size):
+            chunk = pks[first:first + batch_size]
+            transaction.on_commit(lambda chunk=chunk: resend_confirmations.delay(chunk))
+        self.log_bulk_action(request, Action.user_change.value, queryset.model, pks,
+                             'Пользователям были повторно отправлены подтверждения')
+        self.message_user(request, _('Confirmations for %d users were queued') % len(pks), messages.SUCCESS)
 
     def save_model(self, request, obj, form, change):
         password_first_change = get_password_settings()['password_first_change']
@@ -62,29 +130,64 @@ class UserAdmin(AdminDeleteMixin, BaseUserAdmin, CreateLogMixin):
         ib_logger.write_string(log)
         super().save_model(request, obj, form, change)
 
-    def save_related(self, request, form, formsets, change):
+    @staticmethod
+    def get_m2m_snapshot(form, change):
+        """
+        Stored ids of every many-to-many field of the form, one `values_list` query per field
+        """
         obj = form.instance
-        prev_groups, prev_permissions = set(), set()
-        if change:
-            prev_groups = set([str(_obj) for _obj in obj.groups.all()])
-            prev_permissions = set([str(_obj) for _obj in obj.user_permissions.all()])
-            log = self.log_change_m2m_field(ib_logger, request, super(), form, formsets, change,
-                                            action_change=Action.user_change.value,
-                                            exclude_fields=['groups', 'user_permissions'])
-            if log:
-                ib_logger.write_string(log)
+        return {field.name: set(getattr(obj, field.name).values_list('pk', flat=True)) if change else set()
+                for field in obj._meta.many_to_many if field.name in form.cleaned_data}
+
+    @staticmethod
+    def get_m2m_diff(form, snapshot):
+        """
+        Names of the added and removed objects per changed field. The new ids come from the form's cleaned value,
+        which is already evaluated, so only the removed objects are fetched
+        """
+        diff = {}
+        for field, prev_pks in snapshot.items():
+            selected = {_obj.pk: _obj for _obj in form.cleaned_data[field]}
+            added, removed = selected.keys() - prev_pks, prev_pks - selected.keys()
+            if added or removed:
+                removed_objs = form.fields[field].queryset.filter(pk__in=removed) if removed else []
+                diff[field] = ({str(selected[pk]) for pk in added}, {str(_obj) for _obj in removed_objs})
+        return diff
+
+    @staticmethod
+    def log_m2m_diff(request, obj, m2m_diff):
+        changed_fields = ''
+        for field, (added, removed) in m2m_diff.items():
+            changed_fields += f'{obj._meta.get_field(field).verbose_name}: '
+            if added:
+                changed_fields += f'+добавлены {added} '
+            if removed:
+                changed_fields += f'-удалены {removed} '
+        msg = CreateLogMixin.log_msg_change if CreateLogMixin.log_msg_change else f'Объект {str(obj)}(id={obj.pk}) модели {obj.__class__.__name__} был изменен'
+        log = ib_logger.create_log(action=Action.user_change.value,
+                                   obj=obj.__class__.__name__,
+                                   obj_address=request.path,
+                                   result=ActionResult.success,
+                                   sbj=request.user.username,
+                                   params=changed_fields,
+                                   sbj_address=LoggerIso.get_client_ip(request),
+                                   msg=msg)
+        ib_logger.write_string(log)
 
-        else:
-            super().save_related(request, form, formsets, change)
+    def save_related(self, request, form, formsets, change):
+        obj = form.instance
+        snapshot = self.get_m2m_snapshot(form, change)
+        super().save_related(request, form, formsets, change)
+        m2m_diff = self.get_m2m_diff(form, snapshot)
 
-        groups = set([str(_obj) for _obj in obj.groups.all()])
-        permissions = set([str(_obj) for _obj in obj.user_permissions.all()])
+        if 'groups' in m2m_diff or 'user_permissions' in m2m_diff:
+            invalidate_user_permissions([obj.pk])
 
-        new_old_groups = groups - prev_groups
-        old_new_groups = prev_groups - groups
+        new_old_groups, old_new_groups = m2m_diff.pop('groups', (set(), set()))
+        new_old_permissions, old_new_permissions = m2m_diff.pop('user_permissions', (set(), set()))
 
-        new_old_permissions = permissions - prev_permissions
-        old_new_permissions = prev_permissions - permissions
+        if change and m2m_diff:
+            self.log_m2m_diff(request, obj, m2m_diff)
 
         if new_old_groups or old_new_groups:
             if new_old_groups:
@@ -1,7 +1,12 @@
 from django.contrib import admin
+from garpix_user.mixins.admin import PerformanceAdminMixin
 from garpix_user.models import UserSession
 
 
 @admin.register(UserSession)
-class UserSessionAdmin(admin.ModelAdmin):
+class UserSessionAdmin(PerformanceAdminMixin, admin.ModelAdmin):
+    change_list_template = 'admin/garpix_user/keyset_change_list.html'
     fields = ('user', 'token_number', 'recognized', 'last_access', 'is_phone_confirmed', 'is_email_confirmed')
+    list_select_related = ['user']
+    raw_id_fields = ['user']
+    identifier_search_prefix = 'user__'
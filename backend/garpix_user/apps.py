@@ -1,6 +1,28 @@
 from django.apps import AppConfig
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.db.models.signals import m2m_changed, post_delete, post_save
 
 
 class GarpixUserConfig(AppConfig):
     name = 'garpix_user'
     verbose_name = 'Пользователь Garpix | Garpix User'
+
+    def ready(self):
+        from django.contrib.auth import get_user_model
+        from django.contrib.auth.models import Group, Permission
+        from garpix_user.utils.audit_log import enable_sqlite_wal
+        from garpix_user.utils.permission_cache import invalidate_on_delete, invalidate_on_m2m_changed
+        from garpix_user.utils.registered_identifiers import add_registered_user
+
+        post_save.connect(add_registered_user, sender=settings.AUTH_USER_MODEL,
+                          dispatch_uid='garpix_user_registered_identifiers')
+        connection_created.connect(enable_sqlite_wal, dispatch_uid='garpix_user_audit_event_wal')
+
+        User = get_user_model()
+        for through in (User.groups.through, User.user_permissions.through, Group.permissions.through):
+            m2m_changed.connect(invalidate_on_m2m_changed, sender=through,
+                                dispatch_uid=f'garpix_user_permission_cache_{through._meta.label_lower}')
+        for model in (Group, Permission):
+            post_delete.connect(invalidate_on_delete, sender=model,
+                                dispatch_uid=f'garpix_user_permission_cache_{model._meta.label_lower}')
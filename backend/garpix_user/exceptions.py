@@ -46,6 +46,11 @@ class IncorrectCodeException(ModelException):
         return _("Incorrect code")
 
 
+class TooManyAttemptsException(ModelException):
+    def get_message(self):
+        return settings.GARPIX_USER.get('TOO_MANY_ATTEMPTS_RESPONSE', _("Too many attempts. Request a new code"))
+
+
 class NoTimeLeftException(ModelException):
     def get_message(self):
         return _("Code has expired. Request it again")
@@ -3,14 +3,11 @@ from django.contrib.auth import get_user_model
 from django.contrib.auth.forms import AuthenticationForm
 from django.utils.translation import gettext_lazy as _
 
-from datetime import timedelta
-
 from garpix_utils.logs.enums.get_enums import Action, ActionResult
-from garpix_utils.logs.loggers import ib_logger
+from garpix_user.utils.audit_log import ib_logger
 from garpix_utils.logs.services.logger_iso import LoggerIso
 
-from garpix_user.utils.current_date import set_current_date
-from garpix_user.utils.get_password_settings import get_password_settings
+from garpix_user.models.user_identifier import UserIdentifier
 
 User = get_user_model()
 
@@ -21,14 +18,12 @@ class LoginForm(AuthenticationForm):
 
     def clean(self):
 
-        password_validity_period = get_password_settings()['password_validity_period']
-
         super(LoginForm, self).clean()
         username = self.cleaned_data.get('username')
         password = self.cleaned_data.get('password')
         valid = False
         if username and password:
-            user = User.objects.filter(username=username.lower()).first()
+            user = User.objects.filter(UserIdentifier.user_filter(username, fields=('username',))).first()
 
             if not user or user.keycloak_auth_only:
                 raise forms.ValidationError(_('User is not found'))
@@ -43,8 +38,7 @@ class LoginForm(AuthenticationForm):
 
             if user and user.is_blocked:
                 raise forms.ValidationError(_("Your account is blocked. Please contact your administrator"))
-            if user and password_validity_period != -1 and not user.keycloak_auth_only and user.password_updated_date + timedelta(
-                    days=password_validity_period) <= set_current_date():
+            if user and user.is_password_expired():
                 raise forms.ValidationError(_('Your password has expired. Please change password'))
 
             message = f'Пользователь {user.username} вошел в систему.'
@@ -0,0 +1,200 @@
+import csv
+import itertools
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from garpix_utils.string import get_random_string
+from rest_framework import serializers
+
+from garpix_user.mixins.serializers import PasswordSerializerMixin
+from garpix_user.utils.bulk_users import bulk_create_users, get_identifiers, get_taken_identifiers
+from garpix_user.utils.get_password_settings import get_password_settings
+
+
+def get_error_messages(error):
+    if isinstance(error, serializers.ValidationError):
+        return [str(message) for message in error.detail]
+    return error.messages
+
+
+class Command(BaseCommand):
+    help = 'Imports users from a CSV file with a header row or a JSON lines file. ' \
+           'Passwords are hashed on a process pool, users are inserted in batches, ' \
+           'an interrupted import continues from the checkpoint when started again.'
+
+    # fields that are managed by the package or must not be granted by a file
+    EXCLUDED_FIELDS = {'id', 'password', 'last_login', 'date_joined', 'is_superuser', 'is_staff', 'is_deleted',
+                       'deleted_at', 'password_updated_date', 'password_expires_at', 'needs_password_update'}
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV or JSON lines file')
+        parser.add_argument('--format', choices=['csv', 'jsonl'], help='Taken from the file extension by default')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Users per INSERT and per checkpoint')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Password hashing processes')
+        parser.add_argument('--checkpoint', help='Checkpoint file, <path>.checkpoint by default')
+        parser.add_argument('--errors', help='Report of rejected rows, <path>.errors.jsonl by default')
+        parser.add_argument('--restart', action='store_true', help='Ignore the checkpoint and start from the first row')
+        parser.add_argument('--needs-password-update', action='store_true',
+                            help='Require a password change on the first log in')
+
+    def handle(self, *args, **options):
+        self.User = get_user_model()
+        self.fields = {field.name: field for field in self.User._meta.concrete_fields
+                       if field.editable and not field.is_relation and field.name not in self.EXCLUDED_FIELDS}
+        self.password_settings = get_password_settings()
+        self.needs_password_update = options['needs_password_update']
+        self.workers = options['workers']
+        self.seen = set()
+
+        path = options['path']
+        if not os.path.exists(path):
+            raise CommandError(f'File {path} does not exist')
+        file_format = options['format'] or ('jsonl' if path.endswith(('.jsonl', '.json')) else 'csv')
+        checkpoint_path = options['checkpoint'] or f'{path}.checkpoint'
+        errors_path = options['errors'] or f'{path}.errors.jsonl'
+
+        checkpoint = {'position': 0, 'imported': 0, 'failed': 0}
+        if not options['restart'] and os.path.exists(checkpoint_path):
+            with open(checkpoint_path) as file:
+                checkpoint = json.load(file)
+            self.stdout.write(f'Resuming after row {checkpoint["position"]}')
+
+        rows = itertools.islice(self.read_rows(path, file_format), checkpoint['position'], None)
+
+        # forked workers must not inherit open database connections
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=self.workers) as pool, \
+                open(errors_path, 'a' if checkpoint['position'] else 'w') as self.errors_file:
+            pool.submit(int).result()
+
+            # hashing of a batch runs while the previous batch is written
+            pending = None
+            while batch := list(itertools.islice(rows, options['batch_size'])):
+                prepared = self.prepare_batch(batch, pool)
+                if pending is not None:
+                    self.write_batch(pending, checkpoint, checkpoint_path)
+                pending = prepared
+            if pending is not None:
+                self.write_batch(pending, checkpoint, checkpoint_path)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {checkpoint["imported"]} user(s), {checkpoint["failed"]} row(s) rejected, see {errors_path}'))
+
+    @staticmethod
+    def read_rows(path, file_format):
+        """
+        Yields (line number, row dict or parse error)
+        """
+        with open(path, newline='', encoding='utf-8') as file:
+            if file_format == 'csv':
+                reader = csv.DictReader(file)
+                for row in reader:
+                    yield reader.line_num, {key: value for key, value in row.items() if value not in ('', None)}
+                return
+
+            for line, text in enumerate(file, 1):
+                if not text.strip():
+                    continue
+                try:
+                    row = json.loads(text)
+                except ValueError as e:
+                    row = e
+                yield line, row if isinstance(row, (dict, Exception)) else ValueError('Not an object')
+
+    def clean_fields(self, row):
+        values, errors = {}, {}
+        for name, value in row.items():
+            field = self.fields.get(name)
+            if field is None:
+                errors[name] = ['Unknown field']
+                continue
+            try:
+                values[name] = field.clean(value, None)
+            except ValidationError as e:
+                errors[name] = e.messages
+        return values, errors
+
+    def clean_row(self, row):
+        """
+        Returns (user, password, errors): the unsaved user and the raw password or the errors of the row
+        """
+        if isinstance(row, Exception):
+            return None, None, {'row': [str(row)]}
+
+        row = dict(row)
+        password = row.pop('password', None)
+        values, errors = self.clean_fields(row)
+
+        if values.get('email'):
+            values['email'] = values['email'].lower()
+        if 'username' not in self.User.USERNAME_FIELDS and not values.get('username'):
+            values['username'] = get_random_string(25)
+        for name in self.User.USERNAME_FIELDS:
+            if not values.get(name) and name not in errors:
+                errors[name] = ['This field is required.']
+
+        if password:
+            try:
+                PasswordSerializerMixin()._validate_password(password, self.password_settings)
+            except (ValidationError, serializers.ValidationError) as e:
+                errors['password'] = get_error_messages(e)
+
+        return (None if errors else self.User(**values)), password, errors
+
+    def prepare_batch(self, batch, pool):
+        """
+        Validates the rows, rejects identifiers already taken and queues the password hashing
+        """
+        items = []
+        for line, row in batch:
+            user, password, errors = self.clean_row(row)
+            identifiers = get_identifiers(user) if user else set()
+            items.append({'line': line, 'row': row, 'user': user, 'password': password,
+                          'errors': errors, 'identifiers': identifiers})
+
+        taken = self.seen | get_taken_identifiers(set().union(*(item['identifiers'] for item in items)))
+
+        for item in items:
+            duplicates = item['identifiers'] & taken
+            if duplicates:
+                item['errors'].update({kind: ['Already in use'] for kind, _value in duplicates})
+                item['user'] = None
+            taken |= item['identifiers']
+            if item['user'] is not None:
+                self.seen |= item['identifiers']
+
+        hashed_items = [item for item in items if item['user'] is not None and item['password']]
+        hashes = pool.map(make_password, [item['password'] for item in hashed_items],
+                          chunksize=max(len(hashed_items) // (self.workers * 4), 1))
+        return items, hashed_items, hashes, batch[-1][0]
+
+    def write_batch(self, prepared, checkpoint, checkpoint_path):
+        items, hashed_items, hashes, last_line = prepared
+        for item, password_hash in zip(hashed_items, hashes):
+            item['user'].password = password_hash
+
+        users = bulk_create_users([item['user'] for item in items if item['user'] is not None],
+                                  self.password_settings, self.needs_password_update)
+
+        failed = [item for item in items if item['user'] is None]
+        for item in failed:
+            row = {key: value for key, value in item['row'].items() if key != 'password'} \
+                if isinstance(item['row'], dict) else None
+            self.errors_file.write(json.dumps({'line': item['line'], 'row': row, 'errors': item['errors']},
+                                              ensure_ascii=False, default=str) + '\n')
+        self.errors_file.flush()
+
+        checkpoint['position'] += len(items)
+        checkpoint['imported'] += len(users)
+        checkpoint['failed'] += len(failed)
+        with open(f'{checkpoint_path}.tmp', 'w') as file:
+            json.dump(checkpoint, file)
+        os.replace(f'{checkpoint_path}.tmp', checkpoint_path)
+
+        self.stdout.write(f'Line {last_line}: {checkpoint["imported"]} imported, {checkpoint["failed"]} rejected')
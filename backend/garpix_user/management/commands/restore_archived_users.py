@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError
+
+from garpix_user.models import ArchivedUser
+
+
+class Command(BaseCommand):
+    help = 'Restores archived users (with their password history and session) back to the user table'
+
+    def add_arguments(self, parser):
+        parser.add_argument('user_ids', nargs='*', type=int, help='Original ids of the users')
+        parser.add_argument('--username', action='append', default=[], help='Username of the user, can be repeated')
+        parser.add_argument('--activate', action='store_true',
+                            help='Also undo the soft delete, otherwise users come back as deleted')
+
+    def handle(self, *args, **options):
+        if not options['user_ids'] and not options['username']:
+            raise CommandError('Pass user ids or --username')
+
+        archived_users = ArchivedUser.objects.filter(user_id__in=options['user_ids']) | \
+            ArchivedUser.objects.filter(username__in=options['username'])
+
+        restored, failed = 0, 0
+        for archived_user in archived_users:
+            try:
+                user = archived_user.restore(activate=options['activate'])
+            except IntegrityError as e:
+                # the username, email or phone was taken by another user since archiving
+                self.stderr.write(f'Could not restore user {archived_user.user_id} {archived_user}: {e}')
+                failed += 1
+                continue
+            self.stdout.write(f'Restored user {user.pk} {archived_user}')
+            restored += 1
+
+        self.stdout.write(self.style.SUCCESS(f'Restored {restored} user(s)'))
+        if failed:
+            self.stdout.write(self.style.ERROR(f'Failed to restore {failed} user(s)'))
@@ -0,0 +1,2 @@
+from .performance import EstimatedCountPaginator, PerformanceAdminMixin  # noqa
+from .bulk_actions import BulkActionAdminMixin, format_pk_ranges  # noqa
@@ -0,0 +1,48 @@
+from garpix_utils.logs.enums.get_enums import ActionResult
+from garpix_utils.logs.services.logger_iso import LoggerIso
+
+from garpix_user.utils.audit_log import ib_logger
+
+
+def format_pk_ranges(pks):
+    """
+    Collapses ids into ranges, e.g. [1, 2, 3, 7] -> '1-3,7', so a record for a large selection stays short
+    """
+    ranges = []
+    for pk in sorted(pks):
+        if ranges and pk == ranges[-1][1] + 1:
+            ranges[-1][1] = pk
+        else:
+            ranges.append([pk, pk])
+    return ','.join(str(first) if first == last else f'{first}-{last}' for first, last in ranges)
+
+
+class BulkActionAdminMixin:
+    """
+    Admin actions over a whole selection: the change itself is one set-based query,
+    the IB log gets one record per action listing the affected ids
+    """
+
+    @staticmethod
+    def get_selected_pks(queryset):
+        return list(queryset.order_by().values_list('pk', flat=True))
+
+    @staticmethod
+    def log_bulk_action(request, action, model, pks, msg):
+        if not pks:
+            return
+        log = ib_logger.create_log(action=action,
+                                   obj=model.__name__,
+                                   obj_address=request.path,
+                                   result=ActionResult.success,
+                                   sbj=request.user.username,
+                                   params=f'id: {format_pk_ranges(pks)}',
+                                   sbj_address=LoggerIso.get_client_ip(request),
+                                   msg=f'{msg} ({len(pks)})')
+        ib_logger.write_string(log)
+
+    def update_selected(self, request, queryset, action, msg, **values):
+        pks = self.get_selected_pks(queryset)
+        updated = queryset.model.objects.filter(pk__in=queryset.order_by().values('pk')).update(**values)
+        self.log_bulk_action(request, action, queryset.model, pks, msg)
+        return updated
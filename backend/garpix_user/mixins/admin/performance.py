@@ -0,0 +1,112 @@
+import json
+
+from django.conf import settings
+from django.contrib.admin.views.main import ORDER_VAR
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+from garpix_user.models import UserIdentifier
+
+
+def is_admin_performance_mode():
+    return settings.GARPIX_USER.get('ADMIN_PERFORMANCE_MODE', False)
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    On Postgres takes the row count from pg_class statistics for a whole table and from the planner estimate
+    for a filtered queryset instead of running COUNT(*); estimates below ADMIN_ESTIMATED_COUNT_THRESHOLD are
+    replaced by the exact count, which is cheap there
+    """
+
+    def get_estimate(self, connection):
+        queryset = self.object_list
+        with connection.cursor() as cursor:
+            if not queryset.query.where:
+                cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass',
+                               [queryset.model._meta.db_table])
+                return cursor.fetchone()[0]
+            sql, params = queryset.order_by().values('pk').query.sql_with_params()
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+            plan = cursor.fetchone()[0]
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            return plan[0]['Plan']['Plan Rows']
+
+    @cached_property
+    def count(self):
+        connection = connections[self.object_list.db]
+        if connection.vendor == 'postgresql':
+            estimate = self.get_estimate(connection)
+            if estimate >= settings.GARPIX_USER.get('ADMIN_ESTIMATED_COUNT_THRESHOLD', 100000):
+                return estimate
+        return super().count
+
+
+class PerformanceAdminMixin:
+    """
+    With ADMIN_PERFORMANCE_MODE the changelist uses estimated counts, skips the full result count,
+    pages by a primary key cursor and searches users by the indexed UserIdentifier values only.
+    `identifier_search_prefix` is the path from the model to the user ('' for the user model itself).
+    """
+
+    keyset_param = 'before'
+    identifier_search_prefix = None
+
+    @property
+    def show_full_result_count(self):
+        return not is_admin_performance_mode()
+
+    def get_paginator(self, request, queryset, per_page, orphans=0, allow_empty_first_page=True):
+        if is_admin_performance_mode():
+            return EstimatedCountPaginator(queryset, per_page, orphans, allow_empty_first_page)
+        return super().get_paginator(request, queryset, per_page, orphans, allow_empty_first_page)
+
+    def get_ordering(self, request):
+        if is_admin_performance_mode():
+            return ['-pk']
+        return super().get_ordering(request)
+
+    def get_search_fields(self, request):
+        if is_admin_performance_mode() and self.identifier_search_prefix is not None:
+            # only makes the changelist render the search box, the lookup itself is in get_search_results
+            return [f'{self.identifier_search_prefix}username']
+        return super().get_search_fields(request)
+
+    def get_search_results(self, request, queryset, search_term):
+        if is_admin_performance_mode() and self.identifier_search_prefix is not None:
+            if not search_term:
+                return queryset, False
+            return queryset.filter(UserIdentifier.user_filter(
+                search_term, fields=UserIdentifier.KIND.values, prefix=self.identifier_search_prefix)), False
+        return super().get_search_results(request, queryset, search_term)
+
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        before = getattr(request, 'keyset_before', None)
+        if before is not None:
+            queryset = queryset.filter(pk__lt=before)
+        return queryset
+
+    def changelist_view(self, request, extra_context=None):
+        if is_admin_performance_mode():
+            # the cursor is not a lookup, so it is taken out of GET before the changelist validates the params
+            before = request.GET.get(self.keyset_param, '')
+            if before:
+                request.GET = request.GET.copy()
+                del request.GET[self.keyset_param]
+                if before.isdigit():
+                    request.keyset_before = int(before)
+            extra_context = dict(extra_context or {}, keyset_pagination=True, keyset_param=self.keyset_param)
+
+        response = super().changelist_view(request, extra_context)
+
+        cl = getattr(response, 'context_data', {}).get('cl') if is_admin_performance_mode() else None
+        if cl is not None and ORDER_VAR not in cl.params:
+            # evaluates the page once, the template reuses the cached rows
+            results = list(cl.result_list)
+            # a full page is followed by another only if older rows remain, otherwise the last link is an empty page
+            if len(results) >= cl.list_per_page and cl.queryset.filter(pk__lt=results[-1].pk).exists():
+                response.context_data['keyset_next'] = results[-1].pk
+        return response
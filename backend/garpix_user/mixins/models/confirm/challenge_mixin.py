@@ -0,0 +1,107 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import F
+
+from garpix_user.utils.current_date import set_current_date
+
+
+class ConfirmationChallengeMixin:
+    """
+    Миксин для хранения кодов подтверждения в ConfirmationChallenge
+    """
+
+    @classmethod
+    def get_challenge_subject_type(cls):
+        from garpix_user.models import ConfirmationChallenge, UserSession
+
+        if issubclass(cls, UserSession):
+            return ConfirmationChallenge.SUBJECT_TYPE.USER_SESSION
+        return ConfirmationChallenge.SUBJECT_TYPE.USER
+
+    def _get_challenges_cache(self):
+        if not hasattr(self, '_challenges'):
+            self._challenges = {}
+        return self._challenges
+
+    def get_challenge(self, channel):
+        from garpix_user.models import ConfirmationChallenge
+
+        challenges = self._get_challenges_cache()
+        if channel not in challenges:
+            challenges[channel] = ConfirmationChallenge.objects.filter(
+                subject_type=self.get_challenge_subject_type(),
+                subject_id=self.pk,
+                channel=channel
+            ).first() if self.pk is not None else None
+        return challenges[channel]
+
+    def issue_challenge(self, channel, code, target, lifetime, link_hash=None):
+        from garpix_user.models import ConfirmationChallenge
+
+        sent_at = set_current_date()
+        challenge, _created = ConfirmationChallenge.objects.update_or_create(
+            subject_type=self.get_challenge_subject_type(),
+            subject_id=self.pk,
+            channel=channel,
+            defaults={
+                'code': code,
+                'target': target or '',
+                'link_hash': link_hash,
+                'attempts': 0,
+                'is_confirmed': False,
+                'sent_at': sent_at,
+                'expires_at': sent_at + lifetime,
+            }
+        )
+        self._get_challenges_cache()[channel] = challenge
+        return challenge
+
+    def drop_challenge(self, channel):
+        from garpix_user.models import ConfirmationChallenge
+
+        ConfirmationChallenge.objects.filter(
+            subject_type=self.get_challenge_subject_type(),
+            subject_id=self.pk,
+            channel=channel
+        ).delete()
+        self._get_challenges_cache()[channel] = None
+
+    def take_challenge_attempt(self, challenge):
+        """
+        Counts a check of the code with a conditional UPDATE, so parallel requests of any worker can't make more than
+        CONFIRM_CODE_MAX_ATTEMPTS checks. Returns False when the limit is reached, the code stays rejected until
+        a new one is issued.
+        """
+        from garpix_user.models import ConfirmationChallenge
+
+        max_attempts = settings.GARPIX_USER.get('CONFIRM_CODE_MAX_ATTEMPTS', 5)
+        if max_attempts == -1:
+            return True
+
+        if not ConfirmationChallenge.objects.filter(pk=challenge.pk, attempts__lt=max_attempts).update(
+                attempts=F('attempts') + 1):
+            return False
+        challenge.attempts += 1
+        return True
+
+    def _check_challenge_request_time(self, channel, default_time_last_request=None):
+        """
+        Resend throttling: the send date of the pending code is moved with a conditional UPDATE,
+        so only the first request within TIME_LAST_REQUEST minutes passes
+        """
+        from garpix_user.models import ConfirmationChallenge
+
+        time_last_request = settings.GARPIX_USER.get('TIME_LAST_REQUEST', default_time_last_request)
+        if not time_last_request:
+            return True
+
+        now = set_current_date()
+        challenges = ConfirmationChallenge.objects.filter(
+            subject_type=self.get_challenge_subject_type(),
+            subject_id=self.pk,
+            channel=channel
+        )
+        if challenges.filter(sent_at__lte=now - timedelta(minutes=time_last_request)).update(sent_at=now):
+            return True
+        return not challenges.exists()
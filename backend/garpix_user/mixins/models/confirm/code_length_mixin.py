@@ -1,3 +1,5 @@
+from datetime import timedelta
+
 from django.conf import settings
 
 
@@ -16,5 +18,16 @@ class CodeLengthMixin:
 
         return code_length
 
+    def get_confirm_code_lifetime(self, type='email'):
+        GARPIX_USER_SETTINGS = getattr(settings, "GARPIX_USER", {})
+
+        if type == 'email':
+            life_time = GARPIX_USER_SETTINGS.get('CONFIRM_EMAIL_CODE_LIFE_TIME', 6)
+            if GARPIX_USER_SETTINGS.get('CONFIRM_EMAIL_CODE_LIFE_TIME_TYPE', 'days') == 'days':
+                return timedelta(days=life_time)
+            return timedelta(minutes=life_time)
+
+        return timedelta(minutes=GARPIX_USER_SETTINGS.get('CONFIRM_PHONE_CODE_LIFE_TIME', 6))
+
     class Meta:
         abstract = True
@@ -1,131 +1,131 @@
 import string
 
 from django.conf import settings
-from django.db import models
+from django.db import models, transaction
 from datetime import datetime, timedelta
 
 from django.urls import reverse
 from django.utils.translation import gettext_lazy as _
-import hashlib
 from garpix_utils.string import get_random_string
 
+from garpix_user.mixins.models.confirm.challenge_mixin import ConfirmationChallengeMixin
 from garpix_user.mixins.models.confirm.code_length_mixin import CodeLengthMixin
 from garpix_user.utils.current_date import set_current_date
 
 
-class UserEmailConfirmMixin(CodeLengthMixin, models.Model):
+class UserEmailConfirmMixin(ConfirmationChallengeMixin, CodeLengthMixin, models.Model):
     """
     Миксин для подтверждения email
     """
 
-    email_confirmation_code = models.CharField(_("Email confirmation code"), max_length=255, blank=True,
-                                               null=True)
-    email_code_send_date = models.DateTimeField(_("Code sent date"), blank=True, null=True)
     email_confirmed_date = models.DateTimeField(_("Date email was confirmed"), blank=True, null=True)
-    new_email = models.EmailField(_("New email"), blank=True, null=True)
+
+    @property
+    def email_confirmation_code(self):
+        from garpix_user.models import ConfirmationChallenge
+
+        challenge = self.get_challenge(ConfirmationChallenge.CHANNEL.EMAIL)
+        return challenge.code if challenge else None
 
     def send_email_confirmation_link(self):
-        from garpix_notify.models import Notify
-        from garpix_user.models import UserSession
+        from garpix_user.models import ConfirmationChallenge, NotificationOutbox, UserSession
         from django.contrib.auth import get_user_model
 
         User = get_user_model()
 
+        challenge = self.get_challenge(ConfirmationChallenge.CHANNEL.EMAIL)
+
         model_type = 'user_session' if isinstance(self, UserSession) else 'user'
-        hash = str(
-            hashlib.sha512(f'{self.email}+{self.email_confirmation_code}'.encode("utf-8")).hexdigest()).lower()
-        Notify.send(settings.EMAIL_LINK_CONFIRMATION_EVENT, {
-            'confirmation_link': User.confirm_link_redirect_url(model_type, hash)
-        }, email=self.new_email)
+        NotificationOutbox.send(settings.EMAIL_LINK_CONFIRMATION_EVENT, {
+            'confirmation_link': User.confirm_link_redirect_url(model_type, challenge.link_hash)
+        }, email=challenge.target)
+
+    def issue_email_challenge(self, email):
+        from garpix_user.models import ConfirmationChallenge
+
+        confirmation_code = get_random_string(self.get_confirm_code_length('email'), string.digits)
+
+        return self.issue_challenge(
+            ConfirmationChallenge.CHANNEL.EMAIL,
+            confirmation_code,
+            email,
+            self.get_confirm_code_lifetime('email'),
+            link_hash=ConfirmationChallenge.make_link_hash(email, confirmation_code)
+        )
 
     def send_email_confirmation_code(self, email=None):
         from django.contrib.auth import get_user_model
         from garpix_user.exceptions import UserRegisteredException, WaitException
-        from garpix_notify.models import Notify
-        from garpix_user.models import UserSession
+        from garpix_user.models import ConfirmationChallenge, NotificationOutbox
+        from garpix_user.utils.registered_identifiers import is_identifier_registered
 
         User = get_user_model()
 
-        anybody_have_this_email = User.objects.filter(email=email)
-        if isinstance(self, User):
-            anybody_have_this_email = anybody_have_this_email.exclude(id=self.id)
-        if anybody_have_this_email.count() > 0:
+        if not self._check_challenge_request_time(ConfirmationChallenge.CHANNEL.EMAIL):
+            return WaitException()
+
+        if is_identifier_registered('email', email, exclude_pk=self.id if isinstance(self, User) else None):
             return UserRegisteredException(field='email', extra_data={
                 'field': self._meta.get_field('email').verbose_name.title().lower()})
 
-        if settings.GARPIX_USER.get('TIME_LAST_REQUEST', None):
-            if self.email_code_send_date and self.email_code_send_date + timedelta(
-                    minutes=settings.GARPIX_USER.get('TIME_LAST_REQUEST')) >= datetime.now(
-                self.email_code_send_date.tzinfo):
-                return WaitException()
-
-        confirmation_code = get_random_string(self.get_confirm_code_length('email'), string.digits)
-
-        if isinstance(self, UserSession):
-            self.email = email
+        with transaction.atomic():
+            challenge = self.issue_email_challenge(email or self.email)
 
-        self.new_email = email or self.email
-
-        self.email_confirmation_code = confirmation_code
-
-        self.email_code_send_date = set_current_date()
-
-        self.save()
-
-        if settings.GARPIX_USER.get('USE_EMAIL_LINK_CONFIRMATION', True):
-            self.send_email_confirmation_link()
-        else:
-            Notify.send(settings.EMAIL_CONFIRMATION_EVENT, {
-                'confirmation_code': confirmation_code
-            }, email=self.new_email)
+            if settings.GARPIX_USER.get('USE_EMAIL_LINK_CONFIRMATION', True):
+                self.send_email_confirmation_link()
+            else:
+                NotificationOutbox.send(settings.EMAIL_CONFIRMATION_EVENT, {
+                    'confirmation_code': challenge.code
+                }, email=challenge.target)
 
         return True
 
     def confirm_email(self, email_confirmation_code):
-        from garpix_user.exceptions import IncorrectCodeException, NoTimeLeftException
+        from garpix_user.exceptions import IncorrectCodeException, NoTimeLeftException, TooManyAttemptsException
+        from garpix_user.models import ConfirmationChallenge
 
-        if self.email_confirmation_code != email_confirmation_code:
-            return IncorrectCodeException(field='email_confirmation_code')
+        challenge = self.get_challenge(ConfirmationChallenge.CHANNEL.EMAIL)
 
-        datediff = datetime.now(self.email_code_send_date.tzinfo) - self.email_code_send_date
-        datediff = datediff.days if settings.GARPIX_USER.get('CONFIRM_EMAIL_CODE_LIFE_TIME_TYPE',
-                                                             'days') == 'days' else datediff.seconds / 60
+        if challenge is not None and not self.take_challenge_attempt(challenge):
+            return TooManyAttemptsException(field='email_confirmation_code')
 
-        time_is_up = datediff > settings.GARPIX_USER.get(
-            'CONFIRM_EMAIL_CODE_LIFE_TIME', 6)
+        if challenge is None or challenge.code != email_confirmation_code:
+            return IncorrectCodeException(field='email_confirmation_code')
 
-        if time_is_up:
+        if challenge.is_expired():
             return NoTimeLeftException(field='email_confirmation_code')
 
         self.is_email_confirmed = True
-        self.email = self.new_email
-        self.email_confirmation_code = None
+        self.email = challenge.target
         self.email_confirmed_date = set_current_date()
-        self.save()
+        self.save(update_fields=['is_email_confirmed', 'email', 'email_confirmed_date'])
+        self.drop_challenge(ConfirmationChallenge.CHANNEL.EMAIL)
         return True
 
     @classmethod
     def confirm_email_by_link(cls, hash):
         from garpix_user.exceptions import IncorrectCodeException, NoTimeLeftException
+        from garpix_user.models import ConfirmationChallenge
+
+        challenge = ConfirmationChallenge.objects.filter(
+            link_hash=hash.lower(),
+            subject_type=cls.get_challenge_subject_type(),
+            channel=ConfirmationChallenge.CHANNEL.EMAIL
+        ).first() if hash else None
+
+        user = cls.objects.filter(pk=challenge.subject_id).first() if challenge else None
+
+        if user is None:
+            return False, IncorrectCodeException(field='email_confirmation_code')
+
+        if challenge.is_expired():
+            return False, NoTimeLeftException(field='email_confirmation_code')
 
-        users_list = cls.objects.all()
-
-        for user in users_list:
-            if str(hashlib.sha512(
-                    f'{user.email}+{user.email_confirmation_code}'.encode("utf-8")).hexdigest()).lower() == hash:
-                datediff = datetime.now(user.email_code_send_date.tzinfo) - user.email_code_send_date
-                datediff = datediff.days if settings.GARPIX_USER.get('CONFIRM_EMAIL_CODE_LIFE_TIME_TYPE',
-                                                                     'days') == 'days' else datediff.seconds / 60
-                time_is_up = datediff > settings.GARPIX_USER.get('CONFIRM_EMAIL_CODE_LIFE_TIME', 6)
-                if time_is_up:
-                    return False, NoTimeLeftException(field='email_confirmation_code')
-                user.is_email_confirmed = True
-                user.email = user.new_email or user.email
-                # user.email_confirmation_code = None
-                user.save()
-                return True, user
-
-        return False, IncorrectCodeException(field='email_confirmation_code')
+        user.is_email_confirmed = True
+        user.email = challenge.target or user.email
+        user.email_confirmed_date = set_current_date()
+        user.save(update_fields=['is_email_confirmed', 'email', 'email_confirmed_date'])
+        return True, user
 
     def check_email_confirmation(self):
         return self.is_email_confirmed and self.email_confirmed_date and self.email_confirmed_date + timedelta(
@@ -1,28 +1,38 @@
+from datetime import timedelta
+
 from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core import signing
 from django.db import models, transaction
 from django.db.models import Q
+from django.utils.crypto import salted_hmac
 from django.utils.translation import gettext as _
 from garpix_utils.string import get_random_string
 import string
-from datetime import datetime, timezone, timedelta
 
 from garpix_user.exceptions import NotConfirmedException
-from garpix_user.exceptions import IncorrectCodeException, NoTimeLeftException, WaitException, UserUnregisteredException
+from garpix_user.exceptions import IncorrectCodeException, NoTimeLeftException, WaitException, UserUnregisteredException, \
+    TooManyAttemptsException
+from garpix_user.mixins.models.confirm.challenge_mixin import ConfirmationChallengeMixin
+from garpix_user.mixins.models.confirm.code_length_mixin import CodeLengthMixin
+
+RESTORE_TICKET_SALT = 'garpix_user.restore_password'
 
 
-class RestorePasswordMixin(models.Model):
+class RestorePasswordMixin(ConfirmationChallengeMixin, CodeLengthMixin, models.Model):
     class RESTORE_BY(models.TextChoices):
         PHONE = ('phone', _('Phone number'))
         EMAIL = ('email', _('Email'))
 
-    restore_password_confirm_code = models.CharField(_('Restore password code'),
-                                                     max_length=15, null=True, blank=True)
-    is_restore_code_confirmed = models.BooleanField(_('Restore code confirmed'), blank=True, default=False)
-    restore_date = models.DateTimeField(_('Restore code sent date'), null=True)
-    restore_by = models.CharField(choices=RESTORE_BY.choices, default=RESTORE_BY.EMAIL, max_length=5)
+    @property
+    def restore_password_confirm_code(self):
+        from garpix_user.models import ConfirmationChallenge
+
+        challenge = self.get_challenge(ConfirmationChallenge.CHANNEL.RESTORE_PASSWORD)
+        return challenge.code if challenge else None
 
     def _check_and_get_user(self, username):
+        from garpix_user.models import UserIdentifier
 
         User = get_user_model()
 
@@ -30,13 +40,9 @@ class RestorePasswordMixin(models.Model):
 
         kk_filter = Q(keycloak_auth_only=False)
 
-        username_filters = Q()
-
-        for field in USERNAME_FIELDS:
-            _username_data = {field: username}
-            if field != 'username':
-                _username_data.update({f'is_{field}_confirmed': True})
-                username_filters |= Q(**_username_data)
+        # restore codes are only sent to a confirmed email or phone
+        username_filters = UserIdentifier.user_filter(
+            username, fields=[field for field in USERNAME_FIELDS if field != 'username'], confirmed=True)
 
         if user := User.active_objects.filter(kk_filter & username_filters).first():
             return True, user
@@ -45,78 +51,124 @@ class RestorePasswordMixin(models.Model):
                                                 extra_data={'value': username})
 
     def _check_request_time(self):
+        from garpix_user.models import ConfirmationChallenge
 
-        if (TIME_LAST_REQUEST := settings.GARPIX_USER.get('TIME_LAST_REQUEST', 1)) and (
-                restore_date := self.restore_date):
-            if restore_date + timedelta(minutes=TIME_LAST_REQUEST) >= datetime.now(restore_date.tzinfo):
-                return False, WaitException()
+        if not self._check_challenge_request_time(ConfirmationChallenge.CHANNEL.RESTORE_PASSWORD,
+                                                  default_time_last_request=1):
+            return False, WaitException()
 
         return True, None
 
-    def _time_is_up(self):
-        datediff = datetime.now(self.restore_date.tzinfo) - self.restore_date
+    @classmethod
+    def _get_restore_channel(cls, user, username):
+        from garpix_user.models import UserIdentifier
 
-        if self.restore_by == self.RESTORE_BY.EMAIL:
-            datediff = datediff.days if settings.GARPIX_USER.get('CONFIRM_EMAIL_CODE_LIFE_TIME_TYPE',
-                                                                 'days') == 'days' else datediff.seconds / 60
-            return datediff > settings.GARPIX_USER.get(
-                'CONFIRM_EMAIL_CODE_LIFE_TIME', 6)
-        return datediff.seconds / 60 > settings.GARPIX_USER.get(
-            'CONFIRM_PHONE_CODE_LIFE_TIME', 6)
+        if 'email' in user.USERNAME_FIELDS and UserIdentifier.normalize(
+                UserIdentifier.KIND.EMAIL, user.email) == UserIdentifier.normalize(UserIdentifier.KIND.EMAIL, username):
+            return cls.RESTORE_BY.EMAIL
+        return cls.RESTORE_BY.PHONE
 
     def send_restore_code(self, username=None):
-        from garpix_notify.models import Notify
+        from garpix_user.models import ConfirmationChallenge, NotificationOutbox
 
+        result, error = self._check_request_time()
+        if not result:
+            return result, error
         result, data = self._check_and_get_user(username)
         if not result:
             return result, data
         user = data
-        result, error = self._check_request_time()
-        if not result:
-            return result, error
 
         confirmation_code = get_random_string(settings.GARPIX_USER.get('CONFIRM_CODE_LENGTH', 6), string.digits)
 
-        self.restore_password_confirm_code = confirmation_code
-        self.restore_date = datetime.now(timezone.utc)
-        self.is_restore_code_confirmed = False
-
-        if user.email == username and 'email' in user.USERNAME_FIELDS:
-            Notify.send(settings.RESTORE_PASSWORD_EMAIL_EVENT, {
-                'user': user,
-                'restore_code': self.restore_password_confirm_code
-            }, email=user.email)
-            self.restore_by = self.RESTORE_BY.EMAIL
-            self.email = username
-        elif 'phone' in user.USERNAME_FIELDS:
-            Notify.send(settings.RESTORE_PASSWORD_PHONE_EVENT, {
-                'user': user,
-                'restore_code': self.restore_password_confirm_code
-            }, phone=user.phone)
-            self.restore_by = self.RESTORE_BY.PHONE
-            self.phone = username
-
-        self.save()
+        restore_by_email = self._get_restore_channel(user, username) == self.RESTORE_BY.EMAIL
+
+        with transaction.atomic():
+            self.issue_challenge(
+                ConfirmationChallenge.CHANNEL.RESTORE_PASSWORD,
+                confirmation_code,
+                username,
+                self.get_confirm_code_lifetime('email' if restore_by_email else 'phone')
+            )
+
+            if restore_by_email:
+                NotificationOutbox.send(settings.RESTORE_PASSWORD_EMAIL_EVENT, {
+                    'user': user,
+                    'restore_code': confirmation_code
+                }, email=user.email)
+            elif 'phone' in user.USERNAME_FIELDS:
+                NotificationOutbox.send(settings.RESTORE_PASSWORD_PHONE_EVENT, {
+                    'user': user,
+                    'restore_code': confirmation_code
+                }, phone=user.phone)
 
         return True, None
 
     def check_restore_code(self, username, restore_password_confirm_code=None):
+        from garpix_user.models import ConfirmationChallenge
 
-        if getattr(self,
-                   self.restore_by) != username or self.restore_password_confirm_code != restore_password_confirm_code:
-            return False, IncorrectCodeException(field='restore_password_confirm_code')
+        challenge = self.get_challenge(ConfirmationChallenge.CHANNEL.RESTORE_PASSWORD)
+
+        if challenge is not None and not self.take_challenge_attempt(challenge):
+            return False, TooManyAttemptsException(field='restore_password_confirm_code')
 
-        time_is_up = self._time_is_up()
+        if challenge is None or challenge.target != username or challenge.code != restore_password_confirm_code:
+            return False, IncorrectCodeException(field='restore_password_confirm_code')
 
-        if time_is_up:
+        if challenge.is_expired():
             return False, NoTimeLeftException(field='restore_password_confirm_code')
 
-        self.is_restore_code_confirmed = True
-        self.save()
+        if settings.GARPIX_USER.get('USE_RESTORE_PASSWORD_TICKET', False):
+            result, data = self._check_and_get_user(username)
+            if not result:
+                return result, data
+            self.drop_challenge(ConfirmationChallenge.CHANNEL.RESTORE_PASSWORD)
+            return True, self.create_restore_ticket(data, self._get_restore_channel(data, username))
+
+        ConfirmationChallenge.objects.filter(pk=challenge.pk).update(is_confirmed=True)
+        challenge.is_confirmed = True
+
+        return True, None
+
+    @staticmethod
+    def _get_password_fingerprint(user):
+        # changes with the password, so a ticket can not be used twice
+        return salted_hmac(RESTORE_TICKET_SALT, user.password).hexdigest()[:16]
+
+    @classmethod
+    def create_restore_ticket(cls, user, channel):
+        return signing.dumps({
+            'user': user.pk,
+            'channel': channel,
+            'password': cls._get_password_fingerprint(user),
+        }, salt=RESTORE_TICKET_SALT)
+
+    @classmethod
+    def restore_password_by_ticket(cls, restore_ticket, new_password):
+        """
+        Third restore step without a user session: the signed ticket from check_restore_code identifies the user
+        """
+        User = get_user_model()
 
+        try:
+            data = signing.loads(restore_ticket, salt=RESTORE_TICKET_SALT, max_age=timedelta(
+                minutes=settings.GARPIX_USER.get('RESTORE_PASSWORD_TICKET_LIFE_TIME', 10)))
+        except signing.SignatureExpired:
+            return False, NoTimeLeftException(field='restore_ticket')
+        except signing.BadSignature:
+            return False, IncorrectCodeException(field='restore_ticket')
+
+        user = User.active_objects.filter(pk=data.get('user'), keycloak_auth_only=False).first()
+        if user is None or cls._get_password_fingerprint(user) != data.get('password'):
+            return False, IncorrectCodeException(field='restore_ticket')
+
+        user.set_password(new_password)
+        user.save()
         return True, None
 
     def restore_password(self, new_password, username, restore_password_confirm_code=None):
+        from garpix_user.models import ConfirmationChallenge
+
         User = get_user_model()
 
         USERNAME_FIELDS = getattr(User, 'USERNAME_FIELDS', ('email',))
@@ -124,12 +176,11 @@ class RestorePasswordMixin(models.Model):
         field_name = '/'.join([User._meta.get_field(
             field).verbose_name.title().lower() for field in USERNAME_FIELDS]).rstrip('/')
 
-        if self.is_restore_code_confirmed and restore_password_confirm_code == self.restore_password_confirm_code and getattr(
-                self, self.restore_by) == username:
+        challenge = self.get_challenge(ConfirmationChallenge.CHANNEL.RESTORE_PASSWORD)
 
-            time_is_up = self._time_is_up()
+        if challenge is not None and challenge.is_confirmed and restore_password_confirm_code == challenge.code and challenge.target == username:
 
-            if time_is_up:
+            if challenge.is_expired():
                 return False, NoTimeLeftException(field='restore_password_confirm_code')
 
             result, data = self._check_and_get_user(username)
@@ -140,8 +191,7 @@ class RestorePasswordMixin(models.Model):
                 user = data
                 user.set_password(new_password)
                 user.save()
-                self.is_restore_code_confirmed = False
-                self.save()
+                self.drop_challenge(ConfirmationChallenge.CHANNEL.RESTORE_PASSWORD)
             return True, None
         return False, NotConfirmedException(
             extra_data={'field': field_name})
@@ -1,3 +1,5 @@
+import functools
+
 from django.contrib.auth.password_validation import CommonPasswordValidator, MinimumLengthValidator, \
     UserAttributeSimilarityValidator
 from rest_framework import serializers
@@ -8,15 +10,21 @@ from garpix_user.utils.get_password_settings import get_password_settings
 from garpix_user.utils.repluralize import rupluralize
 
 
+@functools.lru_cache(maxsize=None)
+def get_common_password_validator():
+    # reads and unpacks the password list once per process instead of on every check
+    return CommonPasswordValidator()
+
+
 class PasswordSerializerMixin:
 
-    def _validate_password(self, value):
+    def _validate_password(self, value, password_settings=None):
 
-        password_settings = get_password_settings()
+        password_settings = password_settings or get_password_settings()
 
         UserAttributeSimilarityValidator().validate(value)
         MinimumLengthValidator(min_length=password_settings['min_length']).validate(value)
-        CommonPasswordValidator().validate(value)
+        get_common_password_validator().validate(value)
 
         # check for min digits number
         password_digits_num = sum(c.isdigit() for c in value)
@@ -2,6 +2,13 @@ from .refresh_token import RefreshToken  # noqa
 from .access_token import AccessToken  # noqa
 from .user_session import UserSession # noqa
 from .refferal import ReferralType, ReferralUserLink  # noqa
+from .referral_stat import ReferralStat, ReferralStatState  # noqa
+from .user_identifier import UserIdentifier  # noqa
 from .user import GarpixUser  # noqa
 from .site_config import GarpixUserPasswordConfiguration  # noqa
 from .password_history import PasswordHistory  # noqa
+from .confirmation_challenge import ConfirmationChallenge  # noqa
+from .notification_outbox import NotificationOutbox  # noqa
+from .task_run import TaskRun  # noqa
+from .archived_user import ArchivedUser  # noqa
+from .audit_event import AuditEvent  # noqa
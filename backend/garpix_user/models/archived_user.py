@@ -0,0 +1,92 @@
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.core import serializers
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models, transaction
+from django.utils.translation import gettext_lazy as _
+
+
+class ArchivedUser(models.Model):
+    """
+    Удаленный пользователь, перенесенный из рабочих таблиц вместе с историей паролей и сессией.
+    Восстанавливается командой restore_archived_users
+    """
+
+    user_id = models.BigIntegerField(_('User id'), unique=True)
+    username = models.CharField(_('Username'), max_length=150, blank=True, default='')
+    email = models.CharField(_('Email'), max_length=254, blank=True, default='')
+    phone = models.CharField(_('Phone number'), max_length=32, blank=True, default='')
+    deleted_at = models.DateTimeField(_('Deleted at'), blank=True, null=True)
+    archived_at = models.DateTimeField(_('Archived at'), auto_now_add=True)
+    data = models.JSONField(_('Data'), encoder=DjangoJSONEncoder)
+
+    class Meta:
+        verbose_name = _('Архивный пользователь | Archived user')
+        verbose_name_plural = _('Архивные пользователи | Archived users')
+
+    def __str__(self):
+        return self.username or self.email or self.phone or str(self.user_id)
+
+    @classmethod
+    def archive_users(cls, pks):
+        """
+        Moves the users with given pks into the archive and hard-deletes them with everything that cascades.
+        Archived: the user with its groups and permissions, password history, user session with referral links
+        and social auth links. Lost: auth, oauth and garpix_user tokens, oauth applications and grants, FCM devices
+        and admin log entries of the user; garpix_notify notifications are kept with the user cleared.
+        """
+        from garpix_user.models import ConfirmationChallenge, PasswordHistory, ReferralUserLink, UserSession
+
+        User = get_user_model()
+
+        with transaction.atomic():
+            users = list(User.objects.select_for_update().filter(pk__in=pks).prefetch_related(
+                'groups', 'user_permissions'))
+            sessions = list(UserSession.objects.filter(user__in=users))
+            session_users = {session.pk: session.user_id for session in sessions}
+
+            # the user goes first, then the rows referencing it, so restore can insert them in this order;
+            # tokens are not archived, they are expired or useless after restore anyway
+            rows = [(user.pk, user) for user in users]
+            rows += [(history.user_id, history) for history in PasswordHistory.objects.filter(user__in=users)]
+            rows += [(session.user_id, session) for session in sessions]
+            rows += [(session_users[link.user_id], link) for link in ReferralUserLink.objects.filter(user__in=sessions)]
+            if apps.is_installed('social_django'):
+                UserSocialAuth = apps.get_model('social_django', 'UserSocialAuth')
+                rows += [(social.user_id, social) for social in UserSocialAuth.objects.filter(user__in=users)]
+
+            data = {user.pk: [] for user in users}
+            for user_id, obj in rows:
+                data[user_id] += serializers.serialize('python', [obj])
+
+            cls.objects.bulk_create([cls(
+                user_id=user.pk,
+                username=user.username or '',
+                email=user.email or '',
+                phone=str(user.phone or ''),
+                deleted_at=user.deleted_at,
+                data=data[user.pk]
+            ) for user in users])
+
+            User.objects.filter(pk__in=[user.pk for user in users]).delete()
+            ConfirmationChallenge.objects.filter(
+                subject_type=ConfirmationChallenge.SUBJECT_TYPE.USER, subject_id__in=pks).delete()
+        return len(users)
+
+    def restore(self, activate=False):
+        """
+        Puts the user and the archived rows back with their original ids
+        """
+        from garpix_user.models import UserIdentifier
+
+        with transaction.atomic():
+            user = None
+            for obj in serializers.deserialize('python', self.data):
+                if user is None:
+                    user = obj.object
+                    if activate:
+                        user.is_deleted, user.is_active, user.deleted_at = False, True, None
+                obj.save()
+            UserIdentifier.sync_user(user)
+            self.delete()
+        return user
@@ -0,0 +1,77 @@
+import re
+
+from django.conf import settings
+from django.db import models
+from django.utils.dateparse import parse_datetime
+from django.utils.translation import gettext_lazy as _
+
+
+class AuditEvent(models.Model):
+    """
+    Событие журнала ИБ, продублированное из файла в индексируемую таблицу
+    """
+
+    FIELD_RE = re.compile(r'(?:^| \| )(\w+)\s?=\s?("(?:.*?)"|[^|]*?)(?= \| \w+\s?=|$)', re.DOTALL)
+    FIELDS = {
+        'act': 'action',
+        'sbj': 'subject',
+        'sbj_addr': 'subject_address',
+        'act_type': 'action_type',
+        'lvl': 'level',
+        'obj': 'object',
+        'obj_addr': 'object_address',
+        'result': 'result',
+        'change': 'change',
+        'msg': 'message',
+    }
+
+    time = models.DateTimeField(_('Time'))
+    action_id = models.IntegerField(_('Action id'))
+    action = models.CharField(_('Action'), max_length=255, blank=True, default='')
+    action_type = models.CharField(_('Action type'), max_length=64, blank=True, default='')
+    level = models.CharField(_('Level'), max_length=64, blank=True, default='')
+    subject = models.CharField(_('Subject'), max_length=255, blank=True, default='')
+    subject_address = models.CharField(_('Subject address'), max_length=64, blank=True, default='')
+    object = models.CharField(_('Object'), max_length=255, blank=True, default='')
+    object_address = models.CharField(_('Object address'), max_length=512, blank=True, default='')
+    result = models.CharField(_('Result'), max_length=64, blank=True, default='')
+    change = models.TextField(_('Change'), blank=True, default='')
+    message = models.TextField(_('Message'), blank=True, default='')
+
+    class Meta:
+        verbose_name = _('Событие ИБ | Audit event')
+        verbose_name_plural = _('События ИБ | Audit events')
+        indexes = [
+            models.Index(fields=['subject', 'action_id', 'time'], name='garpix_user_audit_subject'),
+            models.Index(fields=['time', 'id'], name='garpix_user_audit_time'),
+        ]
+
+    def __str__(self):
+        return f'{self.time} {self.action} {self.subject}'
+
+    @staticmethod
+    def is_enabled():
+        return settings.GARPIX_USER.get('USE_AUDIT_EVENT_STORE', False)
+
+    @classmethod
+    def parse(cls, log):
+        """
+        Builds an event from a LoggerIso.create_log record
+        """
+        values = {key: value[1:-1] if value.startswith('"') else value.strip()
+                  for key, value in cls.FIELD_RE.findall(log)}
+        if 'time' not in values or 'id' not in values:
+            return None
+
+        event = cls(time=parse_datetime(values['time']), action_id=int(values['id']))
+        for key, field in cls.FIELDS.items():
+            value = values.get(key, '')
+            max_length = cls._meta.get_field(field).max_length
+            setattr(event, field, value[:max_length] if max_length else value)
+        return event
+
+    @classmethod
+    def store(cls, logs):
+        events = [event for event in map(cls.parse, logs) if event is not None]
+        cls.objects.bulk_create(events, batch_size=500)
+        return len(events)
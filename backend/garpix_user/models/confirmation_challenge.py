@@ -0,0 +1,51 @@
+import hashlib
+
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+from garpix_user.utils.current_date import set_current_date
+
+
+class ConfirmationChallenge(models.Model):
+    """
+    Код подтверждения email/телефона или восстановления пароля, ожидающий проверки
+    """
+
+    class CHANNEL(models.TextChoices):
+        EMAIL = ('email', _('Email'))
+        PHONE = ('phone', _('Phone number'))
+        RESTORE_PASSWORD = ('restore_password', _('Restore password'))
+
+    class SUBJECT_TYPE(models.TextChoices):
+        USER = ('user', _('User'))
+        USER_SESSION = ('user_session', _('User session'))
+
+    subject_type = models.CharField(_('Subject type'), choices=SUBJECT_TYPE.choices, max_length=12)
+    subject_id = models.PositiveBigIntegerField(_('Subject id'))
+    channel = models.CharField(_('Channel'), choices=CHANNEL.choices, max_length=16)
+    code = models.CharField(_('Code'), max_length=255)
+    target = models.CharField(_('Code was sent to'), max_length=254, blank=True, default='')
+    link_hash = models.CharField(_('Confirmation link hash'), max_length=128, blank=True, null=True, db_index=True)
+    attempts = models.PositiveSmallIntegerField(_('Checks of the code'), default=0)
+    is_confirmed = models.BooleanField(_('Code confirmed'), default=False)
+    sent_at = models.DateTimeField(_('Code sent date'), default=set_current_date)
+    expires_at = models.DateTimeField(_('Expires at'), db_index=True)
+
+    class Meta:
+        verbose_name = _('Код подтверждения | Confirmation challenge')
+        verbose_name_plural = _('Коды подтверждения | Confirmation challenges')
+        unique_together = (('subject_type', 'subject_id', 'channel'),)
+
+    def __str__(self):
+        return f'{self.subject_type} {self.subject_id} {self.channel}'
+
+    @staticmethod
+    def make_link_hash(target, code):
+        return str(hashlib.sha512(f'{target}+{code}'.encode("utf-8")).hexdigest()).lower()
+
+    def is_expired(self):
+        return self.expires_at < set_current_date()
+
+    @classmethod
+    def delete_expired(cls):
+        return cls.objects.filter(expires_at__lt=set_current_date()).delete()
@@ -0,0 +1,142 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import models, transaction
+from django.utils.translation import gettext_lazy as _
+
+from garpix_user.utils.current_date import set_current_date
+
+
+class NotificationOutbox(models.Model):
+    """
+    Уведомление, ожидающее отправки через garpix_notify.
+    Строка пишется в той же транзакции, что и код подтверждения, и разбирается задачей dispatch_notification_outbox
+    """
+
+    class STATUS(models.TextChoices):
+        PENDING = ('pending', _('Pending'))
+        FAILED = ('failed', _('Failed'))
+
+    class CHANNEL(models.TextChoices):
+        EMAIL = ('email', _('Email'))
+        PHONE = ('phone', _('Phone number'))
+
+    event = models.IntegerField(_('Event'))
+    channel = models.CharField(_('Channel'), choices=CHANNEL.choices, max_length=8)
+    context = models.JSONField(_('Context'), default=dict, blank=True)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, blank=True, null=True,
+                             verbose_name=_('User'))
+    email = models.EmailField(_('Email'), blank=True, default='')
+    phone = models.CharField(_('Phone number'), max_length=32, blank=True, default='')
+    status = models.CharField(_('Status'), choices=STATUS.choices, max_length=8, default=STATUS.PENDING)
+    attempts = models.PositiveSmallIntegerField(_('Attempts'), default=0)
+    last_error = models.TextField(_('Last error'), blank=True, default='')
+    available_at = models.DateTimeField(_('Available at'), default=set_current_date)
+    created_at = models.DateTimeField(_('Date created'), auto_now_add=True)
+
+    class Meta:
+        verbose_name = _('Очередь уведомлений | Notification outbox')
+        verbose_name_plural = _('Очередь уведомлений | Notification outbox')
+        indexes = [
+            models.Index(fields=['status', 'available_at'], name='garpix_user_outbox_pending'),
+        ]
+
+    def __str__(self):
+        return f'{self.event} {self.email or self.phone}'
+
+    @staticmethod
+    def is_enabled():
+        return settings.GARPIX_USER.get('USE_NOTIFICATION_OUTBOX', False)
+
+    @classmethod
+    def send(cls, event, context, email=None, phone=None):
+        """
+        Drop-in replacement for Notify.send: writes an outbox row and schedules dispatch after commit
+        """
+        from garpix_notify.models import Notify
+
+        if not cls.is_enabled():
+            return Notify.send(event, context, email=email, phone=phone)
+
+        context = dict(context)
+        user = context.pop('user', None)
+
+        with transaction.atomic():
+            message = cls.objects.create(
+                event=event,
+                channel=cls.CHANNEL.PHONE if phone else cls.CHANNEL.EMAIL,
+                context=context,
+                user=user,
+                email=email or '',
+                phone=str(phone) if phone else ''
+            )
+            # a dispatch per message: the ones after the first find the rows sent or locked and return at once
+            transaction.on_commit(cls.schedule_dispatch)
+        return message
+
+    @staticmethod
+    def schedule_dispatch():
+        from garpix_user.tasks.dispatch_notification_outbox import dispatch_notification_outbox
+
+        dispatch_notification_outbox.delay()
+
+    def get_retry_delay(self):
+        retry_delay = settings.GARPIX_USER.get('NOTIFICATION_OUTBOX_RETRY_DELAY', 60)
+        return timedelta(seconds=retry_delay * 2 ** (self.attempts - 1))
+
+    def _deliver(self):
+        from garpix_notify.models import Notify
+
+        context = dict(self.context)
+        if self.user_id is not None:
+            context['user'] = self.user
+        Notify.send(self.event, context, email=self.email or None, phone=self.phone or None)
+
+    @classmethod
+    def dispatch_batch(cls, batch_size=None):
+        """
+        Sends one batch of due messages and returns the number of processed rows.
+        Rows are ordered by channel, locked with SKIP LOCKED so several workers can drain the outbox concurrently;
+        delivered rows are deleted in the same transaction as the Notify rows they produce.
+        """
+        batch_size = batch_size or settings.GARPIX_USER.get('NOTIFICATION_OUTBOX_BATCH_SIZE', 500)
+        max_attempts = settings.GARPIX_USER.get('NOTIFICATION_OUTBOX_MAX_ATTEMPTS', 5)
+
+        with transaction.atomic():
+            now = set_current_date()
+            batch = list(
+                cls.objects.select_for_update(skip_locked=True, of=('self',)).select_related('user').filter(
+                    status=cls.STATUS.PENDING, available_at__lte=now
+                ).order_by('channel', 'id')[:batch_size]
+            )
+
+            delivered, failed = [], []
+            for message in batch:
+                try:
+                    with transaction.atomic():
+                        message._deliver()
+                except Exception as e:
+                    message.attempts += 1
+                    message.last_error = str(e)
+                    if message.attempts >= max_attempts:
+                        message.status = cls.STATUS.FAILED
+                    else:
+                        message.available_at = now + message.get_retry_delay()
+                    failed.append(message)
+                else:
+                    delivered.append(message.pk)
+
+            cls.objects.filter(pk__in=delivered).delete()
+            cls.objects.bulk_update(failed, ['attempts', 'last_error', 'status', 'available_at'])
+
+        return len(batch)
+
+    @classmethod
+    def dispatch_pending(cls, batch_size=None):
+        batch_size = batch_size or settings.GARPIX_USER.get('NOTIFICATION_OUTBOX_BATCH_SIZE', 500)
+        processed = 0
+        while True:
+            count = cls.dispatch_batch(batch_size)
+            processed += count
+            if count < batch_size:
+                return processed
@@ -0,0 +1,62 @@
+from django.db import IntegrityError, models, transaction
+from django.db.models import F
+from django.utils.translation import gettext_lazy as _
+from solo.models import SingletonModel
+
+from .refferal import ReferralType
+
+
+class ReferralStat(models.Model):
+    """
+    Дневная статистика реферальной ссылки, пополняемая инкрементально
+    """
+
+    COUNTERS = ('clicks', 'sessions', 'registrations', 'confirmations')
+
+    referral_type = models.ForeignKey(ReferralType, on_delete=models.CASCADE, related_name='stats',
+                                      verbose_name=_('Referral type'))
+    date = models.DateField(_('Date'))
+    clicks = models.PositiveIntegerField(_('Clicks'), default=0)
+    sessions = models.PositiveIntegerField(_('Unique sessions'), default=0)
+    registrations = models.PositiveIntegerField(_('Registrations'), default=0)
+    confirmations = models.PositiveIntegerField(_('Email confirmations'), default=0)
+
+    class Meta:
+        verbose_name = _('Статистика реферальной ссылки | Referral statistics')
+        verbose_name_plural = _('Статистика реферальных ссылок | Referral statistics')
+        unique_together = (('referral_type', 'date'),)
+        ordering = ['-date']
+
+    def __str__(self):
+        return f'{self.referral_type_id} {self.date}'
+
+    @classmethod
+    def add(cls, referral_type_id, date, **counts):
+        """
+        Adds the counts to the row of the day with one UPDATE, creating the row on the first hit
+        """
+        counts = {name: value for name, value in counts.items() if value}
+        if not counts:
+            return
+        row = cls.objects.filter(referral_type_id=referral_type_id, date=date)
+        if row.update(**{name: F(name) + value for name, value in counts.items()}):
+            return
+        try:
+            with transaction.atomic():
+                cls.objects.create(referral_type_id=referral_type_id, date=date, **counts)
+        except IntegrityError:
+            # created concurrently
+            row.update(**{name: F(name) + value for name, value in counts.items()})
+
+
+class ReferralStatState(SingletonModel):
+    """
+    Водяные знаки, до которых строки уже учтены в статистике реферальных ссылок
+    """
+
+    last_link_id = models.BigIntegerField(_('Last counted referral link id'), default=0)
+    last_user_id = models.BigIntegerField(_('Last counted user id'), default=0)
+    last_confirmed_at = models.DateTimeField(_('Last counted email confirmation'), null=True, blank=True)
+
+    class Meta:
+        verbose_name = _('Состояние статистики рефералов | Referral statistics state')
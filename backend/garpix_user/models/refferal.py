@@ -1,4 +1,9 @@
+import time
+from collections import Counter
+
+from django.conf import settings
 from django.db import models
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from garpix_utils.string import get_random_string
 
@@ -7,19 +12,77 @@ from .user_session import UserSession
 
 class ReferralType(models.Model):
     title = models.CharField(max_length=128, verbose_name=_('Referral way title'))
-    referral_hash = models.CharField(max_length=32)
+    referral_hash = models.CharField(max_length=32, db_index=True)
+
+    # referral_hash -> (pk or None, expires at), per process
+    _hash_cache = {}
+    HASH_CACHE_MAX_SIZE = 10000
 
     def save(self, force_insert=False, force_update=False, using=None,
              update_fields=None):
         if self.pk is None:
             self.referral_hash = get_random_string(32)
         super().save(force_insert, force_update, using, update_fields)
+        self.forget_hash(self.referral_hash)
+
+    def delete(self, using=None, keep_parents=False):
+        # only drops the hash in this process, other processes resolve it until their cache expires
+        self.forget_hash(self.referral_hash)
+        return super().delete(using, keep_parents)
+
+    @classmethod
+    def forget_hash(cls, referral_hash):
+        cls._hash_cache.pop(referral_hash, None)
+
+    @classmethod
+    def get_id_by_hash(cls, referral_hash):
+        """
+        Resolves the hash through an in-process cache kept for REFERRAL_TYPE_CACHE_TIMEOUT seconds,
+        unknown hashes are cached as well so a flood of bad links does not reach the database
+        """
+        if not referral_hash:
+            return None
+        now = time.monotonic()
+        cached = cls._hash_cache.get(referral_hash)
+        if cached is not None and cached[1] > now:
+            return cached[0]
+
+        pk = cls.objects.filter(referral_hash=referral_hash).values_list('pk', flat=True).first()
+        if len(cls._hash_cache) >= cls.HASH_CACHE_MAX_SIZE:
+            cls._hash_cache.clear()
+        cls._hash_cache[referral_hash] = (pk, now + settings.GARPIX_USER.get('REFERRAL_TYPE_CACHE_TIMEOUT', 60))
+        return pk
 
 
 class ReferralUserLink(models.Model):
     user = models.ForeignKey(UserSession, on_delete=models.CASCADE, verbose_name=_('User'))
     referral_type = models.ForeignKey(ReferralType, on_delete=models.CASCADE,
                                       verbose_name=_('Where did the user come from'))
+    created_at = models.DateTimeField(_('Created at'), default=timezone.now)
 
     class Meta:
         unique_together = (('user', 'referral_type'),)
+
+    @classmethod
+    def record_clicks(cls, clicks):
+        """
+        Saves (user session, referral type id) pairs in one INSERT, repeated clicks hit the unique constraint
+        and are skipped; stateless guest sessions are materialized first. Pairs without a session were saved
+        by the redirect already and are only counted. Clicks of referral types deleted meanwhile are dropped.
+        """
+        from .referral_stat import ReferralStat
+
+        # a deleted type stays in the hash cache of other processes, one of its clicks would fail the batch on the FK
+        referral_type_ids = set(ReferralType.objects.filter(pk__in={click[1] for click in clicks}).values_list(
+            'pk', flat=True))
+        clicks = [click for click in clicks if click[1] in referral_type_ids]
+        links = [cls(user=user_session.materialize(), referral_type_id=referral_type_id)
+                 for user_session, referral_type_id in clicks if user_session is not None]
+        if links:
+            cls.objects.bulk_create(links, ignore_conflicts=True)
+
+        # repeated clicks leave no row, so clicks are counted here rather than by the rollup task
+        today = timezone.localdate()
+        for referral_type_id, count in Counter(click[1] for click in clicks).items():
+            ReferralStat.add(referral_type_id, today, clicks=count)
+        return links
@@ -1,5 +1,6 @@
+from django.conf import settings
 from solo.models import SingletonModel
-from django.db import models
+from django.db import models, transaction
 from django.utils.translation import gettext as _
 
 from garpix_user.utils.validators import PositiveWithInfValidator
@@ -43,6 +44,10 @@ class GarpixUserPasswordConfiguration(SingletonModel):
                                               verbose_name=_(
                                                   'Количество хранимых access-токенов (самый старый будет удален)')
                                               )
+    password_expires_at_period = models.IntegerField(null=True, editable=False,
+                                                     verbose_name=_(
+                                                         'Срок действия пароля, по которому рассчитаны даты истечения')
+                                                     )
 
     class Meta:
         verbose_name = 'Настройки безопасности входа | Login Security Settings '
@@ -50,3 +55,20 @@ class GarpixUserPasswordConfiguration(SingletonModel):
 
     def __str__(self):
         return ''
+
+    def save(self, *args, **kwargs):
+        # a missing row means the default period was in effect
+        previous = type(self).objects.filter(pk=self.pk).values_list('password_validity_period', flat=True).first()
+        if previous is None:
+            previous = self._meta.get_field('password_validity_period').default
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if previous != self.password_validity_period:
+                transaction.on_commit(self.schedule_password_expires_at_recompute)
+
+    @staticmethod
+    def schedule_password_expires_at_recompute():
+        from garpix_user.tasks.recompute_password_expires_at import recompute_password_expires_at
+
+        if settings.GARPIX_USER.get('ADMIN_PASSWORD_SETTINGS', False):
+            recompute_password_expires_at.delay()
@@ -0,0 +1,45 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+from garpix_user.utils.current_date import set_current_date
+
+
+class TaskRun(models.Model):
+    """
+    Запись о выполнении периодической задачи: длительность, обработанные строки и пик памяти
+    """
+
+    class STATUS(models.TextChoices):
+        SUCCESS = ('success', _('Success'))
+        FAILED = ('failed', _('Failed'))
+
+    task = models.CharField(_('Task'), max_length=255)
+    status = models.CharField(_('Status'), choices=STATUS.choices, max_length=8, default=STATUS.SUCCESS)
+    started_at = models.DateTimeField(_('Started at'))
+    finished_at = models.DateTimeField(_('Finished at'))
+    duration = models.FloatField(_('Duration, s'))
+    rows_scanned = models.PositiveIntegerField(_('Rows scanned'), default=0)
+    rows_affected = models.PositiveIntegerField(_('Rows affected'), default=0)
+    batches = models.PositiveIntegerField(_('Batches'), default=0)
+    peak_rss_growth = models.PositiveBigIntegerField(_('Peak RSS growth, bytes'), blank=True, null=True)
+    tracemalloc_peak = models.PositiveBigIntegerField(_('Tracemalloc peak, bytes'), blank=True, null=True)
+    error = models.TextField(_('Error'), blank=True, default='')
+
+    class Meta:
+        verbose_name = _('Выполнение задачи | Task run')
+        verbose_name_plural = _('Выполнения задач | Task runs')
+        ordering = ['-started_at']
+        indexes = [
+            models.Index(fields=['task', 'started_at'], name='garpix_user_task_run_started'),
+        ]
+
+    def __str__(self):
+        return f'{self.task} {self.started_at}'
+
+    @classmethod
+    def delete_expired(cls, task):
+        retention_days = settings.GARPIX_USER.get('TASK_RUN_RETENTION_DAYS', 90)
+        cls.objects.filter(task=task, started_at__lt=set_current_date() - timedelta(days=retention_days)).delete()
@@ -1,20 +1,22 @@
+from datetime import timedelta
+
 from django.utils import timezone
 from django.conf import settings
 from django.contrib.auth.hashers import make_password
 from django.contrib.auth.models import AbstractUser, UserManager
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Q
 from garpix_notify.mixins import UserNotifyMixin
 from garpix_utils.managers import ActiveManager
 from garpix_utils.models import DeleteMixin
-from garpix_utils.string import get_random_string
 from phonenumber_field.modelfields import PhoneNumberField
 
 from garpix_user.mixins.models.confirm import UserEmailConfirmMixin, UserPhoneConfirmMixin
 from django.db.utils import IntegrityError
 from django.utils.translation import gettext as _
-import string
 
 from garpix_user.models.password_history import PasswordHistory
+from garpix_user.models.user_identifier import UserIdentifier
 from garpix_user.utils.current_date import set_current_date
 
 
@@ -26,8 +28,10 @@ class GarpixUser(DeleteMixin, UserEmailConfirmMixin, UserPhoneConfirmMixin, User
     is_blocked = models.BooleanField(_("User is blocked"), default=False)
     login_attempts_count = models.IntegerField(_("Invalid log in attempts"), default=0)
     password_updated_date = models.DateTimeField(_("Password last updated date"), default=timezone.now)
+    password_expires_at = models.DateTimeField(_("Password expires at"), blank=True, null=True)
     needs_password_update = models.BooleanField(_("Needs password update"), default=False)
     keycloak_auth_only = models.BooleanField(_("Keycloak auth only"), default=False)
+    deleted_at = models.DateTimeField(_("Deleted at"), blank=True, null=True)
 
     USERNAME_FIELDS = ('username',)
 
@@ -38,26 +42,56 @@ class GarpixUser(DeleteMixin, UserEmailConfirmMixin, UserPhoneConfirmMixin, User
         verbose_name = 'Пользователь | User'
         verbose_name_plural = 'Пользователи | Users'
         abstract = True
+        indexes = [
+            # only users the password expiration sweep looks at; the name is fixed, as app and model names
+            # could take it over the 30 characters allowed for index names
+            models.Index(fields=['password_expires_at'], name='garpix_user_pwd_exp',
+                         condition=Q(is_active=True, keycloak_auth_only=False)),
+            # email confirmations the referral statistics rollup reads since its watermark
+            models.Index(fields=['email_confirmed_date'], name='garpix_user_email_conf',
+                         condition=Q(email_confirmed_date__isnull=False)),
+        ]
 
     def save(self, *args, **kwargs):
         is_new = self.pk is None
         GARPIX_USER_SETTINGS = getattr(settings, "GARPIX_USER", {})
 
-        if is_new and not self.is_email_confirmed and GARPIX_USER_SETTINGS.get('USE_EMAIL_CONFIRMATION', False) and GARPIX_USER_SETTINGS.get(
-                'USE_EMAIL_LINK_CONFIRMATION', True):
-
-            confirmation_code = get_random_string(self.get_confirm_code_length('email'), string.digits)
-
-            self.email_confirmation_code = confirmation_code
-            self.email_code_send_date = set_current_date()
-            self.new_email = self.email
-            self.send_email_confirmation_link()
-
-        super().save(*args, **kwargs)
+        # the password settings are only loaded when the password, and so its date, changed
+        password_updated_date = self.__dict__.get('password_updated_date')
+        if password_updated_date != self._password_updated_date:
+            self.password_expires_at = self.get_password_expires_at(password_updated_date)
+            self._password_updated_date = password_updated_date
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None and 'password_updated_date' in update_fields:
+                kwargs['update_fields'] = {*update_fields, 'password_expires_at'}
+
+        is_deleted = self.__dict__.get('is_deleted')
+        if is_deleted is not None and is_deleted != self._is_deleted:
+            # deleted_at follows is_deleted however it is set, e.g. from the admin
+            self.deleted_at = (self.deleted_at or set_current_date()) if is_deleted else None
+            self._is_deleted = is_deleted
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None and 'is_deleted' in update_fields:
+                kwargs['update_fields'] = {*update_fields, 'deleted_at'}
+
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+            if is_new and not self.is_email_confirmed and GARPIX_USER_SETTINGS.get('USE_EMAIL_CONFIRMATION', False) and GARPIX_USER_SETTINGS.get(
+                    'USE_EMAIL_LINK_CONFIRMATION', True):
+
+                self.issue_email_challenge(self.email)
+                self.send_email_confirmation_link()
+
+            identifier_values = self._get_identifier_values()
+            if identifier_values != self._identifier_values:
+                UserIdentifier.sync_user(self)
+                self._identifier_values = identifier_values
 
     def delete(self, using=None, keep_parents=False):
         self.is_deleted = True
         self.is_active = False
+        self.deleted_at = set_current_date()
         self.save()
 
     def __str__(self):
@@ -65,6 +99,9 @@ class GarpixUser(DeleteMixin, UserEmailConfirmMixin, UserPhoneConfirmMixin, User
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
+        self._identifier_values = self._get_identifier_values() if self.pk is not None else None
+        self._password_updated_date = self.__dict__.get('password_updated_date') if self.pk is not None else None
+        self._is_deleted = self.__dict__.get('is_deleted') if self.pk is not None else False
         if len(self.USERNAME_FIELDS) == 0:
             raise IntegrityError(_('USERNAME_FIELDS can\'t be empty'))
         for field in self.USERNAME_FIELDS:
@@ -72,17 +109,32 @@ class GarpixUser(DeleteMixin, UserEmailConfirmMixin, UserPhoneConfirmMixin, User
                 raise IntegrityError(
                     _(f'{field} can\'t be used as USERNAME_FIELDS. Only ("email", "phone", "username") supported'))
 
+    def refresh_from_db(self, using=None, fields=None):
+        super().refresh_from_db(using=using, fields=fields)
+        if fields is None or 'password_updated_date' in fields:
+            # a date read from the database is not a password change
+            self._password_updated_date = self.__dict__.get('password_updated_date')
+
+    @staticmethod
+    def get_password_expires_at(password_updated_date, password_validity_period=None):
+        if password_validity_period is None:
+            from garpix_user.utils.get_password_settings import get_password_settings
+            password_validity_period = get_password_settings()['password_validity_period']
+        if password_validity_period == -1 or password_updated_date is None:
+            return None
+        return password_updated_date + timedelta(days=password_validity_period)
+
+    def is_password_expired(self):
+        return not self.keycloak_auth_only and self.password_expires_at is not None and \
+            self.password_expires_at <= set_current_date()
+
+    def _get_identifier_values(self):
+        # deferred fields are not loaded here, so they neither trigger a query nor a resync
+        return tuple(str(self.__dict__.get(field) or '') for field in UserIdentifier.KIND.values)
+
     def set_user_session(self, request):
         from garpix_user.models import UserSession
-        current_user_session = UserSession.get_from_request(request)
-        if current_user_session:
-            if (user_user_session := UserSession.objects.filter(
-                    user=self).first()) and user_user_session != current_user_session:
-                current_user_session.delete()
-            else:
-                current_user_session.user = self
-                current_user_session.recognized = UserSession.UserState.REGISTERED
-                current_user_session.save()
+        UserSession.bind_user(request, self)
 
     def set_password(self, raw_password):
         super().set_password(raw_password)
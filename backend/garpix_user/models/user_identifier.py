@@ -0,0 +1,132 @@
+import re
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, models
+from django.db.models import Q
+from django.utils.translation import gettext_lazy as _
+from phonenumber_field.phonenumber import to_python
+
+
+class UserIdentifier(models.Model):
+    """
+    Нормализованный email, телефон или username пользователя для поиска одним индексным запросом
+    """
+
+    class KIND(models.TextChoices):
+        EMAIL = ('email', _('Email'))
+        PHONE = ('phone', _('Phone number'))
+        USERNAME = ('username', _('Username'))
+
+    PHONE_RE = re.compile(r'^\+?[\d\s\-()]{6,20}$')
+
+    kind = models.CharField(_('Kind'), choices=KIND.choices, max_length=8)
+    value = models.CharField(_('Value'), max_length=254)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='identifiers',
+                             verbose_name=_('User'))
+    is_login = models.BooleanField(_('Log in identifier'), default=True)
+
+    class Meta:
+        verbose_name = _('Идентификатор пользователя | User identifier')
+        verbose_name_plural = _('Идентификаторы пользователей | User identifiers')
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'value'], condition=Q(is_login=True),
+                                    name='garpix_user_identifier_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['kind', 'value'], name='garpix_user_identifier_value'),
+        ]
+
+    def __str__(self):
+        return f'{self.kind}: {self.value}'
+
+    @staticmethod
+    def normalize(kind, value):
+        value = str(value).strip() if value else ''
+        if not value:
+            return ''
+        if kind == UserIdentifier.KIND.PHONE:
+            phone = to_python(value)
+            return phone.as_e164 if phone.is_valid() else value
+        return value.lower()
+
+    @classmethod
+    def detect_kind(cls, value):
+        if '@' in value:
+            return cls.KIND.EMAIL
+        if cls.PHONE_RE.match(value):
+            return cls.KIND.PHONE
+        return cls.KIND.USERNAME
+
+    @classmethod
+    def get_lookup_kinds(cls, value, fields):
+        """
+        Kinds to probe for the input: the one its shape suggests and username, which may look like anything
+        """
+        kinds = [cls.detect_kind(value), cls.KIND.USERNAME]
+        return [kind for kind in dict.fromkeys(kinds) if kind in fields]
+
+    @classmethod
+    def user_filter(cls, value, fields=None, prefix='', confirmed=False):
+        """
+        Q for the user model (or a model related to it through `prefix`) matching `value` by USERNAME_FIELDS.
+        With `confirmed` email and phone only match when the corresponding is_<field>_confirmed is set.
+        """
+        fields = fields or get_user_model().USERNAME_FIELDS
+
+        query = Q(**{f'{prefix}pk__in': []})
+        for kind in cls.get_lookup_kinds(str(value).strip(), fields):
+            kind_query = Q(**{f'{prefix}pk__in': cls.objects.filter(
+                kind=kind, value=cls.normalize(kind, value)).values('user_id')})
+            if confirmed and kind != cls.KIND.USERNAME:
+                kind_query &= Q(**{f'{prefix}is_{kind}_confirmed': True})
+            query |= kind_query
+        return query
+
+    @classmethod
+    def get_user_values(cls, user):
+        return {(kind, cls.normalize(kind, getattr(user, kind, None))) for kind in cls.KIND.values}
+
+    @staticmethod
+    def is_login_kind(kind):
+        return kind in get_user_model().USERNAME_FIELDS
+
+    @classmethod
+    def get_collisions(cls, values, user_id=None):
+        """
+        Returns {(kind, value): user_id} of the (kind, value) pairs of USERNAME_FIELDS kinds
+        that belong to users other than `user_id`
+        """
+        collisions = {}
+        for kind in filter(cls.is_login_kind, cls.KIND.values):
+            kind_values = [value for _kind, value in values if _kind == kind]
+            if kind_values:
+                collisions.update({(kind, value): owner_id for value, owner_id in cls.objects.filter(
+                    kind=kind, value__in=kind_values, is_login=True).exclude(
+                    user_id=user_id).values_list('value', 'user_id')})
+        return collisions
+
+    @classmethod
+    def sync_user(cls, user):
+        """
+        Brings the identifiers of the user in line with its fields.
+        Raises IntegrityError when a field of USERNAME_FIELDS normalizes to the identifier of another user;
+        other kinds are stored for lookups only and may be shared.
+        """
+        values = {(kind, value) for kind, value in cls.get_user_values(user) if value}
+
+        collisions = cls.get_collisions(values, user.pk)
+        if collisions:
+            raise IntegrityError(_('User identifiers already belong to other users: {collisions}').format(
+                collisions=', '.join(f'{kind} {value} (user {owner_id})'
+                                     for (kind, value), owner_id in sorted(collisions.items()))))
+
+        rows = {(kind, value, cls.is_login_kind(kind)) for kind, value in values}
+        current = set(cls.objects.filter(user=user).values_list('kind', 'value', 'is_login'))
+        stale = cls.objects.filter(user=user)
+        for kind, value, is_login in rows:
+            stale = stale.exclude(kind=kind, value=value, is_login=is_login)
+        stale.delete()
+
+        cls.objects.bulk_create([cls(user=user, kind=kind, value=value, is_login=is_login)
+                                 for kind, value, is_login in rows - current])
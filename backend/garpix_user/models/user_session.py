@@ -1,6 +1,9 @@
+import hashlib
 import uuid
-from django.db import models
+from django.db import models, transaction
 from django.conf import settings
+from django.core import signing
+from django.core.cache import caches
 from django.db.models import Q
 from django.utils import timezone
 from django.contrib.auth import get_user_model
@@ -9,10 +12,13 @@ from phonenumber_field.modelfields import PhoneNumberField
 
 from garpix_user.mixins.models import RestorePasswordMixin
 from garpix_user.mixins.models.confirm import UserEmailConfirmMixin, UserPhoneConfirmMixin
+from garpix_user.models.user_identifier import UserIdentifier
 
 
 class UserSession(RestorePasswordMixin, UserEmailConfirmMixin, UserPhoneConfirmMixin, models.Model):
     HEAD_NAME = 'user-session-token'
+    SIGNED_TOKEN_SALT = 'garpix_user.user_session'
+    MATERIALIZED_KEY = 'garpix_user:materialized_session:{token}'
 
     class UserState(models.IntegerChoices):
         UNRECOGNIZED = (0, _('Undefined'))
@@ -53,6 +59,8 @@ class UserSession(RestorePasswordMixin, UserEmailConfirmMixin, UserPhoneConfirmM
         token = request.headers.get(cls.HEAD_NAME, None)
 
         if token is not None:
+            if settings.GARPIX_USER.get('USE_SIGNED_GUEST_SESSION', False):
+                return cls.get_from_signed_token(token)
             user_session, _res = UserSession.objects.get_or_create(token_number=token)
             return user_session
 
@@ -62,10 +70,7 @@ class UserSession(RestorePasswordMixin, UserEmailConfirmMixin, UserPhoneConfirmM
 
         username = request.GET.get('username', None)
         if username is not None:
-            query = Q()
-            for field in get_user_model().USERNAME_FIELDS:
-                query |= Q(**{f'user__{field}': username.lower()})
-            return UserSession.objects.filter(query).first()
+            return UserSession.objects.filter(UserIdentifier.user_filter(username, prefix='user__')).first()
         return None
 
     @classmethod
@@ -91,12 +96,8 @@ class UserSession(RestorePasswordMixin, UserEmailConfirmMixin, UserPhoneConfirmM
             )
 
         if username is not None:
-            query = Q()
-            for field in User.USERNAME_FIELDS:
-                query |= Q(**{field: username.lower()})
-
             try:
-                user = User.objects.get(query)
+                user = User.objects.get(UserIdentifier.user_filter(username))
                 session_user = UserSession.objects.filter(user=user).first()
                 return session_user or UserSession.objects.create(
                     token_number=uuid.uuid4(),
@@ -106,21 +107,157 @@ class UserSession(RestorePasswordMixin, UserEmailConfirmMixin, UserPhoneConfirmM
             except Exception as e:
                 print(e)
 
+        if settings.GARPIX_USER.get('USE_SIGNED_GUEST_SESSION', False):
+            return cls(token_number=cls.create_signed_token(), recognized=UserSession.UserState.GUEST)
+
         return UserSession.objects.create(
             token_number=uuid.uuid4(),
             recognized=UserSession.UserState.GUEST
         )
 
+    @classmethod
+    def create_signed_token(cls):
+        return signing.TimestampSigner(salt=cls.SIGNED_TOKEN_SALT).sign_object({
+            'token': uuid.uuid4().hex,
+            'recognized': UserSession.UserState.GUEST
+        })
+
+    @classmethod
+    def from_signed_token(cls, token):
+        """
+        Returns unsaved guest session described by signed token or None if token is invalid or expired
+        """
+        try:
+            data = signing.TimestampSigner(salt=cls.SIGNED_TOKEN_SALT).unsign_object(
+                token, max_age=settings.GARPIX_USER.get('SIGNED_GUEST_SESSION_MAX_AGE', None))
+        except signing.BadSignature:
+            return None
+        return cls(token_number=token, recognized=data.get('recognized', UserSession.UserState.GUEST))
+
+    @classmethod
+    def get_from_signed_token(cls, token):
+        """
+        Signed token of a session without a database row is verified without a query. Once the session
+        was materialized its row is returned; tokens issued before signed sessions are looked up as usual.
+        """
+        user_session = cls.from_signed_token(token)
+        if user_session is None:
+            if ':' in token:
+                # expired or forged signed token (value:timestamp:signature), only a row created before expiry is kept
+                return UserSession.objects.filter(token_number=token).first()
+            user_session, _res = UserSession.objects.get_or_create(token_number=token)
+            return user_session
+
+        if cls._get_materialized_cache().get(cls._get_materialized_key(token)):
+            return UserSession.objects.filter(token_number=token).first() or user_session
+        return user_session
+
+    @staticmethod
+    def _get_materialized_cache():
+        return caches[settings.GARPIX_USER.get('SIGNED_GUEST_SESSION_CACHE', 'default')]
+
+    @classmethod
+    def _get_materialized_key(cls, token):
+        return cls.MATERIALIZED_KEY.format(token=hashlib.sha256(token.encode('utf-8')).hexdigest())
+
+    def materialize(self):
+        """
+        Turns a stateless guest session into its database row, creating the row if needed, and returns it
+        """
+        if self.pk is not None:
+            return self
+        user_session, _res = UserSession.objects.get_or_create(
+            token_number=self.token_number,
+            defaults={'recognized': self.recognized, 'user': self.user}
+        )
+        self._get_materialized_cache().set(self._get_materialized_key(self.token_number), user_session.pk,
+                                           timeout=settings.GARPIX_USER.get('SIGNED_GUEST_SESSION_MAX_AGE', None))
+
+        # this instance now stands for the row, so calling materialize again costs nothing
+        for field in self._meta.concrete_fields:
+            setattr(self, field.attname, getattr(user_session, field.attname))
+        self._state.adding = False
+        self._state.db = user_session._state.db
+        return self
+
     @classmethod
     def set_user_from_request(cls, request):
         user_session = cls.get_from_request(request)
         if request.user.is_authenticated and user_session is not None:
+            user_session = user_session.materialize()
             user = get_user_model().objects.get(pk=request.user.pk)
             user_session.user = user
             user_session.save()
             return True
         return False
 
+    @classmethod
+    def bind_user(cls, request, user):
+        """
+        Attaches current guest session to the user in one transaction.
+        If the user already has a session, guest session is merged into it
+        """
+        token = request.headers.get(cls.HEAD_NAME, None)
+        create_missing = token is not None
+        if token is None:
+            token = request.session.session_key
+        if token is None:
+            return None
+
+        if create_missing and settings.GARPIX_USER.get('USE_SIGNED_GUEST_SESSION', False):
+            create_missing = cls.from_signed_token(token) is not None
+
+        with transaction.atomic():
+            user_session, guest_session = None, None
+            for _session in UserSession.objects.select_for_update().filter(Q(user=user) | Q(token_number=token)):
+                if _session.user_id == user.pk:
+                    user_session = _session
+                elif _session.user_id is None:
+                    guest_session = _session
+                else:
+                    create_missing = False
+
+            if guest_session is not None and user_session is not None:
+                return guest_session.merge_into(user_session)
+
+            if guest_session is not None:
+                UserSession.objects.filter(pk=guest_session.pk).update(
+                    user=user, recognized=UserSession.UserState.REGISTERED)
+                guest_session.user = user
+                guest_session.recognized = UserSession.UserState.REGISTERED
+                return guest_session
+
+            if user_session is None and create_missing:
+                user_session = UserSession.objects.create(
+                    token_number=token,
+                    user=user,
+                    recognized=UserSession.UserState.REGISTERED
+                )
+            return user_session
+
+    def merge_into(self, user_session):
+        """
+        Moves referral links and confirmed email/phone to user_session and drops current session
+        """
+        from garpix_user.models.refferal import ReferralUserLink
+
+        ReferralUserLink.objects.filter(user=self).exclude(
+            referral_type__in=ReferralUserLink.objects.filter(user=user_session).values('referral_type')
+        ).update(user=user_session)
+
+        confirmed_data = {}
+        if self.is_email_confirmed:
+            confirmed_data.update({'email': self.email, 'is_email_confirmed': True})
+        if self.is_phone_confirmed:
+            confirmed_data.update({'phone': self.phone, 'is_phone_confirmed': True})
+        if confirmed_data:
+            UserSession.objects.filter(pk=user_session.pk).update(**confirmed_data)
+            for field, value in confirmed_data.items():
+                setattr(user_session, field, value)
+
+        UserSession.objects.filter(pk=self.pk).delete()
+        return user_session
+
     @classmethod
     def get_or_create_user_session(cls, request, username=None, session=False):
 
@@ -16,3 +16,5 @@ from .passwrod_serializer import RestorePasswordSerializer, RestoreSetPasswordSe
 
 from .user_session_serializer import UserSessionSerializer, UserSessionTokenSerializer  # noqa
 from .jwt_data_serializer import JWTDataSerializer  # noqa
+from .referral_stat_serializer import ReferralStatSerializer  # noqa
+from .bulk_registration_serializer import BulkRegistrationSerializer  # noqa
@@ -1,13 +1,8 @@
-from datetime import timedelta
-
 from django.utils.translation import gettext_lazy as _
 
 from rest_framework import serializers
 from rest_framework.authentication import authenticate
 
-from garpix_user.utils.current_date import set_current_date
-from garpix_user.utils.get_password_settings import get_password_settings
-
 
 class AuthTokenSerializer(serializers.Serializer):
     username = serializers.CharField(label=_("Username"))
@@ -23,8 +18,6 @@ class AuthTokenSerializer(serializers.Serializer):
         username = username.lower()
 
         if username and password:
-            password_validity_period = get_password_settings()['password_validity_period']
-
             request = self.context.get('request')
             user = authenticate(request=request,
                                 username=username, password=password)
@@ -39,8 +32,7 @@ class AuthTokenSerializer(serializers.Serializer):
                     'Your account is blocked. Please contact your administrator')
                 raise serializers.ValidationError(msg, code='authorization')
 
-            if password_validity_period != -1 and not user.keycloak_auth_only and user.password_updated_date + timedelta(
-                    days=password_validity_period) <= set_current_date():
+            if user.is_password_expired():
                 msg = {
                     'non_field_errors': [
                         _('Your password has expired. Please change password')],
@@ -0,0 +1,38 @@
+from django.contrib.auth import get_user_model
+from rest_framework.validators import UniqueValidator
+
+from .registration_serializer import RegistrationSerializer
+
+User = get_user_model()
+
+
+class BulkRegistrationSerializer(RegistrationSerializer):
+    """
+    One registration of the bulk registration request. Uniqueness of USERNAME_FIELDS is checked by the view
+    for the whole batch, the password policy is read once per request and passed in the context.
+    """
+    password_2 = None
+
+    def validate_password(self, value):
+
+        self._validate_password(value, self.context.get('password_settings'))
+
+        return value
+
+    def validate_email(self, value):
+        return str(value).lower() if value else None
+
+    def validate_phone(self, value):
+        return value
+
+    def get_fields(self):
+        fields = super().get_fields()
+        for name in User.USERNAME_FIELDS:
+            fields[name].validators = [
+                validator for validator in fields[name].validators if not isinstance(validator, UniqueValidator)
+            ]
+        return fields
+
+    class Meta:
+        model = User
+        fields = ('password',)
@@ -1,3 +1,4 @@
+from django.conf import settings
 from rest_framework import serializers
 
 from garpix_user.mixins.serializers import ToLowerMixin, PasswordSerializerMixin
@@ -11,13 +12,26 @@ class RestorePasswordSerializer(ToLowerMixin, serializers.Serializer):
 
 class RestoreSetPasswordSerializer(ToLowerMixin, PasswordSerializerMixin, serializers.Serializer):
     new_password = serializers.CharField(max_length=255, required=True)
-    username = serializers.CharField(required=True, help_text=_('Email or phone number'))
-    restore_password_confirm_code = serializers.CharField(max_length=15, required=True)
+    username = serializers.CharField(required=False, help_text=_('Email or phone number'))
+    restore_password_confirm_code = serializers.CharField(max_length=15, required=False)
+    restore_ticket = serializers.CharField(required=False, help_text=_('Ticket returned by step 2'))
 
     def validate_new_password(self, value):
         self._validate_password(value)
         return value
 
+    def validate(self, attrs):
+        if settings.GARPIX_USER.get('USE_RESTORE_PASSWORD_TICKET', False):
+            required_fields = ('restore_ticket',)
+        else:
+            required_fields = ('username', 'restore_password_confirm_code')
+
+        errors = {field: [_('This field is required.')] for field in required_fields if not attrs.get(field)}
+        if errors:
+            raise serializers.ValidationError(errors)
+
+        return attrs
+
 
 class RestoreCheckCodeSerializer(ToLowerMixin, serializers.Serializer):
     restore_password_confirm_code = serializers.CharField(max_length=15, required=True)
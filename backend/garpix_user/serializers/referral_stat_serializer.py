@@ -0,0 +1,9 @@
+from rest_framework.serializers import ModelSerializer
+
+from garpix_user.models.referral_stat import ReferralStat
+
+
+class ReferralStatSerializer(ModelSerializer):
+    class Meta:
+        model = ReferralStat
+        fields = ('referral_type', 'date', 'clicks', 'sessions', 'registrations', 'confirmations')
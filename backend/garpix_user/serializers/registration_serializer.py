@@ -1,11 +1,12 @@
 from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.db import transaction
+from django.db import IntegrityError, transaction
 from garpix_utils.string import get_random_string
 from rest_framework import serializers
 
 from garpix_user.mixins.serializers import PasswordSerializerMixin
 from garpix_user.models.user_session import UserSession
+from garpix_user.utils.registered_identifiers import is_identifier_registered
 from django.utils.translation import gettext_lazy as _
 
 User = get_user_model()
@@ -37,13 +38,12 @@ class RegistrationSerializer(PasswordSerializerMixin, serializers.ModelSerialize
 
         value = str(value).lower() if value else None
 
-        queryset = User.objects.filter(email=value).first()
-        if queryset is not None:
+        if is_identifier_registered('email', value):
             raise serializers.ValidationError(_("This email is already in use"))
 
         if GARPIX_USER_SETTINGS.get('USE_PREREGISTRATION_EMAIL_CONFIRMATION', False) and GARPIX_USER_SETTINGS.get(
                 'USE_EMAIL_CONFIRMATION', False):
-            user = UserSession.get_or_create_user_session(request)
+            user = UserSession.get_or_create_user_session(request).materialize()
             if not user.is_email_confirmed:
                 raise serializers.ValidationError(_('Email was not confirmed'))
 
@@ -55,13 +55,12 @@ class RegistrationSerializer(PasswordSerializerMixin, serializers.ModelSerialize
 
         request = self.context.get('request')
 
-        queryset = User.objects.filter(phone=value).first()
-        if queryset is not None:
+        if is_identifier_registered('phone', value):
             raise serializers.ValidationError(_("This phone is already in use"))
 
         if GARPIX_USER_SETTINGS.get('USE_PREREGISTRATION_PHONE_CONFIRMATION', False) and GARPIX_USER_SETTINGS.get(
                 'USE_PHONE_CONFIRMATION', False):
-            user = UserSession.get_or_create_user_session(request)
+            user = UserSession.get_or_create_user_session(request).materialize()
             if not user.is_phone_confirmed:
                 raise serializers.ValidationError(_('Phone number was not confirmed'))
 
@@ -86,15 +85,19 @@ class RegistrationSerializer(PasswordSerializerMixin, serializers.ModelSerialize
         if GARPIX_USER_SETTINGS.get('USE_EMAIL_CONFIRMATION', False) and not GARPIX_USER_SETTINGS.get('USE_PREREGISTRATION_EMAIL_CONFIRMATION', False):
             user_data.update({'is_email_confirmed': False})
 
-        with transaction.atomic():
-            user = User.objects.create_user(**user_data)
-            if request:
-                user_session = UserSession.get_or_create_user_session(request)
-                user_session.user = user
-                user_session.recognized = UserSession.UserState.REGISTERED
-                user_session.is_email_confirmed = False
-                user_session.is_phone_confirmed = False
-                user_session.save()
+        try:
+            with transaction.atomic():
+                user = User.objects.create_user(**user_data)
+                if request:
+                    user_session = UserSession.get_or_create_user_session(request).materialize()
+                    user_session.user = user
+                    user_session.recognized = UserSession.UserState.REGISTERED
+                    user_session.is_email_confirmed = False
+                    user_session.is_phone_confirmed = False
+                    user_session.save()
+        except IntegrityError:
+            # an identifier registered after validation, or missed by a stale registration filter
+            raise serializers.ValidationError(_("User with such data has been already registered"))
 
         return user
 
@@ -1,2 +1,8 @@
 from .delete_unconfirmed_users import delete_unconfirmed_users  # noqa
 from .password_validity_passed import password_validity_passed  # noqa
+from .delete_expired_confirmation_challenges import delete_expired_confirmation_challenges  # noqa
+from .dispatch_notification_outbox import dispatch_notification_outbox  # noqa
+from .recompute_password_expires_at import recompute_password_expires_at  # noqa
+from .archive_deleted_users import archive_deleted_users  # noqa
+from .resend_confirmations import resend_confirmations  # noqa
+from .rollup_referral_stats import rollup_referral_stats  # noqa
@@ -0,0 +1,56 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.utils.module_loading import import_string
+
+from garpix_user.models import ArchivedUser
+from garpix_user.utils.current_date import set_current_date
+from garpix_user.utils.single_flight import single_flight
+from garpix_user.utils.task_run import get_task_run_stats, track_task_run
+
+celery_app = import_string(settings.GARPIXCMS_CELERY_SETTINGS)
+
+
+def get_archive_users_queryset():
+    retention_days = settings.GARPIX_USER.get('ARCHIVE_DELETED_USERS_AFTER_DAYS', 365)
+    return get_user_model().objects.filter(
+        is_deleted=True, deleted_at__lt=set_current_date() - timedelta(days=retention_days))
+
+
+@celery_app.task()
+@single_flight(interval=86400)
+@track_task_run()
+def archive_deleted_users():
+    """
+    Moves users soft-deleted more than ARCHIVE_DELETED_USERS_AFTER_DAYS ago to ArchivedUser in pk-ordered batches,
+    each in its own transaction, until nothing is left or ARCHIVE_DELETED_USERS_TIME_BUDGET seconds have passed
+    """
+    if not settings.GARPIX_USER.get('USE_USER_ARCHIVE', False):
+        return
+
+    batch_size = settings.GARPIX_USER.get('ARCHIVE_DELETED_USERS_BATCH_SIZE', 500)
+    time_budget = settings.GARPIX_USER.get('ARCHIVE_DELETED_USERS_TIME_BUDGET', 300)
+
+    started_at = time.monotonic()
+    last_pk = 0
+    queryset = get_archive_users_queryset()
+    stats = get_task_run_stats()
+
+    while time.monotonic() - started_at < time_budget:
+        pks = list(queryset.filter(pk__gt=last_pk).order_by('pk').values_list('pk', flat=True)[:batch_size])
+        if not pks:
+            break
+
+        stats.add(rows_scanned=len(pks), rows_affected=ArchivedUser.archive_users(pks), batches=1)
+        last_pk = pks[-1]
+
+
+celery_app.conf.beat_schedule.update({
+    'archive_deleted_users': {
+        'task': 'garpix_user.tasks.archive_deleted_users.archive_deleted_users',
+        'schedule': 86400,
+    }
+})
+celery_app.conf.timezone = 'UTC'
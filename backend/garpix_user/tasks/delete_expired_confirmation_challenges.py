@@ -0,0 +1,25 @@
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+from garpix_user.models import ConfirmationChallenge
+from garpix_user.utils.single_flight import single_flight
+from garpix_user.utils.task_run import get_task_run_stats, track_task_run
+
+celery_app = import_string(settings.GARPIXCMS_CELERY_SETTINGS)
+
+
+@celery_app.task()
+@single_flight(interval=3600)
+@track_task_run()
+def delete_expired_confirmation_challenges():
+    deleted, _ = ConfirmationChallenge.delete_expired()
+    get_task_run_stats().add(rows_affected=deleted, batches=1)
+
+
+celery_app.conf.beat_schedule.update({
+    'delete_expired_confirmation_challenges': {
+        'task': 'garpix_user.tasks.delete_expired_confirmation_challenges.delete_expired_confirmation_challenges',
+        'schedule': 3600,
+    }
+})
+celery_app.conf.timezone = 'UTC'
@@ -1,27 +1,88 @@
-from datetime import datetime, timedelta
+import time
+from datetime import timedelta
 
 from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
 from django.db.models import Q
 from django.utils.module_loading import import_string
 
+from garpix_user.models import ConfirmationChallenge, UserSession
+from garpix_user.utils.current_date import set_current_date
+from garpix_user.utils.single_flight import single_flight
+from garpix_user.utils.task_run import get_task_run_stats, track_task_run
 
 celery_app = import_string(settings.GARPIXCMS_CELERY_SETTINGS)
-GARPIX_USER_SETTINGS = getattr(settings, "GARPIX_USER", {})
 
+WATERMARK_CACHE_KEY = 'garpix_user:delete_unconfirmed_users:watermark'
 
-@celery_app.task()
-def delete_unconfirmed_users():
+
+def get_unconfirmed_users_queryset():
     User = get_user_model()
     filters_data = Q()
-    delay_date = datetime.now() - timedelta(days=GARPIX_USER_SETTINGS.get('CONFIRMATION_DELAY', 10))
+    delay_date = set_current_date() - timedelta(days=settings.GARPIX_USER.get('CONFIRMATION_DELAY', 10))
     if 'email' in User.USERNAME_FIELDS:
         filters_data |= Q(is_email_confirmed=False, date_joined__lt=delay_date)
     if 'phone' in User.USERNAME_FIELDS:
         filters_data |= Q(is_phone_confirmed=False, date_joined__lt=delay_date)
 
-    if filters_data:
-        User.objects.filter(filters_data).delete()
+    if not filters_data:
+        return User.objects.none()
+
+    queryset = User.objects.filter(filters_data)
+    if settings.GARPIX_USER.get('DELETE_UNCONFIRMED_USERS_SOFT', False):
+        queryset = queryset.filter(is_deleted=False)
+    return queryset
+
+
+def delete_users_batch(pks):
+    User = get_user_model()
+
+    with transaction.atomic():
+        if settings.GARPIX_USER.get('DELETE_UNCONFIRMED_USERS_SOFT', False):
+            return User.objects.filter(pk__in=pks).update(is_deleted=True, is_active=False,
+                                                          deleted_at=set_current_date())
+
+        # challenges only reference their subject by id, so they are not cascaded
+        challenges = Q(subject_type=ConfirmationChallenge.SUBJECT_TYPE.USER, subject_id__in=pks)
+        challenges |= Q(subject_type=ConfirmationChallenge.SUBJECT_TYPE.USER_SESSION,
+                        subject_id__in=UserSession.objects.filter(user_id__in=pks).values('pk'))
+        ConfirmationChallenge.objects.filter(challenges).delete()
+        # the collector deletes rows without own cascades or signals (identifiers, password history, garpix_user
+        # tokens) with one DELETE per table, user sessions and oauth tokens are loaded and deleted by pk
+        _, deleted = User.objects.filter(pk__in=pks).delete()
+        return deleted.get(User._meta.label, 0)
+
+
+@celery_app.task()
+@single_flight(interval=3600)
+@track_task_run()
+def delete_unconfirmed_users():
+    """
+    Deletes unconfirmed users in pk-ordered batches, each in its own short transaction.
+    Stops after DELETE_UNCONFIRMED_USERS_TIME_BUDGET seconds; the next run resumes from the stored watermark.
+    """
+    batch_size = settings.GARPIX_USER.get('DELETE_UNCONFIRMED_USERS_BATCH_SIZE', 1000)
+    time_budget = settings.GARPIX_USER.get('DELETE_UNCONFIRMED_USERS_TIME_BUDGET', 300)
+
+    started_at = time.monotonic()
+    last_pk = cache.get(WATERMARK_CACHE_KEY, 0)
+    queryset = get_unconfirmed_users_queryset()
+    stats = get_task_run_stats()
+
+    while time.monotonic() - started_at < time_budget:
+        pks = list(queryset.filter(pk__gt=last_pk).order_by('pk').values_list('pk', flat=True)[:batch_size])
+        if not pks:
+            # the whole table was scanned, start from the beginning next time
+            last_pk = 0
+            break
+
+        stats.add(rows_scanned=len(pks), rows_affected=delete_users_batch(pks), batches=1)
+        last_pk = pks[-1]
+        cache.set(WATERMARK_CACHE_KEY, last_pk, timeout=None)
+
+    cache.set(WATERMARK_CACHE_KEY, last_pk, timeout=None)
 
 
 celery_app.conf.beat_schedule.update({
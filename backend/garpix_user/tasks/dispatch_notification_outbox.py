@@ -0,0 +1,20 @@
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+from garpix_user.models import NotificationOutbox
+
+celery_app = import_string(settings.GARPIXCMS_CELERY_SETTINGS)
+
+
+@celery_app.task()
+def dispatch_notification_outbox():
+    NotificationOutbox.dispatch_pending()
+
+
+celery_app.conf.beat_schedule.update({
+    'dispatch_notification_outbox': {
+        'task': 'garpix_user.tasks.dispatch_notification_outbox.dispatch_notification_outbox',
+        'schedule': 60,
+    }
+})
+celery_app.conf.timezone = 'UTC'
@@ -1,48 +1,157 @@
-from datetime import datetime, timedelta
+from datetime import timedelta
 
+from asgiref.sync import async_to_sync
 from celery.schedules import crontab
+from channels.layers import get_channel_layer
 from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import CharField, Value
+from django.db.models.functions import Cast, Concat
 from django.utils.module_loading import import_string
-from garpix_notify.models import SystemNotify
+from garpix_notify.models import NotifyTemplate, SystemNotify
+from garpix_notify.models.choices import STATE, TYPE
+from garpix_notify.utils import ReceivingUsers
 from django.utils.translation import gettext_lazy as _
+from garpix_user.utils.current_date import set_current_date
 from garpix_user.utils.get_password_settings import get_password_settings
 from garpix_user.utils.repluralize import rupluralize
+from garpix_user.utils.single_flight import single_flight
+from garpix_user.utils.task_run import get_task_run_stats, track_task_run
 
 celery_app = import_string(settings.GARPIXCMS_CELERY_SETTINGS)
 
 
+def get_inform_users_queryset(password_settings):
+    # served by the partial index on password_expires_at of active non-keycloak users
+    inform_date = set_current_date() + timedelta(days=password_settings['password_validity_inform_days'])
+    return get_user_model().active_objects.filter(password_expires_at__lte=inform_date, keycloak_auth_only=False)
+
+
+def get_password_validity_message(user, datenow):
+    expire_days = (user.password_expires_at - datenow).days
+
+    if expire_days > 0:
+        return _('Your password will expire in {expire_days} {days}. Please change your password').format(
+            expire_days=1 + expire_days,
+            days=rupluralize(expire_days, _('day,days'))
+        )
+    return _('Your password has expired. Please change your password')
+
+
 @celery_app.task()
+@single_flight(interval=86400)
+@track_task_run()
 def password_validity_passed():
+    """
+    Planner: streams ids of users to inform and fans out one password_validity_passed_chunk task per pk range
+    """
+    password_settings = get_password_settings()
+    if password_settings['password_validity_period'] == -1 or password_settings['password_validity_inform_days'] == -1:
+        return
+
+    chunk_size = settings.GARPIX_USER.get('PASSWORD_VALIDITY_CHUNK_SIZE', 1000)
+    stats = get_task_run_stats()
+
+    pks = get_inform_users_queryset(password_settings).order_by('pk').values_list('pk', flat=True)
+    chunk = []
+    for pk in pks.iterator(chunk_size=chunk_size):
+        chunk.append(pk)
+        if len(chunk) == chunk_size:
+            password_validity_passed_chunk.delay(chunk[0], chunk[-1])
+            stats.add(rows_scanned=len(chunk), batches=1)
+            chunk = []
+    if chunk:
+        password_validity_passed_chunk.delay(chunk[0], chunk[-1])
+        stats.add(rows_scanned=len(chunk), batches=1)
+
+
+@celery_app.task()
+@single_flight(key=lambda first_pk, last_pk: f'{first_pk}-{last_pk}')
+@track_task_run()
+def password_validity_passed_chunk(first_pk, last_pk):
+    """
+    Creates password validity notifications for users in [first_pk, last_pk] in bulk,
+    skipping users who were already notified today
+    """
     password_settings = get_password_settings()
-    _password_validity_period = password_settings['password_validity_period']
-    _password_validity_inform_days = password_settings['password_validity_inform_days']
-    if _password_validity_period != -1 and _password_validity_inform_days != -1:
-
-        password_validity_period = datetime.now() - timedelta(
-            days=(_password_validity_period - _password_validity_inform_days))
-        inform_users = get_user_model().active_objects.filter(password_updated_date__lte=password_validity_period,
-                                                              keycloak_auth_only=False)
-
-        datenow = datetime.now()
-        for user in inform_users:
-            expire_days = (
-                        user.password_updated_date + timedelta(days=_password_validity_period) - datenow).days
-
-            if expire_days > 0:
-                _msg = _(
-                    'Your password will expire in {expire_days} {days}. Please change your password').format(
-                    expire_days=1 + expire_days,
-                    days=rupluralize(expire_days, _('day,days'))
-                )
-            else:
-                _msg = _('Your password has expired. Please change your password')
-            SystemNotify.send({
-                'message': {
-                    'message': str(_msg)
-                },
-                'event': settings.PASSWORD_INVALID_EVENT
-            }, user, event=settings.PASSWORD_INVALID_EVENT, room_name=f'workflow-{user.pk}')
+    if password_settings['password_validity_period'] == -1 or password_settings['password_validity_inform_days'] == -1:
+        return
+
+    event = settings.PASSWORD_INVALID_EVENT
+    datenow = set_current_date()
+    today = datenow.replace(hour=0, minute=0, second=0, microsecond=0)
+
+    # the user's own notifies: template recipients get theirs in the same room
+    users = get_inform_users_queryset(password_settings).filter(pk__range=(first_pk, last_pk)).exclude(
+        pk__in=SystemNotify.objects.filter(
+            event=event, created_at__gte=today, user_id__gte=first_pk, user_id__lte=last_pk,
+            room_name=Concat(Value('workflow-'), Cast('user_id', CharField()))
+        ).values('user_id')
+    ).only('pk', 'first_name', 'last_name', 'email', 'phone', 'password_expires_at')
+
+    template_title, template_recipients = get_template_recipients(event)
+    notify_type = getattr(settings, 'DEFAULT_SYSTEM_NOTIFY_TYPE', 'system')
+
+    notifies = []
+    for user in users:
+        room_name = f'workflow-{user.pk}'
+        message = str(get_password_validity_message(user, datenow))
+        for recipient in template_recipients + [user]:
+            notifies.append(SystemNotify(
+                title=template_title or f'{recipient} - {room_name}',
+                user=recipient,
+                event=event,
+                room_name=room_name,
+                data_json={
+                    'message': {
+                        'message': message
+                    },
+                    'event': event,
+                    'type': notify_type,
+                    'user': recipient.pk,
+                }
+            ))
+
+    get_task_run_stats().add(rows_scanned=len(notifies), rows_affected=len(notifies), batches=1)
+
+    with transaction.atomic():
+        SystemNotify.objects.bulk_create(notifies)
+        transaction.on_commit(lambda: send_system_notifies(notifies))
+
+
+def get_template_recipients(event):
+    """
+    Title and additional recipients (template user and user lists) of the active system templates of the event,
+    the same SystemNotify.send collects for every call, loaded once per chunk
+    """
+    title, recipients = None, []
+    templates = NotifyTemplate.objects.select_related('user').prefetch_related('user_lists').filter(
+        event=event, is_active=True, type=TYPE.SYSTEM)
+    for template in templates:
+        if template.user:
+            recipients.append(template.user)
+        if template.subject:
+            title = template.subject
+        if user_lists := template.user_lists.all():
+            recipients.extend(user for user in ReceivingUsers.run_receiving_users(user_lists, 'user') if user)
+    return title, recipients
+
+
+def send_system_notifies(notifies):
+    """
+    Same as SystemNotify.send_notification, but the delivery states are saved with one bulk update
+    """
+    channel_layer = get_channel_layer()
+    for notify in notifies:
+        try:
+            async_to_sync(channel_layer.group_send)(notify.room_name, dict(notify.data_json, id=notify.id))
+            notify.state = STATE.DELIVERED
+            notify.sent_at = set_current_date()
+        except Exception as e:
+            notify.state = STATE.REJECTED
+            notify.to_log(str(e))
+    SystemNotify.objects.bulk_update(notifies, ['state', 'sent_at'])
 
 
 celery_app.conf.beat_schedule.update({
@@ -0,0 +1,57 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db.models import F, Max, Min
+from django.utils.module_loading import import_string
+
+from garpix_user.models import GarpixUserPasswordConfiguration
+from garpix_user.utils.get_password_settings import get_password_settings
+from garpix_user.utils.single_flight import single_flight
+from garpix_user.utils.task_run import get_task_run_stats, track_task_run
+
+celery_app = import_string(settings.GARPIXCMS_CELERY_SETTINGS)
+
+
+@celery_app.task()
+@single_flight(interval=settings.GARPIX_USER.get('PASSWORD_EXPIRES_AT_CHECK_INTERVAL', 3600))
+@track_task_run()
+def recompute_password_expires_at():
+    """
+    Recomputes password_expires_at of all users when the password validity period in effect (from the admin or from
+    PASSWORD_VALIDITY_PERIOD) differs from the one they were computed with; scheduled on admin changes and by beat.
+    Runs one UPDATE per pk range of PASSWORD_EXPIRES_AT_BATCH_SIZE ids, so no long table-wide lock is taken.
+    """
+    User = get_user_model()
+    batch_size = settings.GARPIX_USER.get('PASSWORD_EXPIRES_AT_BATCH_SIZE', 10000)
+    password_validity_period = get_password_settings()['password_validity_period']
+
+    password_config = GarpixUserPasswordConfiguration.get_solo()
+    if password_config.password_expires_at_period == password_validity_period:
+        return
+
+    if password_validity_period == -1:
+        password_expires_at = None
+    else:
+        password_expires_at = F('password_updated_date') + timedelta(days=password_validity_period)
+
+    bounds = User.objects.aggregate(min_pk=Min('pk'), max_pk=Max('pk'))
+    stats = get_task_run_stats()
+    if bounds['min_pk'] is not None:
+        for first_pk in range(bounds['min_pk'], bounds['max_pk'] + 1, batch_size):
+            updated = User.objects.filter(pk__gte=first_pk, pk__lt=first_pk + batch_size).update(
+                password_expires_at=password_expires_at)
+            stats.add(rows_scanned=updated, rows_affected=updated, batches=1)
+
+    # update() writes only this column, so a concurrent admin edit of the other settings is kept
+    GarpixUserPasswordConfiguration.objects.filter(pk=password_config.pk).update(
+        password_expires_at_period=password_validity_period)
+
+
+celery_app.conf.beat_schedule.update({
+    'recompute_password_expires_at': {
+        'task': 'garpix_user.tasks.recompute_password_expires_at.recompute_password_expires_at',
+        'schedule': settings.GARPIX_USER.get('PASSWORD_EXPIRES_AT_CHECK_INTERVAL', 3600),
+    }
+})
+celery_app.conf.timezone = 'UTC'
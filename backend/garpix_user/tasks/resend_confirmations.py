@@ -0,0 +1,30 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.utils.module_loading import import_string
+
+from garpix_user.utils.single_flight import single_flight
+from garpix_user.utils.task_run import get_task_run_stats, track_task_run
+
+celery_app = import_string(settings.GARPIXCMS_CELERY_SETTINGS)
+
+
+@celery_app.task()
+@single_flight(key=lambda pks: f'{pks[0]}-{pks[-1]}')
+@track_task_run()
+def resend_confirmations(pks):
+    """
+    Re-issues email and phone confirmation challenges for one chunk of users selected in the admin.
+    Users who confirmed in the meantime or asked for a code too recently are skipped.
+    """
+    use_email = settings.GARPIX_USER.get('USE_EMAIL_CONFIRMATION', False)
+    use_phone = settings.GARPIX_USER.get('USE_PHONE_CONFIRMATION', False)
+
+    sent = 0
+    users = get_user_model().objects.filter(pk__in=pks).order_by('pk')
+    for user in users.iterator(chunk_size=500):
+        if use_email and user.email and not user.is_email_confirmed:
+            sent += user.send_email_confirmation_code(user.email) is True
+        if use_phone and user.phone and not user.is_phone_confirmed:
+            sent += user.send_phone_confirmation_code(user.phone) is True
+
+    get_task_run_stats().add(rows_scanned=len(pks), rows_affected=sent, batches=1)
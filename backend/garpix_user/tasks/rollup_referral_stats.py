@@ -0,0 +1,112 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Count, F, Max
+from django.db.models.functions import TruncDate
+from django.utils.module_loading import import_string
+
+from garpix_user.models import ReferralStat, ReferralStatState, ReferralUserLink
+from garpix_user.utils.current_date import set_current_date
+from garpix_user.utils.single_flight import single_flight
+from garpix_user.utils.task_run import get_task_run_stats, track_task_run
+
+celery_app = import_string(settings.GARPIXCMS_CELERY_SETTINGS)
+
+# links of sessions whose user registered after the click
+REGISTERED_AFTER_CLICK = dict(user__user__isnull=False, created_at__lte=F('user__user__date_joined'))
+
+
+def add_counts(queryset, counter, day_field):
+    """
+    Groups the links by referral type and day and adds the counts to ReferralStat, returns the number of links
+    """
+    rows = queryset.values('referral_type_id', day=TruncDate(day_field)).annotate(count=Count('pk')).order_by()
+    total = 0
+    for row in rows:
+        ReferralStat.add(row['referral_type_id'], row['day'], **{counter: row['count']})
+        total += row['count']
+    return total
+
+
+def rollup_ranges(first, last, batch_size, get_links, counter, day_field, watermark):
+    """
+    Counts get_links(lower, upper) for pk ranges of batch_size up to last,
+    moving the watermark in the same transaction as the counts
+    """
+    stats = get_task_run_stats()
+    while first < last:
+        upper = min(first + batch_size, last)
+        with transaction.atomic():
+            counted = add_counts(get_links(first, upper), counter, day_field)
+            ReferralStatState.objects.update(**{watermark: upper})
+        stats.add(rows_scanned=counted, rows_affected=counted, batches=1)
+        first = upper
+
+
+def rollup_sessions(state, cutoff, batch_size):
+    last_link_id = ReferralUserLink.objects.filter(
+        pk__gt=state.last_link_id, created_at__lt=cutoff).aggregate(last=Max('pk'))['last']
+    if last_link_id is None:
+        return
+
+    def get_links(lower, upper):
+        return ReferralUserLink.objects.filter(pk__gt=lower, pk__lte=upper)
+
+    rollup_ranges(state.last_link_id, last_link_id, batch_size, get_links, 'sessions', 'created_at', 'last_link_id')
+
+
+def rollup_registrations(state, cutoff, batch_size):
+    last_user_id = get_user_model().objects.filter(
+        pk__gt=state.last_user_id, date_joined__lt=cutoff).aggregate(last=Max('pk'))['last']
+    if last_user_id is None:
+        return
+
+    def get_links(lower, upper):
+        return ReferralUserLink.objects.filter(user__user_id__gt=lower, user__user_id__lte=upper,
+                                               **REGISTERED_AFTER_CLICK)
+
+    rollup_ranges(state.last_user_id, last_user_id, batch_size, get_links,
+                  'registrations', 'user__user__date_joined', 'last_user_id')
+
+
+def rollup_confirmations(state, cutoff):
+    links = ReferralUserLink.objects.filter(user__user__email_confirmed_date__lt=cutoff, **REGISTERED_AFTER_CLICK)
+    if state.last_confirmed_at is not None:
+        links = links.filter(user__user__email_confirmed_date__gte=state.last_confirmed_at)
+
+    with transaction.atomic():
+        counted = add_counts(links, 'confirmations', 'user__user__email_confirmed_date')
+        ReferralStatState.objects.update(last_confirmed_at=cutoff)
+    get_task_run_stats().add(rows_scanned=counted, rows_affected=counted, batches=1)
+
+
+@celery_app.task()
+@single_flight(interval=300)
+@track_task_run()
+def rollup_referral_stats():
+    """
+    Adds referral links, registrations and email confirmations that appeared since the stored watermarks
+    to the daily ReferralStat rows. Rows younger than REFERRAL_STATS_LAG seconds are left for the next run,
+    so transactions that were still open are not skipped.
+    """
+    if not settings.GARPIX_USER.get('USE_REFERRAL_LINKS', False):
+        return
+
+    batch_size = settings.GARPIX_USER.get('REFERRAL_STATS_BATCH_SIZE', 10000)
+    cutoff = set_current_date() - timedelta(seconds=settings.GARPIX_USER.get('REFERRAL_STATS_LAG', 60))
+    state = ReferralStatState.get_solo()
+
+    rollup_sessions(state, cutoff, batch_size)
+    rollup_registrations(state, cutoff, batch_size)
+    rollup_confirmations(state, cutoff)
+
+
+celery_app.conf.beat_schedule.update({
+    'rollup_referral_stats': {
+        'task': 'garpix_user.tasks.rollup_referral_stats.rollup_referral_stats',
+        'schedule': 300,
+    }
+})
+celery_app.conf.timezone = 'UTC'
@@ -0,0 +1,71 @@
+from datetime import timedelta
+
+import pytest
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from garpix_user.mixins.admin.bulk_actions import format_pk_ranges
+from garpix_user.models import AccessToken, RefreshToken
+from garpix_user.utils.current_date import set_current_date
+
+
+@pytest.mark.django_db
+class TestAdminBulkActions:
+    @pytest.fixture(autouse=True)
+    def users(self):
+        self.users = [get_user_model().objects.create_user(username=f'user_{number}', email=f'user_{number}@example.com',
+                                                           password='Str0ng!pass77', login_attempts_count=2)
+                      for number in range(5)]
+        superuser = get_user_model().objects.create_superuser(username='admin', email='admin@example.com',
+                                                              password='Adm1n!pass77')
+        self.client = Client()
+        self.client.force_login(superuser)
+
+    def run_action(self, action, statement=None):
+        url = reverse(f'admin:{get_user_model()._meta.app_label}_{get_user_model()._meta.model_name}_changelist')
+        statement = statement or f'UPDATE "{get_user_model()._meta.db_table}"'
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(url, {'action': action, 'post': 'yes',
+                                              '_selected_action': [user.pk for user in self.users]})
+        assert response.status_code == 302
+        return [query['sql'] for query in queries.captured_queries if query['sql'].startswith(statement)]
+
+    @pytest.mark.parametrize('action, values', [
+        ('delete_selected', {'is_deleted': True, 'is_active': False}),
+        ('block_users', {'is_blocked': True}),
+        ('unblock_users', {'is_blocked': False, 'login_attempts_count': 0}),
+        ('force_password_update', {'needs_password_update': True}),
+        ('reset_login_attempts', {'login_attempts_count': 0}),
+    ])
+    def test_one_update_per_action(self, action, values):  #Проверяет, что массовое действие над выделенными пользователями выполняется одним UPDATE.
+        updates = self.run_action(action)
+
+        assert len(updates) == 1
+        for user in self.users:
+            user.refresh_from_db()
+            assert {field: getattr(user, field) for field in values} == values
+
+    def test_delete_keeps_deleted_at(self):  #Проверяет, что массовое удаление не меняет дату удаления уже удаленных пользователей.
+        deleted_at = set_current_date() - timedelta(days=30)
+        get_user_model().objects.filter(pk=self.users[0].pk).update(is_deleted=True, deleted_at=deleted_at)
+
+        assert len(self.run_action('delete_selected')) == 1
+        self.users[0].refresh_from_db()
+        assert self.users[0].deleted_at == deleted_at
+        assert get_user_model().objects.filter(pk__in=[user.pk for user in self.users[1:]],
+                                               deleted_at__gt=deleted_at).count() == 4
+
+    def test_revoke_tokens(self):  #Проверяет, что отзыв токенов удаляет токены всех выделенных пользователей одним DELETE на таблицу.
+        for user in self.users:
+            AccessToken.objects.create(user=user)
+            RefreshToken.objects.create(user=user)
+
+        assert len(self.run_action('revoke_tokens', f'DELETE FROM "{AccessToken._meta.db_table}"')) == 1
+        assert not AccessToken.objects.filter(user__in=self.users).exists()
+        assert not RefreshToken.objects.filter(user__in=self.users).exists()
+
+    def test_format_pk_ranges(self):  #Проверяет, что id в записи журнала сворачиваются в диапазоны.
+        assert format_pk_ranges([7, 1, 3, 2, 9, 10]) == '1-3,7,9-10'
@@ -0,0 +1,69 @@
+from types import SimpleNamespace
+
+import pytest
+
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group, Permission
+from django.test import RequestFactory
+from garpix_user.admin import UserAdmin
+from garpix_user.utils.audit_log import ib_logger
+
+
+@pytest.mark.django_db
+class TestAdminM2MDiff:
+    @pytest.fixture(autouse=True)
+    def user(self):
+        self.user = get_user_model().objects.create_user(username='m2m_user', email='m2m_user@example.com',
+                                                         password='Str0ng!pass77')
+        self.editors, self.viewers = Group.objects.create(name='editors'), Group.objects.create(name='viewers')
+        # the admin form selects the content type with the permissions, see BaseUserAdmin.formfield_for_manytomany
+        permissions = Permission.objects.select_related('content_type')
+        self.change_group, self.view_group = permissions.get(codename='change_group'), \
+            permissions.get(codename='view_group')
+        self.user.groups.add(self.editors)
+        self.user.user_permissions.add(self.change_group)
+
+    def get_form(self, groups, user_permissions):
+        def save_m2m():
+            self.user.groups.set(groups)
+            self.user.user_permissions.set(user_permissions)
+
+        return SimpleNamespace(instance=self.user, save_m2m=save_m2m,
+                               cleaned_data={'groups': groups, 'user_permissions': user_permissions},
+                               fields={'groups': SimpleNamespace(queryset=Group.objects.all()),
+                                       'user_permissions': SimpleNamespace(
+                                           queryset=Permission.objects.select_related('content_type'))})
+
+    def test_get_m2m_diff(self, django_assert_num_queries):  #Проверяет, что разница m2m содержит добавленные и удаленные объекты и запрашивает из базы только удаленные.
+        form = self.get_form([self.viewers], [self.change_group, self.view_group])
+        with django_assert_num_queries(2):
+            snapshot = UserAdmin.get_m2m_snapshot(form, change=True)
+        assert snapshot == {'groups': {self.editors.pk}, 'user_permissions': {self.change_group.pk}}
+
+        form.save_m2m()
+        with django_assert_num_queries(1):
+            diff = UserAdmin.get_m2m_diff(form, snapshot)
+        assert diff == {'groups': ({'viewers'}, {'editors'}), 'user_permissions': ({str(self.view_group)}, set())}
+
+    def test_get_m2m_diff_unchanged(self, django_assert_num_queries):  #Проверяет, что для неизмененных полей разница пустая и не требует запросов.
+        form = self.get_form([self.editors], [self.change_group])
+        snapshot = UserAdmin.get_m2m_snapshot(form, change=True)
+        with django_assert_num_queries(0):
+            assert UserAdmin.get_m2m_diff(form, snapshot) == {}
+
+    def test_save_related_logs(self, mocker):  #Проверяет, что при сохранении в журнал пишутся добавление в группы, удаление из групп и изменение прав, а кеш прав пользователя сбрасывается.
+        logs = []
+        mocker.patch.object(ib_logger, 'write_string', side_effect=logs.append)
+        invalidate = mocker.patch('garpix_user.admin.user.invalidate_user_permissions')
+        request = RequestFactory().post('/admin/')
+        request.user = self.user
+        model_admin = admin.site._registry[get_user_model()]
+
+        model_admin.save_related(request, self.get_form([self.viewers], [self.view_group]), [], change=True)
+
+        invalidate.assert_called_once_with([self.user.pk])
+        assert len(logs) == 3
+        assert "добавлен в группы {'viewers'}" in logs[0]
+        assert "удален из групп {'editors'}" in logs[1]
+        assert f"+добавлены {{'{self.view_group}'}}" in logs[2] and f"-удалены {{'{self.change_group}'}}" in logs[2]
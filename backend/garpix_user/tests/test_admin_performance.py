@@ -0,0 +1,72 @@
+import pytest
+
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import Client
+from django.urls import reverse
+from garpix_user.mixins.admin.performance import EstimatedCountPaginator
+
+
+@pytest.mark.django_db
+class TestAdminPerformance:
+    @pytest.fixture(autouse=True)
+    def users(self):
+        self.users = [get_user_model().objects.create_user(username=f'user_{number}', email=f'user_{number}@example.com',
+                                                           password='Str0ng!pass77') for number in range(5)]
+
+    def get_paginator(self):
+        return EstimatedCountPaginator(get_user_model().objects.order_by('pk'), 2)
+
+    def test_exact_count_off_postgres(self, mocker):  #Проверяет, что вне Postgres количество считается через COUNT(*) без оценки.
+        get_estimate = mocker.patch.object(EstimatedCountPaginator, 'get_estimate')
+        assert self.get_paginator().count == 5
+        get_estimate.assert_not_called()
+
+    def test_exact_count_below_threshold(self, mocker):  #Проверяет, что оценка ниже ADMIN_ESTIMATED_COUNT_THRESHOLD заменяется точным количеством.
+        mocker.patch.object(connection, 'vendor', 'postgresql')
+        get_estimate = mocker.patch.object(EstimatedCountPaginator, 'get_estimate', return_value=3)
+        assert self.get_paginator().count == 5
+        get_estimate.assert_called_once()
+
+    def test_estimated_count_above_threshold(self, settings, mocker, django_assert_num_queries):  #Проверяет, что оценка не ниже порога возвращается как есть, без запроса COUNT(*).
+        settings.GARPIX_USER = {**settings.GARPIX_USER, 'ADMIN_ESTIMATED_COUNT_THRESHOLD': 1000}
+        mocker.patch.object(connection, 'vendor', 'postgresql')
+        mocker.patch.object(EstimatedCountPaginator, 'get_estimate', return_value=250000)
+        paginator = self.get_paginator()
+        with django_assert_num_queries(0):
+            assert paginator.count == 250000
+        assert paginator.num_pages == 125000
+
+    def test_changelist_keyset_pagination(self, settings, mocker):  #Проверяет, что в режиме ADMIN_PERFORMANCE_MODE список пользователей листается курсором по id без пропусков и повторов.
+        settings.GARPIX_USER = {**settings.GARPIX_USER, 'ADMIN_PERFORMANCE_MODE': True}
+        mocker.patch.object(admin.site._registry[get_user_model()], 'list_per_page', 2)
+        superuser = get_user_model().objects.create_superuser(username='admin', email='admin@example.com',
+                                                              password='Adm1n!pass77')
+        client = Client()
+        client.force_login(superuser)
+        url = reverse(f'admin:{get_user_model()._meta.app_label}_{get_user_model()._meta.model_name}_changelist')
+
+        pages, cursor = [], None
+        while True:
+            response = client.get(url, {'before': cursor} if cursor else {})
+            assert response.status_code == 200
+            pages.append([user.pk for user in response.context['cl'].result_list])
+            cursor = response.context.get('keyset_next')
+            if cursor is None:
+                break
+
+        expected = sorted([user.pk for user in self.users] + [superuser.pk], reverse=True)
+        assert pages == [expected[:2], expected[2:4], expected[4:]]
+
+    def test_changelist_search_by_identifier(self, settings):  #Проверяет, что в режиме ADMIN_PERFORMANCE_MODE поиск находит пользователя по email через UserIdentifier.
+        settings.GARPIX_USER = {**settings.GARPIX_USER, 'ADMIN_PERFORMANCE_MODE': True}
+        superuser = get_user_model().objects.create_superuser(username='admin', email='admin@example.com',
+                                                              password='Adm1n!pass77')
+        client = Client()
+        client.force_login(superuser)
+        url = reverse(f'admin:{get_user_model()._meta.app_label}_{get_user_model()._meta.model_name}_changelist')
+
+        response = client.get(url, {'q': 'USER_3@example.com'})
+        assert response.status_code == 200
+        assert [user.pk for user in response.context['cl'].result_list] == [self.users[3].pk]
@@ -0,0 +1,67 @@
+from io import StringIO
+
+import pytest
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group, Permission
+from django.core.management import call_command
+from garpix_user.models import ArchivedUser, PasswordHistory, UserIdentifier, UserSession
+
+
+@pytest.mark.django_db
+class TestArchivedUser:
+    def create_user(self, username):
+        return get_user_model().objects.create_user(username=username, email=f'{username}@example.com',
+                                                    password='Str0ng!pass77', first_name='John')
+
+    def test_archive_restore_round_trip(self):  #Проверяет, что пользователь после архивации и восстановления возвращается с теми же полями, группами, правами, историей паролей и сессией.
+        user = self.create_user('archived_user')
+        group = Group.objects.create(name='editors')
+        permission = Permission.objects.get(codename='change_group')
+        user.groups.add(group)
+        user.user_permissions.add(permission)
+        PasswordHistory.objects.create(user=user, password=user.password)
+        user_session = UserSession.objects.create(user=user)
+        user.delete()
+        user.refresh_from_db()
+
+        assert ArchivedUser.archive_users([user.pk]) == 1
+        assert not get_user_model().objects.filter(pk=user.pk).exists()
+        assert not UserSession.objects.filter(pk=user_session.pk).exists()
+
+        ArchivedUser.objects.get(user_id=user.pk).restore(activate=True)
+        restored = get_user_model().objects.get(pk=user.pk)
+        assert (restored.username, restored.email, restored.first_name, restored.password) == \
+               (user.username, user.email, user.first_name, user.password)
+        assert restored.is_active and not restored.is_deleted and restored.deleted_at is None
+        assert list(restored.groups.all()) == [group]
+        assert list(restored.user_permissions.all()) == [permission]
+        assert PasswordHistory.objects.filter(user=restored).count() == 1
+        assert UserSession.objects.filter(pk=user_session.pk, user=restored).exists()
+        assert UserIdentifier.objects.filter(user=restored, kind='email', value='archived_user@example.com').exists()
+        assert not ArchivedUser.objects.exists()
+
+    def test_deleted_at_follows_is_deleted(self):  #Проверяет, что deleted_at выставляется и сбрасывается при изменении is_deleted, например в админке.
+        user = self.create_user('deleted_user')
+        user.is_deleted = True
+        user.save()
+        user.refresh_from_db()
+        assert user.deleted_at is not None
+
+        user.is_deleted = False
+        user.save(update_fields=['is_deleted'])
+        user.refresh_from_db()
+        assert user.deleted_at is None
+
+    def test_restore_command_reports_taken_identifiers(self):  #Проверяет, что команда восстановления сообщает о пользователе, чей username заняли после архивации, и восстанавливает остальных.
+        taken, free = self.create_user('taken_user'), self.create_user('free_user')
+        ArchivedUser.archive_users([taken.pk, free.pk])
+        get_user_model().objects.create_user(username='taken_user', email='new@example.com', password='Str0ng!pass77')
+
+        stdout, stderr = StringIO(), StringIO()
+        call_command('restore_archived_users', taken.pk, free.pk, stdout=stdout, stderr=stderr)
+
+        assert f'Could not restore user {taken.pk}' in stderr.getvalue()
+        assert 'Restored 1 user(s)' in stdout.getvalue()
+        assert get_user_model().objects.filter(pk=free.pk).exists()
+        assert ArchivedUser.objects.filter(user_id=taken.pk).exists()
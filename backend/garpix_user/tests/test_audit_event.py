@@ -0,0 +1,66 @@
+from datetime import timedelta
+
+import pytest
+
+from django.contrib.auth import get_user_model
+from django.test import Client
+from django.urls import reverse
+from garpix_utils.logs.enums.get_enums import Action, ActionResult
+from garpix_user.models import AuditEvent
+from garpix_user.utils.audit_log import ib_logger
+from garpix_user.utils.current_date import set_current_date
+
+
+@pytest.mark.django_db
+class TestAuditEvent:
+    def test_parse(self):  #Проверяет, что запись LoggerIso разбирается в событие, включая значения с разделителем внутри кавычек.
+        log = ib_logger.create_log(action=Action.user_login.value, obj='User', obj_address='/login',
+                                   result=ActionResult.success, sbj='john', sbj_address='10.0.0.1',
+                                   msg='Пользователь | вошел')
+        event = AuditEvent.parse(log)
+        assert event.action_id == Action.user_login.value.id
+        assert event.time is not None
+        assert (event.subject, event.subject_address, event.object, event.object_address) == \
+               ('john', '10.0.0.1', 'User', '/login')
+        assert event.message == 'Пользователь | вошел'
+
+    def test_parse_invalid(self):  #Проверяет, что запись без времени или идентификатора действия не превращается в событие.
+        assert AuditEvent.parse('not a log record') is None
+        assert AuditEvent.parse('act="Вход в систему" | sbj="john"') is None
+
+    def test_sync_store_error_drops_event(self, settings, mocker):  #Проверяет, что ошибка сохранения события в синхронном режиме не ломает запрос, а событие отбрасывается и учитывается.
+        settings.GARPIX_USER = {**settings.GARPIX_USER, 'USE_ASYNC_AUDIT_LOG': False, 'USE_AUDIT_EVENT_STORE': True}
+        mocker.patch.object(AuditEvent, 'store', side_effect=RuntimeError('database is locked'))
+        store_errors = ib_logger.sink.store_errors
+        log = ib_logger.create_log(action=Action.user_login.value, obj='User', obj_address='/login',
+                                   result=ActionResult.success, sbj='john', sbj_address='10.0.0.1', msg='ok')
+
+        ib_logger.write_string(log)
+
+        assert ib_logger.sink.store_errors == store_errors + 1
+        assert not AuditEvent.objects.exists()
+
+    def test_admin_keyset_pagination(self, settings):  #Проверяет, что список событий в админке листается курсором (время, id) без пропусков и повторов, в том числе при одинаковом времени.
+        settings.GARPIX_USER = {**settings.GARPIX_USER, 'AUDIT_EVENT_PAGE_SIZE': 2}
+        now = set_current_date()
+        events = AuditEvent.objects.bulk_create([
+            AuditEvent(time=now - timedelta(minutes=minutes), action_id=Action.user_login.value.id, subject='john')
+            for minutes in (0, 1, 1, 1, 2)
+        ])
+        AuditEvent.objects.create(time=now, action_id=Action.user_login.value.id, subject='jane')
+        admin = get_user_model().objects.create_superuser(username='admin', email='admin@example.com', password='Adm1n!pass77')
+        client = Client()
+        client.force_login(admin)
+        url = reverse('admin:garpix_user_auditevent_changelist')
+
+        pages, cursor = [], None
+        while True:
+            response = client.get(url, {'subject': 'john', **({'before': cursor} if cursor else {})})
+            assert response.status_code == 200
+            pages.append([event.pk for event in response.context['events']])
+            cursor = response.context['next_cursor']
+            if cursor is None:
+                break
+
+        expected = [event.pk for event in sorted(events, key=lambda event: (event.time, event.pk), reverse=True)]
+        assert pages == [expected[:2], expected[2:4], expected[4:]]
@@ -0,0 +1,128 @@
+import threading
+import time
+
+import pytest
+
+from garpix_user.utils.batch_sink import BatchSink
+
+
+class ListSink(BatchSink):
+    settings_prefix = 'TEST_SINK'
+    thread_name = 'test_sink'
+
+    def __init__(self, fail=False, block=None):
+        super().__init__()
+        self.batches = []
+        self.fail = fail
+        self.block = block
+
+    def write_batch(self, batch):
+        if self.block is not None:
+            self.block.wait()
+        if self.fail:
+            raise ValueError('broken')
+        self.batches.append(batch)
+
+    def get_items(self):
+        return [item for batch in self.batches for item in batch]
+
+
+def wait_for(condition, timeout=2):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+@pytest.fixture
+def sink_settings(settings):
+    settings.GARPIX_USER = {**settings.GARPIX_USER, 'TEST_SINK_DURABILITY': 'high', 'TEST_SINK_BATCH_SIZE': 3}
+    return settings
+
+
+class TestBatchSink:
+    def test_flush_thread(self, sink_settings):  #Проверяет, что записи пишутся фоновым потоком без вызова flush, а после flush поток останавливается.
+        sink = ListSink()
+        sink.put(1)
+        assert wait_for(lambda: sink.get_items() == [1])
+        thread = sink._thread
+        assert thread.name == 'test_sink' and thread.is_alive()
+        sink.flush()
+        assert not thread.is_alive()
+
+    def test_batch_size(self, sink_settings):  #Проверяет, что пачка пишется, как только набирает BATCH_SIZE записей, не дожидаясь интервала.
+        sink_settings.GARPIX_USER = {**sink_settings.GARPIX_USER, 'TEST_SINK_FLUSH_INTERVAL': 10}
+        sink = ListSink()
+        for item in range(7):
+            sink.put(item)
+        assert wait_for(lambda: len(sink.batches) == 2)
+        assert sink.batches == [[0, 1, 2], [3, 4, 5]]
+        sink.flush()
+        assert sink.batches[-1] == [6]
+
+    def test_flush_interval(self, sink_settings):  #Проверяет, что неполная пачка пишется через FLUSH_INTERVAL секунд после первой записи.
+        sink_settings.GARPIX_USER = {**sink_settings.GARPIX_USER, 'TEST_SINK_BATCH_SIZE': 100,
+                                     'TEST_SINK_FLUSH_INTERVAL': 0.2}
+        sink = ListSink()
+        sink.put(1)
+        sink.put(2)
+        time.sleep(0.05)
+        assert sink.batches == []
+        assert wait_for(lambda: sink.batches == [[1, 2]])
+        sink.flush()
+
+    def test_drop_counter(self, sink_settings):  #Проверяет, что при переполненной очереди записи отбрасываются и учитываются в счетчике dropped.
+        sink_settings.GARPIX_USER = {**sink_settings.GARPIX_USER, 'TEST_SINK_DURABILITY': 'medium',
+                                     'TEST_SINK_QUEUE_SIZE': 2}
+        block = threading.Event()
+        sink = ListSink(block=block)
+        sink.put(0)
+        assert wait_for(lambda: sink.get_stats()['queue_depth'] == 0)
+        for item in range(1, 6):
+            sink.put(item)
+        assert sink.get_stats() == {'queue_depth': 2, 'dropped': 3, 'errors': 0}
+        block.set()
+        sink.flush()
+        assert sink.get_items() == [0, 1, 2]
+
+    def test_error_counter(self, sink_settings):  #Проверяет, что ошибка записи пачки учитывается в счетчике errors и не останавливает поток.
+        sink = ListSink(fail=True)
+        sink.put(1)
+        assert wait_for(lambda: sink.errors == 1)
+        assert sink._thread.is_alive()
+        sink.flush()
+
+    def test_shutdown_drain(self, sink_settings):  #Проверяет, что flush дописывает всю очередь перед остановкой потока.
+        block = threading.Event()
+        sink = ListSink(block=block)
+        for item in range(10):
+            sink.put(item)
+        threading.Timer(0.1, block.set).start()
+        sink.flush()
+        assert sink.get_items() == list(range(10))
+        assert sink.get_stats()['queue_depth'] == 0
+
+    def test_concurrent_put_and_flush(self, sink_settings):  #Проверяет, что записи, добавленные во время flush и замены очереди, не теряются.
+        sink = ListSink()
+        stopped = threading.Event()
+
+        def put_items(offset):
+            for item in range(offset, offset + 500):
+                sink.put(item)
+
+        def flush_repeatedly():
+            while not stopped.is_set():
+                sink.flush()
+
+        flusher = threading.Thread(target=flush_repeatedly)
+        flusher.start()
+        putters = [threading.Thread(target=put_items, args=(offset,)) for offset in range(0, 2000, 500)]
+        for putter in putters:
+            putter.start()
+        for putter in putters:
+            putter.join()
+        stopped.set()
+        flusher.join()
+        sink.flush()
+
+        assert sorted(sink.get_items()) == list(range(2000))
@@ -0,0 +1,62 @@
+import pytest
+
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIRequestFactory, force_authenticate
+from garpix_user.models import ConfirmationChallenge, PasswordHistory
+from garpix_user.tasks import resend_confirmations
+from garpix_user.views.bulk_registration_view import bulk_registration_view
+
+
+@pytest.mark.django_db
+class TestBulkRegistrationView:
+    def setup_method(self):
+        self.factory = APIRequestFactory()
+
+    def teardown_method(self):
+        get_user_model().objects.all().delete()
+
+    def post(self, data, user):
+        request = self.factory.post('/register/bulk/', data, format='json')
+        force_authenticate(request, user=user)
+        return bulk_registration_view(request)
+
+    def test_bulk_registration(self):  #Проверяет, что валидные регистрации создаются одним запросом, а ошибочные и повторяющиеся возвращаются с ошибками по позиции.
+        admin = get_user_model().objects.create_superuser(username='admin', email='admin@example.com', phone='+79990000000', password='Adm1n!pass77')
+        data = [
+            {'username': 'user_1', 'phone': '+79990000001', 'email': 'User1@example.com', 'password': 'Str0ng!pass77'},
+            {'username': 'user_2', 'phone': '+79990000002', 'email': 'admin@example.com', 'password': 'Str0ng!pass77'},
+            {'username': 'user_3', 'phone': '+79990000003', 'email': 'user1@example.com', 'password': 'Str0ng!pass77'},
+            {'username': 'user_4', 'phone': '+79990000004', 'email': 'invalid_email', 'password': 'Str0ng!pass77'},
+        ]
+        response = self.post(data, admin)
+
+        assert response.status_code == 200
+        assert response.data['created'] == 1
+        assert [bool(result.get('errors')) for result in response.data['results']] == [False, True, True, True]
+        user = get_user_model().objects.get(pk=response.data['results'][0]['id'])
+        assert user.email == 'user1@example.com'
+        assert user.check_password('Str0ng!pass77')
+        assert PasswordHistory.objects.filter(user=user).exists()
+
+    def test_bulk_registration_staff_only(self):  #Проверяет, что пользователь без прав персонала не может регистрировать пользователей пачкой.
+        user = get_user_model().objects.create_user(username='user', email='user@example.com', phone='+79990000009', password='Us3r!pass77')
+        response = self.post([{'username': 'user_1', 'phone': '+79990000001', 'email': 'user1@example.com', 'password': 'Str0ng!pass77'}], user)
+
+        assert response.status_code == 403
+
+    def test_bulk_registration_sends_confirmations(self, settings, mocker, django_capture_on_commit_callbacks):  #Проверяет, что созданным пачкой неподтвержденным пользователям после фиксации транзакции ставится отправка кодов подтверждения.
+        settings.GARPIX_USER = {**settings.GARPIX_USER, 'USE_EMAIL_CONFIRMATION': True}
+        delay = mocker.spy(resend_confirmations, 'delay')
+        admin = get_user_model().objects.create_superuser(username='admin', email='admin@example.com', phone='+79990000000', password='Adm1n!pass77')
+        data = [
+            {'username': 'user_1', 'phone': '+79990000001', 'email': 'user1@example.com', 'password': 'Str0ng!pass77'},
+            {'username': 'user_2', 'phone': '+79990000002', 'email': 'user2@example.com', 'password': 'Str0ng!pass77'},
+        ]
+        with django_capture_on_commit_callbacks(execute=True):
+            response = self.post(data, admin)
+
+        pks = [result['id'] for result in response.data['results']]
+        assert not get_user_model().objects.filter(pk__in=pks, is_email_confirmed=True).exists()
+        delay.assert_called_once_with(sorted(pks))
+        assert set(ConfirmationChallenge.objects.filter(channel=ConfirmationChallenge.CHANNEL.EMAIL).values_list(
+            'subject_id', flat=True)) == set(pks)
@@ -0,0 +1,75 @@
+from datetime import timedelta
+
+import pytest
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from garpix_user.models import ConfirmationChallenge, TaskRun, UserSession
+from garpix_user.tasks.delete_unconfirmed_users import WATERMARK_CACHE_KEY, delete_unconfirmed_users
+from garpix_user.utils.current_date import set_current_date
+
+
+@pytest.mark.django_db
+class TestDeleteUnconfirmedUsers:
+    def setup_method(self):
+        cache.delete(WATERMARK_CACHE_KEY)
+
+    def create_users(self, count, days_ago=30, confirmed=False):
+        date_joined = set_current_date() - timedelta(days=days_ago)
+        start = get_user_model().objects.count()
+        return get_user_model().objects.bulk_create([
+            get_user_model()(username=f'user_{start + index}', email=f'user_{start + index}@example.com',
+                             is_email_confirmed=confirmed, is_phone_confirmed=confirmed, date_joined=date_joined)
+            for index in range(count)
+        ])
+
+    def test_delete_in_batches(self, settings):  #Проверяет, что неподтвержденные пользователи удаляются пачками, а подтвержденные и недавно зарегистрированные остаются.
+        settings.GARPIX_USER = {**settings.GARPIX_USER, 'DELETE_UNCONFIRMED_USERS_BATCH_SIZE': 2}
+        unconfirmed = self.create_users(5)
+        kept = self.create_users(1, confirmed=True) + self.create_users(1, days_ago=1)
+
+        delete_unconfirmed_users()
+
+        assert not get_user_model().objects.filter(pk__in=[user.pk for user in unconfirmed]).exists()
+        assert get_user_model().objects.filter(pk__in=[user.pk for user in kept]).count() == 2
+        task_run = TaskRun.objects.latest('started_at')
+        assert (task_run.batches, task_run.rows_affected) == (3, 5)
+        assert cache.get(WATERMARK_CACHE_KEY) == 0
+
+    def test_resume_from_watermark(self):  #Проверяет, что удаление продолжается с сохраненного id, а после полного прохода id сбрасывается.
+        users = self.create_users(4)
+        cache.set(WATERMARK_CACHE_KEY, users[1].pk, timeout=None)
+
+        delete_unconfirmed_users()
+
+        assert list(get_user_model().objects.order_by('pk').values_list('pk', flat=True)) == [users[0].pk, users[1].pk]
+        assert cache.get(WATERMARK_CACHE_KEY) == 0
+
+    def test_soft_delete(self, settings):  #Проверяет, что в мягком режиме пользователи помечаются удаленными и не обрабатываются повторно.
+        settings.GARPIX_USER = {**settings.GARPIX_USER, 'DELETE_UNCONFIRMED_USERS_SOFT': True}
+        users = self.create_users(2)
+
+        delete_unconfirmed_users()
+
+        for user in get_user_model().objects.filter(pk__in=[user.pk for user in users]):
+            assert user.is_deleted and not user.is_active and user.deleted_at is not None
+        delete_unconfirmed_users()
+        assert TaskRun.objects.latest('started_at').rows_scanned == 0
+
+    def test_delete_confirmation_challenges(self):  #Проверяет, что коды подтверждения пользователя и его сессий удаляются вместе с пользователем.
+        user, kept_user = self.create_users(1)[0], self.create_users(1, confirmed=True)[0]
+        user_session = UserSession.objects.create(user=user)
+        expires_at = set_current_date() + timedelta(days=1)
+        ConfirmationChallenge.objects.bulk_create([
+            ConfirmationChallenge(subject_type=ConfirmationChallenge.SUBJECT_TYPE.USER, subject_id=user.pk,
+                                  channel='email', code='1', expires_at=expires_at),
+            ConfirmationChallenge(subject_type=ConfirmationChallenge.SUBJECT_TYPE.USER_SESSION,
+                                  subject_id=user_session.pk, channel='email', code='2', expires_at=expires_at),
+            ConfirmationChallenge(subject_type=ConfirmationChallenge.SUBJECT_TYPE.USER, subject_id=kept_user.pk,
+                                  channel='email', code='3', expires_at=expires_at),
+        ])
+
+        delete_unconfirmed_users()
+
+        assert list(ConfirmationChallenge.objects.values_list('code', flat=True)) == ['3']
+        assert not UserSession.objects.filter(pk=user_session.pk).exists()
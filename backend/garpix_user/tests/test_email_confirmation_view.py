@@ -1,10 +1,13 @@
+from datetime import timedelta
+
 import pytest
 from django.contrib.auth import get_user_model
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIClient
-from garpix_user.exceptions import NotAuthenticateException
-from garpix_user.models import UserSession
+from garpix_user.exceptions import IncorrectCodeException, NotAuthenticateException, TooManyAttemptsException, \
+    WaitException
+from garpix_user.models import ConfirmationChallenge, UserSession
 
 User = get_user_model()
 
@@ -73,3 +76,43 @@ class TestEmailConfirmationLinkView:
         assert response.status_code == status.HTTP_302_FOUND
         assert response.url == '/?status=error'
         mock_confirm.assert_called_with('valid_hash')
+
+
+@pytest.mark.django_db
+class TestEmailConfirmationChallenge:
+    @pytest.fixture(autouse=True)
+    def user(self):
+        self.user = User.objects.create_user(username='testuser', email='testuser@example.com')
+
+    def test_confirm_email_by_link_lookup(self):  #Проверяет, что пользователь находится по сохраненному хэшу ссылки подтверждения без перебора всех пользователей.
+        challenge = self.user.issue_email_challenge(self.user.email)
+        result, user = User.confirm_email_by_link(challenge.link_hash)
+        assert result is True
+        assert user == self.user
+        result, error = User.confirm_email_by_link('invalid_hash')
+        assert result is False
+
+    def test_confirm_email_attempts_limit(self, settings):  #Проверяет, что после CONFIRM_CODE_MAX_ATTEMPTS проверок код отклоняется, пока не будет выпущен новый.
+        settings.GARPIX_USER = {**settings.GARPIX_USER, 'CONFIRM_CODE_MAX_ATTEMPTS': 2}
+        challenge = self.user.issue_email_challenge(self.user.email)
+        assert isinstance(self.user.confirm_email('wrong'), IncorrectCodeException)
+        assert isinstance(self.user.confirm_email('wrong'), IncorrectCodeException)
+        assert isinstance(self.user.confirm_email(challenge.code), TooManyAttemptsException)
+        challenge.refresh_from_db()
+        assert challenge.attempts == 2
+
+        challenge = self.user.issue_email_challenge(self.user.email)
+        assert self.user.confirm_email(challenge.code) is True
+
+    def test_send_code_throttled_first(self, settings, mocker):  #Проверяет, что повторный запрос кода раньше TIME_LAST_REQUEST отклоняется до проверки занятости email, а после него проходит.
+        settings.GARPIX_USER = {**settings.GARPIX_USER, 'TIME_LAST_REQUEST': 1, 'USE_EMAIL_LINK_CONFIRMATION': False}
+        registered = mocker.patch('garpix_user.utils.registered_identifiers.is_identifier_registered',
+                                  return_value=False)
+        challenge = self.user.issue_email_challenge(self.user.email)
+
+        assert isinstance(self.user.send_email_confirmation_code('new@example.com'), WaitException)
+        registered.assert_not_called()
+
+        ConfirmationChallenge.objects.filter(pk=challenge.pk).update(sent_at=challenge.sent_at - timedelta(minutes=1))
+        assert self.user.send_email_confirmation_code('new@example.com') is True
+        assert isinstance(self.user.send_email_confirmation_code('new@example.com'), WaitException)
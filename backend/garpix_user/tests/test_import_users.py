@@ -0,0 +1,120 @@
+import csv
+import json
+from io import StringIO
+
+import pytest
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from garpix_user.management.commands.import_users import Command
+from garpix_user.models import UserIdentifier
+
+ROWS = [
+    {'username': 'import_1', 'email': 'import_1@example.com', 'phone': '+79990000001', 'password': 'Str0ng!pass77'},
+    {'username': 'import_2', 'email': 'import_2@example.com', 'phone': '+79990000002', 'password': 'Str0ng!pass77'},
+    {'username': 'import_3', 'email': 'import_3@example.com', 'phone': '+79990000003', 'password': 'Str0ng!pass77'},
+    {'username': 'import_4', 'email': 'import_4@example.com', 'phone': '+79990000004', 'password': 'Str0ng!pass77'},
+    {'username': 'import_5', 'email': 'import_5@example.com', 'phone': '+79990000005'},
+]
+
+
+@pytest.mark.django_db(transaction=True)
+class TestImportUsers:
+    @pytest.fixture(autouse=True)
+    def paths(self, tmp_path):
+        self.path = str(tmp_path / 'users.csv')
+        self.errors_path = f'{self.path}.errors.jsonl'
+        self.checkpoint_path = f'{self.path}.checkpoint'
+
+    def write_csv(self, rows):
+        with open(self.path, 'w', newline='') as file:
+            writer = csv.DictWriter(file, fieldnames=['username', 'email', 'phone', 'password'])
+            writer.writeheader()
+            writer.writerows(rows)
+
+    def import_users(self, **options):
+        stdout = StringIO()
+        call_command('import_users', self.path, workers=1, stdout=stdout, **options)
+        return stdout.getvalue()
+
+    def read_errors(self):
+        with open(self.errors_path) as file:
+            return [json.loads(line) for line in file]
+
+    def test_import(self):  #Проверяет, что пользователи из файла создаются с захешированным паролем и идентификаторами, а строки без пароля получают непригодный пароль.
+        self.write_csv(ROWS)
+
+        output = self.import_users(batch_size=2)
+
+        assert 'Imported 5 user(s), 0 row(s) rejected' in output
+        user = get_user_model().objects.get(username='import_1')
+        assert user.check_password('Str0ng!pass77')
+        assert not get_user_model().objects.get(username='import_5').has_usable_password()
+        assert UserIdentifier.objects.filter(kind='phone', value='+79990000003').exists()
+        assert self.read_errors() == []
+
+    def test_rejected_rows(self):  #Проверяет, что отклоненные строки попадают в файл ошибок с номером строки и без пароля.
+        self.write_csv([
+            ROWS[0],
+            {**ROWS[1], 'email': 'not an email'},
+            {**ROWS[2], 'password': 'weak'},
+            {**ROWS[3], 'username': '', 'email': '', 'phone': ''},
+        ])
+
+        output = self.import_users()
+
+        assert 'Imported 1 user(s), 3 row(s) rejected' in output
+        errors = self.read_errors()
+        assert [error['line'] for error in errors] == [3, 4, 5]
+        assert 'email' in errors[0]['errors']
+        assert 'password' in errors[1]['errors'] and 'password' not in errors[1]['row']
+        assert set(errors[2]['errors']) == set(get_user_model().USERNAME_FIELDS)
+
+    def test_duplicates(self):  #Проверяет, что повторы внутри файла, в том числе в разных пачках, и уже занятые идентификаторы отклоняются.
+        get_user_model().objects.create_user(username='existing', email='import_4@example.com',
+                                             phone='+79990000099', password='Str0ng!pass77')
+        self.write_csv([
+            ROWS[0],
+            {**ROWS[1], 'email': 'IMPORT_1@example.com'},
+            ROWS[2],
+            {**ROWS[3], 'username': 'import_4_other'},
+            {**ROWS[4], 'phone': '+79990000003'},
+        ])
+
+        output = self.import_users(batch_size=2)
+
+        assert 'Imported 2 user(s), 3 row(s) rejected' in output
+        assert [error['errors'] for error in self.read_errors()] == [
+            {'email': ['Already in use']}, {'email': ['Already in use']}, {'phone': ['Already in use']}]
+        assert set(get_user_model().objects.filter(username__startswith='import_').values_list(
+            'username', flat=True)) == {'import_1', 'import_3'}
+
+    def test_checkpoint_resume(self, mocker):  #Проверяет, что прерванный импорт продолжается с сохраненной позиции без повторов и дописывает файл ошибок.
+        self.write_csv([ROWS[0], {**ROWS[1], 'password': 'weak'}, ROWS[2], ROWS[3], ROWS[4]])
+        write_batch = Command.write_batch
+
+        def interrupt(command, *args):
+            if command.written:
+                raise KeyboardInterrupt
+            command.written = True
+            return write_batch(command, *args)
+
+        mocker.patch.object(Command, 'written', False, create=True)
+        mocker.patch.object(Command, 'write_batch', interrupt)
+        with pytest.raises(KeyboardInterrupt):
+            self.import_users(batch_size=2)
+        mocker.stopall()
+
+        with open(self.checkpoint_path) as file:
+            assert json.load(file) == {'position': 2, 'imported': 1, 'failed': 1}
+        assert get_user_model().objects.filter(username__startswith='import_').count() == 1
+
+        output = self.import_users(batch_size=2)
+
+        assert 'Resuming after row 2' in output
+        assert 'Imported 4 user(s), 1 row(s) rejected' in output
+        assert get_user_model().objects.filter(username__startswith='import_').count() == 4
+        assert [error['line'] for error in self.read_errors()] == [3]
+
+        output = self.import_users(batch_size=2, restart=True)
+        assert 'Imported 0 user(s), 5 row(s) rejected' in output
@@ -1,9 +1,13 @@
+from datetime import timedelta
+
 import pytest
 from django.contrib.auth import get_user_model
+from django.utils import timezone
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIClient
 from backend.app.settings import GARPIX_USER
+from garpix_user.models import GarpixUserPasswordConfiguration
 
 User = get_user_model()
 
@@ -70,3 +74,29 @@ class TestObtainAuthToken:
         assert response.status_code == status.HTTP_200_OK
         mock_create_log.assert_called()
         mock_write_string.assert_called()
+
+
+@pytest.mark.django_db
+class TestObtainAuthTokenPasswordExpiry:
+    @pytest.fixture(autouse=True)
+    def user(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='testuser', email='testuser@example.com', password='testpassword')
+        self.url = reverse('garpix_user:garpix_user_api:api_login')
+
+    def test_obtain_auth_token_with_expired_password(self):  #Проверяет, что срок действия пароля хранится в password_expires_at и вход с просроченным паролем запрещен.
+        password_config = GarpixUserPasswordConfiguration.get_solo()
+        password_config.password_validity_period = 30
+        password_config.save()
+
+        self.user.set_password('testpassword')
+        assert self.user.password_expires_at == self.user.password_updated_date + timedelta(days=30)
+
+        self.user.password_updated_date = timezone.now() - timedelta(days=31)
+        self.user.save()
+        self.user.refresh_from_db()
+        assert self.user.is_password_expired()
+
+        response = self.client.post(self.url, {'username': 'testuser', 'password': 'testpassword'})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert 'needs_password_update' in response.data['extra_parameters']
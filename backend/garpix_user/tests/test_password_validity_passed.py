@@ -0,0 +1,41 @@
+from datetime import timedelta
+
+import pytest
+
+from django.conf import settings as django_settings
+from django.contrib.auth import get_user_model
+from garpix_notify.models import NotifyCategory, NotifyTemplate, NotifyUserList, SystemNotify
+from garpix_notify.models.choices import TYPE
+from garpix_user.tasks.password_validity_passed import password_validity_passed_chunk
+from garpix_user.utils.current_date import set_current_date
+
+
+@pytest.mark.django_db
+class TestPasswordValidityPassed:
+    @pytest.fixture(autouse=True)
+    def password_settings(self, settings):
+        settings.GARPIX_USER = {**settings.GARPIX_USER, 'ADMIN_PASSWORD_SETTINGS': False,
+                                'PASSWORD_VALIDITY_PERIOD': 30, 'PASSWORD_VALIDITY_INFORM_DAYS': 5}
+
+    def create_user(self, username):
+        return get_user_model().objects.create_user(username=username, email=f'{username}@example.com',
+                                                    password='Str0ng!pass77')
+
+    def test_template_recipients(self):  #Проверяет, что уведомление получают пользователь, получатель шаблона и пользователи списков рассылки шаблона с заголовком шаблона, и повторно в тот же день оно не создается.
+        observer, member = self.create_user('observer'), self.create_user('member')
+        user_list = NotifyUserList.objects.create(title='admins')
+        user_list.users.add(member)
+        template = NotifyTemplate.objects.create(
+            title='password', subject='Password expires', text='{{message}}', type=TYPE.SYSTEM, user=observer,
+            event=django_settings.PASSWORD_INVALID_EVENT, category=NotifyCategory.objects.create(title='system'))
+        template.user_lists.add(user_list)
+        user = self.create_user('expiring')
+        get_user_model().objects.filter(pk=user.pk).update(password_expires_at=set_current_date() + timedelta(days=2))
+
+        password_validity_passed_chunk(user.pk, user.pk)
+        password_validity_passed_chunk(user.pk, user.pk)
+
+        notifies = SystemNotify.objects.filter(event=django_settings.PASSWORD_INVALID_EVENT)
+        assert sorted(notifies.values_list('user_id', 'room_name', 'title')) == sorted(
+            (recipient.pk, f'workflow-{user.pk}', 'Password expires') for recipient in (observer, member, user))
+        assert {notify.data_json['user'] for notify in notifies} == {observer.pk, member.pk, user.pk}
@@ -0,0 +1,76 @@
+import pytest
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group, Permission
+from django.core.cache import cache
+from garpix_user.utils.backends import CachedModelBackend
+
+
+@pytest.mark.django_db
+class TestPermissionCache:
+    @pytest.fixture(autouse=True)
+    def permission_cache(self, settings):
+        settings.GARPIX_USER = {**settings.GARPIX_USER, 'USE_PERMISSION_CACHE': True, 'PERMISSION_CACHE': 'default'}
+        cache.clear()
+        self.user = get_user_model().objects.create_user(username='perm_user', email='perm_user@example.com',
+                                                         password='Str0ng!pass77')
+        self.group = Group.objects.create(name='editors')
+        self.change_group = Permission.objects.get(codename='change_group')
+        self.view_group = Permission.objects.get(codename='view_group')
+        yield
+        cache.clear()
+
+    def get_permissions(self):
+        # a new instance per call, like a new request
+        return CachedModelBackend().get_all_permissions(get_user_model().objects.get(pk=self.user.pk))
+
+    def test_permissions_are_cached(self, django_assert_num_queries):  #Проверяет, что права пользователя запрашиваются из базы один раз, а следующие экземпляры пользователя берут их из кеша.
+        self.user.user_permissions.add(self.change_group)
+        assert self.get_permissions() == {'auth.change_group'}
+
+        user = get_user_model().objects.get(pk=self.user.pk)
+        with django_assert_num_queries(0):
+            assert CachedModelBackend().get_all_permissions(user) == {'auth.change_group'}
+
+    def test_user_permissions_changed(self, django_capture_on_commit_callbacks):  #Проверяет, что изменение прав пользователя сбрасывает его кеш через версию пользователя.
+        assert self.get_permissions() == set()
+        with django_capture_on_commit_callbacks(execute=True):
+            self.user.user_permissions.add(self.change_group)
+        assert self.get_permissions() == {'auth.change_group'}
+
+    def test_user_groups_changed(self, django_capture_on_commit_callbacks):  #Проверяет, что добавление пользователя в группу и удаление из нее сбрасывают кеш с любой стороны связи.
+        self.group.permissions.add(self.view_group)
+        assert self.get_permissions() == set()
+
+        with django_capture_on_commit_callbacks(execute=True):
+            self.group.user_set.add(self.user)
+        assert self.get_permissions() == {'auth.view_group'}
+
+        with django_capture_on_commit_callbacks(execute=True):
+            self.user.groups.clear()
+        assert self.get_permissions() == set()
+
+    def test_group_permissions_changed(self, django_capture_on_commit_callbacks):  #Проверяет, что изменение прав группы сбрасывает кеш всех пользователей через общую версию.
+        self.user.groups.add(self.group)
+        assert self.get_permissions() == set()
+
+        with django_capture_on_commit_callbacks(execute=True):
+            self.group.permissions.add(self.view_group)
+        assert self.get_permissions() == {'auth.view_group'}
+
+    @pytest.mark.parametrize('deleted', ['group', 'permission'])
+    def test_deleted(self, deleted, django_capture_on_commit_callbacks):  #Проверяет, что удаление группы или права сбрасывает кеш всех пользователей.
+        self.group.permissions.add(self.view_group)
+        self.user.groups.add(self.group)
+        assert self.get_permissions() == {'auth.view_group'}
+
+        with django_capture_on_commit_callbacks(execute=True):
+            (self.group if deleted == 'group' else self.view_group).delete()
+        assert self.get_permissions() == set()
+
+    def test_no_bump_before_commit(self, django_capture_on_commit_callbacks):  #Проверяет, что версия меняется только после фиксации транзакции, чтобы старые права не закешировались под новой версией.
+        assert self.get_permissions() == set()
+        with django_capture_on_commit_callbacks() as callbacks:
+            self.user.user_permissions.add(self.change_group)
+            assert self.get_permissions() == set()
+        assert len(callbacks) == 1
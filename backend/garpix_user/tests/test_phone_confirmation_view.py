@@ -1,9 +1,12 @@
 import pytest
+from django.db import transaction
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import AnonymousUser
+from django.contrib.sessions.backends.db import SessionStore
 from django.test import RequestFactory
 from rest_framework import status
 from rest_framework.exceptions import NotAuthenticated
+from garpix_user.models import NotificationOutbox
 from garpix_user.views import PhoneConfirmationView
 
 User = get_user_model()
@@ -24,7 +27,7 @@ class TestPhoneConfirmationView:
         assert response.data['result'] == 'success'
 
     def test_send_code_for_unauthenticated_user_with_preregistration(self, settings):  #Проверяет, что неаутентифицированный пользователь может успешно отправить код подтверждения телефона, если настройка USE_PREREGISTRATION_PHONE_CONFIRMATION включена.
-        settings.GARPIX_USER['USE_PREREGISTRATION_PHONE_CONFIRMATION'] = True
+        settings.GARPIX_USER = {**settings.GARPIX_USER, 'USE_PREREGISTRATION_PHONE_CONFIRMATION': True}
         request = self.factory.post('/phone-confirmation/send-code/', {'phone': '+79001234567'}, format='json')
         request.user = AnonymousUser()
         response = self.view(request, 'send_code')
@@ -32,7 +35,7 @@ class TestPhoneConfirmationView:
         assert response.data['result'] == 'success'
 
     def test_send_code_for_unauthenticated_user_without_preregistration(self, settings):  #Проверяет, что неаутентифицированный пользователь не может отправить код подтверждения телефона, если настройка `USEPREREGISTRATIONPHONECONFIRMATION выключена.
-        settings.GARPIX_USER['USE_PREREGISTRATION_PHONE_CONFIRMATION'] = False
+        settings.GARPIX_USER = {**settings.GARPIX_USER, 'USE_PREREGISTRATION_PHONE_CONFIRMATION': False}
         request = self.factory.post('/phone-confirmation/send-code/', {'phone': '+79001234567'}, format='json')
         request.user = AnonymousUser()
         with pytest.raises(NotAuthenticated):
@@ -47,7 +50,7 @@ class TestPhoneConfirmationView:
         assert response.data['result'] == 'success'
 
     def test_check_code_for_unauthenticated_user_with_preregistration(self, settings):  #Проверяет, что неаутентифицированный пользователь может успешно проверить код подтверждения телефона, если настройка USEPREREGISTRATIONPHONECONFIRMATION` включена.
-        settings.GARPIX_USER['USE_PREREGISTRATION_PHONE_CONFIRMATION'] = True
+        settings.GARPIX_USER = {**settings.GARPIX_USER, 'USE_PREREGISTRATION_PHONE_CONFIRMATION': True}
         request = self.factory.post('/phone-confirmation/check-code/', {'phone_confirmation_code': '123456'}, format='json')
         request.user = AnonymousUser()
         response = self.view(request, 'check_code')
@@ -55,8 +58,34 @@ class TestPhoneConfirmationView:
         assert response.data['result'] == 'success'
 
     def test_check_code_for_unauthenticated_user_without_preregistration(self, settings):  # Проверяет, что неаутентифицированный пользователь не может проверить код подтверждения телефона, если настройка USE_PREREGISTRATION_PHONE_CONFIRMATION выключена.
-        settings.GARPIX_USER['USE_PREREGISTRATION_PHONE_CONFIRMATION'] = False
+        settings.GARPIX_USER = {**settings.GARPIX_USER, 'USE_PREREGISTRATION_PHONE_CONFIRMATION': False}
         request = self.factory.post('/phone-confirmation/check-code/', {'phone_confirmation_code': '123456'}, format='json')
         request.user = AnonymousUser()
         with pytest.raises(NotAuthenticated):
             self.view(request, 'check_code')
+
+    def test_send_code_with_notification_outbox(self, settings, mocker):  # Проверяет, что при включенной настройке USE_NOTIFICATION_OUTBOX код записывается в очередь уведомлений и отправляется задачей.
+        settings.GARPIX_USER = {**settings.GARPIX_USER, 'USE_NOTIFICATION_OUTBOX': True}
+        mock_send = mocker.patch('garpix_notify.models.Notify.send')
+        mocker.patch('garpix_user.models.NotificationOutbox.schedule_dispatch')
+        user = User.objects.create_user(username='testuser', password='testpassword')
+        request = self.factory.post('/phone-confirmation/send-code/', {'phone': '+79001234567'}, format='json')
+        request.user = user
+        request.session = SessionStore()
+        response = self.view(request, 'send_code')
+        assert response.status_code == status.HTTP_200_OK
+        assert NotificationOutbox.objects.filter(phone='+79001234567').count() == 1
+        mock_send.assert_not_called()
+
+        assert NotificationOutbox.dispatch_pending() == 1
+        mock_send.assert_called_once()
+        assert not NotificationOutbox.objects.exists()
+
+    def test_notification_outbox_dispatch_after_commit(self, settings, mocker, django_capture_on_commit_callbacks):  # Проверяет, что задача отправки ставится в очередь только после фиксации транзакции.
+        settings.GARPIX_USER = {**settings.GARPIX_USER, 'USE_NOTIFICATION_OUTBOX': True}
+        schedule_dispatch = mocker.patch('garpix_user.models.NotificationOutbox.schedule_dispatch')
+        with django_capture_on_commit_callbacks(execute=True), transaction.atomic():
+            for number in range(3):
+                NotificationOutbox.send(1, {}, phone=f'+7900123456{number}')
+            schedule_dispatch.assert_not_called()
+        assert schedule_dispatch.call_count == 3
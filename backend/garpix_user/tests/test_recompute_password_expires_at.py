@@ -0,0 +1,47 @@
+from datetime import timedelta
+
+import pytest
+
+from django.contrib.auth import get_user_model
+from garpix_user.models import GarpixUserPasswordConfiguration, TaskRun
+from garpix_user.tasks.recompute_password_expires_at import recompute_password_expires_at
+from garpix_user.utils.current_date import set_current_date
+
+
+@pytest.mark.django_db
+class TestRecomputePasswordExpiresAt:
+    def test_recompute_on_settings_period_change(self, settings):  #Проверяет, что после изменения PASSWORD_VALIDITY_PERIOD в настройках даты истечения паролей пересчитываются один раз.
+        settings.GARPIX_USER = {**settings.GARPIX_USER, 'ADMIN_PASSWORD_SETTINGS': False, 'PASSWORD_VALIDITY_PERIOD': 30}
+        password_updated_date = set_current_date() - timedelta(days=1)
+        user = get_user_model().objects.create_user(username='test_user', email='test@example.com', password='Str0ng!pass77')
+        get_user_model().objects.filter(pk=user.pk).update(password_updated_date=password_updated_date)
+
+        recompute_password_expires_at()
+        user.refresh_from_db()
+        assert user.password_expires_at == password_updated_date + timedelta(days=30)
+        assert GarpixUserPasswordConfiguration.get_solo().password_expires_at_period == 30
+
+        settings.GARPIX_USER = {**settings.GARPIX_USER, 'PASSWORD_VALIDITY_PERIOD': 60}
+        recompute_password_expires_at()
+        user.refresh_from_db()
+        assert user.password_expires_at == password_updated_date + timedelta(days=60)
+
+        recompute_password_expires_at()
+        assert TaskRun.objects.latest('started_at').batches == 0
+
+    def test_save_loads_settings_on_password_change(self, mocker):  #Проверяет, что сохранение пользователя читает настройки пароля только при смене пароля, а не при каждом сохранении.
+        user = get_user_model().objects.create_user(username='test_user', email='test@example.com', password='Str0ng!pass77')
+        get_password_settings = mocker.patch('garpix_user.utils.get_password_settings.get_password_settings',
+                                             return_value={'password_validity_period': 30})
+
+        for user in (user, get_user_model().objects.get(pk=user.pk),
+                     get_user_model().objects.only('pk', 'username', 'email', 'phone').get(pk=user.pk)):
+            user.first_name = 'Test'
+            user.save()
+            user.refresh_from_db()
+            user.save()
+        get_password_settings.assert_not_called()
+
+        user.set_password('N3w!pass7788')
+        get_password_settings.assert_called_once()
+        assert user.password_expires_at == user.password_updated_date + timedelta(days=30)
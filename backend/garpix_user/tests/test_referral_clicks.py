@@ -0,0 +1,66 @@
+import pytest
+
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from garpix_user.models import ReferralStat, ReferralType, ReferralUserLink, UserSession
+from garpix_user.utils.referral_clicks import record_referral_click, referral_click_sink
+from garpix_user.views.referral_links_view import ReferralLinkView
+
+
+@pytest.mark.django_db
+class TestReferralClicks:
+    def test_sync_click_queues_counter(self, settings, mocker):  #Проверяет, что без буфера переход сохраняет ссылку сразу, а счетчик кликов передает в очередь без UPDATE статистики.
+        settings.GARPIX_USER = {**settings.GARPIX_USER, 'USE_REFERRAL_CLICK_BUFFER': False}
+        put = mocker.patch.object(referral_click_sink, 'put')
+        referral_type = ReferralType.objects.create(title='newsletter')
+        user_session = UserSession.objects.create()
+
+        with CaptureQueriesContext(connection) as queries:
+            record_referral_click(user_session, referral_type.pk)
+
+        assert ReferralUserLink.objects.filter(user=user_session, referral_type=referral_type).exists()
+        assert not [query for query in queries.captured_queries
+                    if query['sql'].startswith(f'UPDATE "{ReferralStat._meta.db_table}"')]
+        put.assert_called_once_with((None, referral_type.pk))
+
+    def test_record_clicks(self):  #Проверяет, что пачка кликов сохраняет ссылки только для кликов с сессией, а считает все клики, включая повторные.
+        referral_type = ReferralType.objects.create(title='newsletter')
+        user_session = UserSession.objects.create()
+
+        ReferralUserLink.record_clicks([(user_session, referral_type.pk), (user_session, referral_type.pk),
+                                        (None, referral_type.pk)])
+
+        assert ReferralUserLink.objects.filter(referral_type=referral_type).count() == 1
+        assert ReferralStat.objects.get(referral_type=referral_type).clicks == 3
+
+    def test_record_clicks_deleted_type(self):  #Проверяет, что клики удаленного типа ссылки отбрасываются и не мешают сохранить остальную пачку.
+        referral_type = ReferralType.objects.create(title='newsletter')
+        deleted = ReferralType.objects.create(title='banner')
+        deleted_id = deleted.pk
+        deleted.delete()
+        user_session = UserSession.objects.create()
+
+        ReferralUserLink.record_clicks([(user_session, referral_type.pk), (user_session, deleted_id),
+                                        (None, deleted_id)])
+
+        assert list(ReferralUserLink.objects.values_list('referral_type_id', flat=True)) == [referral_type.pk]
+        assert list(ReferralStat.objects.values_list('referral_type_id', 'clicks')) == [(referral_type.pk, 1)]
+
+    @pytest.mark.django_db(transaction=True)
+    def test_sync_click_deleted_type(self, settings, mocker):  #Проверяет, что переход по ссылке типа, удаленного в другом процессе, не падает, а забывает хеш.
+        settings.GARPIX_USER = {**settings.GARPIX_USER, 'USE_REFERRAL_CLICK_BUFFER': False}
+        put = mocker.patch.object(referral_click_sink, 'put')
+        referral_type = ReferralType.objects.create(title='newsletter')
+        assert ReferralType.get_id_by_hash(referral_type.referral_hash) == referral_type.pk
+        # deleted by another process, the hash stays in the cache of this one
+        ReferralType.objects.filter(pk=referral_type.pk).delete()
+
+        assert not record_referral_click(UserSession.objects.create(), referral_type.pk)
+        assert not ReferralUserLink.objects.exists()
+        put.assert_not_called()
+
+        mocker.patch.object(UserSession, 'get_or_create_user_session', return_value=UserSession.objects.create())
+        response = ReferralLinkView.as_view()(RequestFactory().get('/'), hash=referral_type.referral_hash)
+        assert response.url.endswith('?status=error')
+        assert ReferralType.get_id_by_hash(referral_type.referral_hash) is None
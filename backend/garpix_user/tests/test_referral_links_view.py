@@ -1,7 +1,7 @@
 import pytest
 from django.urls import reverse
 from django.test import RequestFactory
-from garpix_user.models import ReferralType
+from garpix_user.models import UserSession
 from garpix_user.views.referral_links_view import ReferralLinkView
 from backend.app import settings
 
@@ -11,10 +11,11 @@ def test_referral_link_view_success(mocker):  #Проверяет, что при
     factory = RequestFactory()
     request = factory.get(reverse('referral_link', kwargs={'hash': 'testhash'}))
     view = ReferralLinkView.as_view()
-    mocker.patch('garpix_user.models.ReferralType.objects.get', return_value=ReferralType(referral_hash='testhash'))
-    mocker.patch('garpix_user.models.ReferralUserLink.objects.create', return_value=None)
-    mocker.patch('garpix_user.models.UserSession.get_or_create_user_session', return_value='testuser')
+    mocker.patch('garpix_user.models.ReferralType.get_id_by_hash', return_value=1)
+    record_referral_click = mocker.patch('garpix_user.views.referral_links_view.record_referral_click')
+    mocker.patch('garpix_user.models.UserSession.get_or_create_user_session', return_value=UserSession(id=1))
     response = view(request, hash='testhash')
+    record_referral_click.assert_called_once()
     assert response.url == f"{settings.GARPIX_USER.get('REFERRAL_REDIRECT_URL', '/')}?status=success"
 
 
@@ -23,8 +24,9 @@ def test_referral_link_view_error(mocker):  #Проверяет, что при 
     factory = RequestFactory()
     request = factory.get(reverse('referral_link', kwargs={'hash': 'testhash'}))
     view = ReferralLinkView.as_view()
-    mocker.patch('garpix_user.models.ReferralType.objects.get', side_effect=Exception('Not found'))
-    mocker.patch('garpix_user.models.UserSession.get_or_create_user_session', return_value='testuser')
+    mocker.patch('garpix_user.models.ReferralType.get_id_by_hash', return_value=None)
+    record_referral_click = mocker.patch('garpix_user.views.referral_links_view.record_referral_click')
     response = view(request, hash='testhash')
+    record_referral_click.assert_not_called()
 
     assert response.url == f"{settings.GARPIX_USER.get('REFERRAL_REDIRECT_URL', '/')}?status=error"
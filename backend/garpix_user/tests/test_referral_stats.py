@@ -0,0 +1,130 @@
+from datetime import timedelta
+
+import pytest
+
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.test import RequestFactory
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+from garpix_user.admin.referral_type import ReferralStatInline, ReferralTypeAdmin
+from garpix_user.models import ReferralStat, ReferralType, ReferralUserLink, UserSession
+from garpix_user.tasks.rollup_referral_stats import rollup_referral_stats
+from garpix_user.utils.current_date import set_current_date
+from garpix_user.views import ReferralStatView
+
+
+@pytest.mark.django_db
+class TestReferralStats:
+    @pytest.fixture(autouse=True)
+    def referral_type(self, settings):
+        settings.GARPIX_USER = {**settings.GARPIX_USER, 'USE_REFERRAL_LINKS': True}
+        self.now = set_current_date()
+        self.referral_type = ReferralType.objects.create(title='newsletter')
+
+    def create_link(self, clicked_at, joined_at=None, confirmed_at=None):
+        user = None
+        if joined_at is not None:
+            number = ReferralUserLink.objects.count()
+            user = get_user_model().objects.create_user(username=f'referral_{number}', password='Str0ng!pass77',
+                                                        email=f'referral_{number}@example.com')
+            get_user_model().objects.filter(pk=user.pk).update(date_joined=joined_at, email_confirmed_date=confirmed_at)
+        return ReferralUserLink.objects.create(user=UserSession.objects.create(user=user),
+                                               referral_type=self.referral_type, created_at=clicked_at)
+
+    def get_stats(self):
+        return {stat.date: (stat.sessions, stat.registrations, stat.confirmations)
+                for stat in ReferralStat.objects.filter(referral_type=self.referral_type)}
+
+    def test_rollup(self, settings):  #Проверяет, что задача добавляет сессии, регистрации после перехода и подтверждения email в статистику по дням и не считает их повторно.
+        settings.GARPIX_USER = {**settings.GARPIX_USER, 'REFERRAL_STATS_LAG': 0}
+        day_3, day_2, day_1 = (self.now - timedelta(days=days) for days in (3, 2, 1))
+        expected = {}
+
+        def expect(moment, counts):
+            day = expected.setdefault(timezone.localdate(moment), (0, 0, 0))
+            expected[timezone.localdate(moment)] = tuple(map(sum, zip(day, counts)))
+
+        self.create_link(day_3, joined_at=day_2, confirmed_at=day_1)
+        expect(day_3, (1, 0, 0))
+        expect(day_2, (0, 1, 0))
+        expect(day_1, (0, 0, 1))
+        self.create_link(day_3)
+        expect(day_3, (1, 0, 0))
+        # registered before the click, not a registration of the link
+        self.create_link(day_2, joined_at=day_3, confirmed_at=day_1)
+        expect(day_2, (1, 0, 0))
+
+        rollup_referral_stats()
+        rollup_referral_stats()
+        assert self.get_stats() == expected
+
+        link = self.create_link(day_1 - timedelta(minutes=1), joined_at=day_1)
+        confirmed_at = set_current_date()
+        get_user_model().objects.filter(pk=link.user.user_id).update(email_confirmed_date=confirmed_at)
+        expect(day_1 - timedelta(minutes=1), (1, 0, 0))
+        expect(day_1, (0, 1, 0))
+        expect(confirmed_at, (0, 0, 1))
+
+        rollup_referral_stats()
+        assert self.get_stats() == expected
+
+    def test_rollup_lag(self):  #Проверяет, что строки моложе REFERRAL_STATS_LAG секунд остаются до следующего запуска.
+        self.create_link(self.now - timedelta(seconds=10), joined_at=self.now - timedelta(seconds=5),
+                         confirmed_at=self.now - timedelta(seconds=1))
+        rollup_referral_stats()
+        assert self.get_stats() == {}
+
+    def test_confirm_email_by_link_sets_date(self):  #Проверяет, что подтверждение email по ссылке сохраняет дату подтверждения, по которой считается статистика.
+        user = get_user_model().objects.create_user(username='link_user', email='link_user@example.com',
+                                                    password='Str0ng!pass77')
+        challenge = user.issue_email_challenge('link_user@example.com')
+
+        result, confirmed = get_user_model().confirm_email_by_link(challenge.link_hash)
+
+        assert result
+        user.refresh_from_db()
+        assert user.is_email_confirmed and user.email_confirmed_date >= self.now
+
+    def test_view(self):  #Проверяет, что API статистики доступно только персоналу и фильтрует строки по типу ссылки и датам.
+        other = ReferralType.objects.create(title='banner')
+        today = timezone.localdate()
+        for days in range(3):
+            ReferralStat.add(self.referral_type.pk, today - timedelta(days=days), clicks=days + 1)
+        ReferralStat.add(other.pk, today, clicks=5)
+        view = ReferralStatView.as_view({'get': 'list'})
+        factory = APIRequestFactory()
+
+        request = factory.get('/', {'referral_type': self.referral_type.pk, 'limit': 10,
+                                    'date_from': (today - timedelta(days=1)).isoformat()})
+        force_authenticate(request, get_user_model().objects.create_user(username='staff', is_staff=True,
+                                                                         password='Str0ng!pass77'))
+        response = view(request)
+        assert response.status_code == 200
+        assert response.data['count'] == 2
+        assert [(row['date'], row['clicks']) for row in response.data['results']] == \
+               [(today.isoformat(), 1), ((today - timedelta(days=1)).isoformat(), 2)]
+
+        request = factory.get('/')
+        force_authenticate(request, get_user_model().objects.create_user(username='visitor',
+                                                                         password='Str0ng!pass77'))
+        assert view(request).status_code == 403
+
+    def test_admin(self, settings):  #Проверяет, что админка типа ссылки показывает суммы по всей статистике, а во вложенном списке только последние REFERRAL_STATS_ADMIN_DAYS дней.
+        settings.GARPIX_USER = {**settings.GARPIX_USER, 'REFERRAL_STATS_ADMIN_DAYS': 7}
+        today = timezone.localdate()
+        ReferralStat.add(self.referral_type.pk, today, clicks=2, registrations=1)
+        ReferralStat.add(self.referral_type.pk, today - timedelta(days=30), clicks=3, confirmations=1)
+        request = RequestFactory().get('/admin/')
+        request.user = get_user_model().objects.create_superuser(username='admin', email='admin@example.com',
+                                                                 password='Adm1n!pass77')
+
+        model_admin = ReferralTypeAdmin(ReferralType, admin.site)
+        obj = model_admin.get_queryset(request).get(pk=self.referral_type.pk)
+        assert (obj.total_clicks, obj.total_sessions, obj.total_registrations, obj.total_confirmations) == \
+               (5, 0, 1, 1)
+        # a referral type without statistics yet
+        empty = model_admin.get_queryset(request).get(pk=ReferralType.objects.create(title='banner').pk)
+        assert model_admin.total_clicks(empty) == 0
+        inline = ReferralStatInline(ReferralType, admin.site)
+        assert [stat.date for stat in inline.get_queryset(request)] == [today]
@@ -2,7 +2,10 @@ import pytest
 
 from django.contrib.auth import get_user_model
 from django.test import Client
+from django.urls import reverse
 from garpix_user.serializers import RegistrationSerializer
+from garpix_user.models import UserIdentifier
+from garpix_user.utils.registered_identifiers import is_identifier_registered, registered_identifiers
 
 
 @pytest.mark.django_db
@@ -49,3 +52,40 @@ class TestRegistrationView:
             "email": ["This field may not be blank.", "Enter a valid email address."],
             "password": ["This field may not be blank."],
         }
+
+    def test_registration_filter(self, settings):  #Проверяет, что фильтр зарегистрированных идентификаторов не пропускает существующие email и отсекает новые.
+        settings.GARPIX_USER = {**settings.GARPIX_USER, 'USE_REGISTRATION_FILTER': True}
+        registered_identifiers.rebuild()
+        get_user_model().objects.create_user(username="test_user", email="test@example.com", password="strong_password")
+        assert is_identifier_registered('email', 'test@example.com')
+        assert not registered_identifiers.might_exist('email', 'new@example.com')
+        assert not is_identifier_registered('email', 'new@example.com')
+
+    def test_registration_filter_refresh_picks_up_changed_identifiers(self, settings):  #Проверяет, что фильтр подтягивает email, измененные в другом процессе, по идентификаторам пользователей.
+        settings.GARPIX_USER = {**settings.GARPIX_USER, 'USE_REGISTRATION_FILTER': True,
+                                'REGISTRATION_FILTER_REFRESH_INTERVAL': 0}
+        user = get_user_model().objects.create_user(username="test_user", email="test@example.com", password="strong_password")
+        registered_identifiers.rebuild()
+        # another process changes the email: only its UserIdentifier row is visible here
+        UserIdentifier.objects.filter(user=user, kind='email').delete()
+        UserIdentifier.objects.create(user=user, kind='email', value='changed@example.com')
+        get_user_model().objects.filter(pk=user.pk).update(email='changed@example.com')
+        assert registered_identifiers.might_exist('email', 'Changed@example.com')
+        assert is_identifier_registered('email', 'changed@example.com')
+
+    def test_registration_filter_stale(self, settings, mocker):  #Проверяет, что занятый email, пропущенный устаревшим фильтром, отклоняется ошибкой валидации, а не ошибкой сервера.
+        settings.GARPIX_USER = {**settings.GARPIX_USER, 'USE_REGISTRATION_FILTER': True,
+                                'USE_PREREGISTRATION_EMAIL_CONFIRMATION': False,
+                                'USE_PREREGISTRATION_PHONE_CONFIRMATION': False}
+        get_user_model().objects.create_user(username="test_user", email="test@example.com", phone="+79990000001",
+                                             password="strong_password")
+        mocker.patch.object(registered_identifiers, 'might_exist', return_value=False)
+        assert not is_identifier_registered('email', 'Test@example.com')
+
+        response = self.client.post(reverse('garpix_user:garpix_user_api:api_registration'), data={
+            "username": "other_user", "email": "Test@example.com", "phone": "+79990000002",
+            "password": "Str0ng!pass77", "password_2": "Str0ng!pass77"}, content_type='application/json')
+
+        assert response.status_code == 400
+        assert response.json() == ["User with such data has been already registered"]
+        assert not get_user_model().objects.filter(username="other_user").exists()
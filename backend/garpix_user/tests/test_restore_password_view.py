@@ -1,10 +1,11 @@
 import pytest
+from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
 from garpix_user.views import RestorePasswordView
 from garpix_user.serializers import RestorePasswordSerializer, RestoreCheckCodeSerializer, RestoreSetPasswordSerializer
 from garpix_user.models import UserSession
 from rest_framework.test import APIRequestFactory
-from rest_framework.exceptions import MethodNotAllowed
+from rest_framework.exceptions import MethodNotAllowed, ValidationError as DRFValidationError
 
 USER_DATA = {
     'username': 'test_user',
@@ -28,6 +29,9 @@ class MockUserSession:
         self.result = result
         self.error = error
 
+    def materialize(self):
+        return self
+
     def send_restore_code(self, username):
         return self.result, self.error
 
@@ -125,4 +129,19 @@ class TestRestorePasswordView:
         request = self.factory.post('/', data=SET_DATA)
         with pytest.raises(ValidationError) as e:
             self.view.set_password(request)
-        assert str(e.value) == 'Error'
\ No newline at end of file
+        assert str(e.value) == 'Error'
+
+    def test_set_password_by_ticket(self, settings):  #Проверяет, что при включенной настройке USE_RESTORE_PASSWORD_TICKET пароль меняется по подписанному билету без сессии пользователя, а билет нельзя использовать повторно.
+        settings.GARPIX_USER = {**settings.GARPIX_USER, 'USE_RESTORE_PASSWORD_TICKET': True}
+        user = get_user_model().objects.create_user(username='ticket_user', email='ticket@example.com', password='OldPassw0rd12')
+        ticket = UserSession.create_restore_ticket(user, UserSession.RESTORE_BY.EMAIL)
+
+        request = self.factory.post('/', data={'restore_ticket': ticket, 'new_password': 'NewPassw0rd12'})
+        response = self.view.set_password(request)
+        assert response.status_code == 200
+        user.refresh_from_db()
+        assert user.check_password('NewPassw0rd12')
+
+        request = self.factory.post('/', data={'restore_ticket': ticket, 'new_password': 'NewPassw0rd34'})
+        with pytest.raises(DRFValidationError):
+            self.view.set_password(request)
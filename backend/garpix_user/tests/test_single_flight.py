@@ -0,0 +1,56 @@
+import time
+import uuid
+
+from garpix_user.utils.single_flight import TaskLock, _get_task_cache, get_task_metrics, single_flight
+
+
+def get_task_name():
+    return f'test_single_flight.{uuid.uuid4().hex}'
+
+
+class TestSingleFlight:
+    def test_lock(self):  #Проверяет, что блокировку задачи нельзя взять второй раз до ее освобождения.
+        name = get_task_name()
+        lock = TaskLock(name)
+        assert lock.acquire()
+        assert not TaskLock(name).acquire()
+        lock.release()
+        other = TaskLock(name)
+        assert other.acquire()
+        other.release()
+
+    def test_skipped_run(self):  #Проверяет, что запуск задачи при занятой блокировке пропускается и учитывается в метрике skipped.
+        name = get_task_name()
+        task = single_flight(name=name)(lambda: 'done')
+        lock = TaskLock(name)
+        lock.acquire()
+        assert task() is None
+        lock.release()
+        assert task() == 'done'
+        assert get_task_metrics(name) == {'skipped': 1, 'overrun': 0}
+
+    def test_key(self):  #Проверяет, что с key блокируются только запуски с одинаковым ключом.
+        name = get_task_name()
+        task = single_flight(name=name, key=lambda first_pk, last_pk: f'{first_pk}-{last_pk}')(lambda first_pk, last_pk: 'done')
+        lock = TaskLock(f'{name}:1-10')
+        lock.acquire()
+        assert task(1, 10) is None
+        assert task(11, 20) == 'done'
+        lock.release()
+        assert get_task_metrics(name)['skipped'] == 1
+
+    def test_overrun(self):  #Проверяет, что запуск дольше интервала расписания учитывается в метрике overrun.
+        name = get_task_name()
+        single_flight(name=name, interval=3600)(lambda: None)()
+        single_flight(name=name, interval=0.01)(lambda: time.sleep(0.05))()
+        assert get_task_metrics(name) == {'skipped': 0, 'overrun': 1}
+
+    def test_heartbeat(self):  #Проверяет, что поток heartbeat продлевает аренду блокировки, пока задача выполняется, и останавливается при освобождении.
+        name = get_task_name()
+        lock = TaskLock(name, lease=0.3)
+        assert lock.acquire()
+        time.sleep(0.8)
+        assert _get_task_cache().get(lock.key) == lock.token
+        lock.release()
+        assert not lock._heartbeat.is_alive()
+        assert _get_task_cache().get(lock.key) is None
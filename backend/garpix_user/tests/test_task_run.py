@@ -0,0 +1,44 @@
+import pytest
+
+from garpix_user.models import TaskRun
+from garpix_user.utils.task_run import get_task_run_stats, track_task_run
+
+
+@pytest.mark.django_db
+class TestTrackTaskRun:
+    def test_run_is_recorded(self):  #Проверяет, что запуск задачи записывается в журнал со счетчиками, заполненными телом задачи.
+        @track_task_run(name='test_task')
+        def task():
+            get_task_run_stats().add(rows_scanned=10, rows_affected=3, batches=2)
+            return 'done'
+
+        assert task() == 'done'
+        run = TaskRun.objects.get(task='test_task')
+        assert run.status == TaskRun.STATUS.SUCCESS
+        assert (run.rows_scanned, run.rows_affected, run.batches) == (10, 3, 2)
+        assert run.finished_at >= run.started_at
+
+    def test_failed_run_is_recorded(self):  #Проверяет, что упавший запуск записывается со статусом ошибки, а исключение пробрасывается дальше.
+        @track_task_run(name='test_task')
+        def task():
+            raise ValueError('broken')
+
+        with pytest.raises(ValueError):
+            task()
+        run = TaskRun.objects.get(task='test_task')
+        assert run.status == TaskRun.STATUS.FAILED
+        assert 'broken' in run.error
+
+    def test_peak_rss_growth(self, mocker):  #Проверяет, что записывается прирост пикового RSS за запуск, а не пик процесса за все время.
+        mocker.patch('garpix_user.utils.task_run._get_peak_rss',
+                     side_effect=[500 * 1024 ** 2, 520 * 1024 ** 2, 520 * 1024 ** 2, 520 * 1024 ** 2])
+        task = track_task_run(name='test_task')(lambda: None)
+        task()
+        task()
+        assert list(TaskRun.objects.order_by('id').values_list('peak_rss_growth', flat=True)) == [20 * 1024 ** 2, 0]
+
+    def test_tracemalloc_peak(self, settings):  #Проверяет, что с TASK_RUN_TRACEMALLOC записывается пик выделенной памяти запуска.
+        settings.GARPIX_USER = {**settings.GARPIX_USER, 'TASK_RUN_TRACEMALLOC': True}
+        task = track_task_run(name='test_task')(lambda: len(bytearray(10 * 1024 ** 2)))
+        task()
+        assert TaskRun.objects.get(task='test_task').tracemalloc_peak >= 10 * 1024 ** 2
@@ -0,0 +1,46 @@
+import pytest
+
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, transaction
+from garpix_user.models import UserIdentifier
+
+User = get_user_model()
+
+
+@pytest.mark.django_db
+class TestUserIdentifier:
+    @pytest.fixture(autouse=True)
+    def user(self):
+        self.user = User.objects.create_user(username='testuser', email='testuser@example.com', password='testpassword')
+
+    def test_user_identifier_lookup(self):  #Проверяет, что пользователь находится по нормализованному идентификатору и идентификаторы обновляются при смене email.
+        assert User.objects.get(UserIdentifier.user_filter('TestUser', fields=('username', 'email'))) == self.user
+        assert User.objects.get(UserIdentifier.user_filter('TESTUSER@example.com', fields=('username', 'email'))) == self.user
+        self.user.email = 'new@example.com'
+        self.user.save()
+        assert not User.objects.filter(UserIdentifier.user_filter('testuser@example.com', fields=('email',))).exists()
+        assert User.objects.filter(UserIdentifier.user_filter('new@example.com', fields=('email',))).exists()
+
+    def test_user_identifier_collision(self):  #Проверяет, что сохранение пользователя с идентификатором другого пользователя завершается ошибкой, а не теряет идентификатор.
+        other = User.objects.create_user(username='other', email='other@example.com', password='testpassword')
+        other.email = 'TestUser@example.com'
+        with pytest.raises(IntegrityError), transaction.atomic():
+            other.save()
+        assert UserIdentifier.objects.get(kind='email', value='testuser@example.com').user == self.user
+        assert UserIdentifier.objects.filter(user=other, kind='email', value='other@example.com').exists()
+
+    def test_default_username_fields(self, mocker):  #Проверяет, что при USERNAME_FIELDS по умолчанию email и телефон могут повторяться у разных пользователей, а username остается уникальным.
+        mocker.patch.object(User, 'USERNAME_FIELDS', ('username',))
+        first = User.objects.create_user(username='first', email='shared@example.com', phone='+79990000001',
+                                         password='Str0ng!pass77')
+        second = User.objects.create_user(username='second', email='Shared@example.com', phone='+79990000001',
+                                          password='Str0ng!pass77')
+
+        assert set(UserIdentifier.objects.filter(kind='email', value='shared@example.com').values_list(
+            'user_id', 'is_login')) == {(first.pk, False), (second.pk, False)}
+        assert UserIdentifier.objects.get(kind='username', value='second').is_login
+
+        second.username = 'FIRST'
+        with pytest.raises(IntegrityError), transaction.atomic():
+            second.save()
+        assert UserIdentifier.objects.filter(user=second, kind='username', value='second').exists()
@@ -1,8 +1,11 @@
 import pytest
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.sessions.backends.db import SessionStore
 from django.urls import reverse
 from rest_framework.test import APIRequestFactory
 from rest_framework import status
-from garpix_user.models import UserSession
+from garpix_user.models import UserSession, ReferralType, ReferralUserLink
 from garpix_user.views.user_session_view import UserSessionView
 
 
@@ -26,3 +29,69 @@ def test_create_user_session_failure(mocker):  #Проверяет, что пр
     mocker.patch('garpix_user.models.UserSession.get_or_create_user_session', side_effect=Exception('Error'))
     response = view(request)
     assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+def test_signed_guest_session_is_not_stored(settings):  #Проверяет, что при включенной настройке USE_SIGNED_GUEST_SESSION гостевая сессия выдается подписанным токеном без записи в базу данных.
+    settings.GARPIX_USER = {**settings.GARPIX_USER, 'USE_SIGNED_GUEST_SESSION': True}
+    factory = APIRequestFactory()
+    request = factory.post('/', {}, format='json')
+    request.session = SessionStore()
+    view = UserSessionView.as_view({'post': 'create_user_session'})
+    response = view(request)
+    assert response.status_code == status.HTTP_200_OK
+    token = response.data['session_user']['token_number']
+    assert not UserSession.objects.filter(token_number=token).exists()
+    user_session = UserSession.from_signed_token(token)
+    assert user_session is not None and user_session.pk is None
+    assert user_session.materialize().pk is not None
+    assert UserSession.objects.filter(token_number=token).count() == 1
+
+
+def test_signed_guest_session_tampered_token():  #Проверяет, что подделанный подписанный токен гостевой сессии отклоняется без обращения к базе данных.
+    token = UserSession.create_signed_token()
+    assert UserSession.from_signed_token(token + 'x') is None
+
+
+def get_token_request(token):
+    request = APIRequestFactory().get('/', HTTP_USER_SESSION_TOKEN=token)
+    request.user = AnonymousUser()
+    return request
+
+
+@pytest.mark.django_db
+def test_signed_guest_session_legacy_token(settings):  #Проверяет, что при включенных подписанных сессиях токен, выданный до их включения, по-прежнему находит свою сессию в базе данных.
+    settings.GARPIX_USER = {**settings.GARPIX_USER, 'USE_SIGNED_GUEST_SESSION': True}
+    user_session = UserSession.objects.create(token_number='legacy_token', recognized=UserSession.UserState.GUEST)
+    assert UserSession.get_from_request(get_token_request('legacy_token')) == user_session
+    assert UserSession.get_from_request(get_token_request('unknown_token')).pk is not None
+
+
+@pytest.mark.django_db
+def test_signed_guest_session_materialized(settings):  #Проверяет, что после materialize подписанный токен возвращает сохраненную строку сессии с ее состоянием.
+    settings.GARPIX_USER = {**settings.GARPIX_USER, 'USE_SIGNED_GUEST_SESSION': True}
+    token = UserSession.create_signed_token()
+    user_session = UserSession.get_from_request(get_token_request(token))
+    assert user_session.pk is None
+    assert user_session.materialize() is user_session and user_session.pk is not None
+    UserSession.objects.filter(pk=user_session.pk).update(is_email_confirmed=True)
+    stored_session = UserSession.get_from_request(get_token_request(token))
+    assert stored_session.pk == user_session.pk and stored_session.is_email_confirmed
+
+
+@pytest.mark.django_db
+def test_bind_user_merges_guest_session():  #Проверяет, что при входе гостевая сессия объединяется с уже существующей сессией пользователя, а реферальные ссылки переносятся.
+    user = get_user_model().objects.create_user(username='testuser', password='testpassword')
+    user_session = UserSession.objects.create(token_number='user_token', user=user,
+                                              recognized=UserSession.UserState.REGISTERED)
+    guest_session = UserSession.objects.create(token_number='guest_token', is_email_confirmed=True,
+                                               email='test@example.com')
+    referral_type = ReferralType.objects.create(title='test')
+    ReferralUserLink.objects.create(user=guest_session, referral_type=referral_type)
+    request = APIRequestFactory().post('/', HTTP_USER_SESSION_TOKEN='guest_token')
+    request.session = SessionStore()
+    assert UserSession.bind_user(request, user) == user_session
+    assert not UserSession.objects.filter(pk=guest_session.pk).exists()
+    assert ReferralUserLink.objects.filter(user=user_session, referral_type=referral_type).exists()
+    user_session.refresh_from_db()
+    assert user_session.is_email_confirmed and user_session.email == 'test@example.com'
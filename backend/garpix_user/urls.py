@@ -4,6 +4,7 @@ from garpix_user.views import obtain_auth_token, refresh_token_view, logout_view
 from rest_framework import routers
 from garpix_user.views.user_session_view import UserSessionView
 from garpix_user.views.registration_view import registration_view
+from garpix_user.views.bulk_registration_view import bulk_registration_view
 from garpix_user.views.referral_links_view import ReferralLinkView
 
 from django.contrib import admin
@@ -15,7 +16,8 @@ admin.site.login_form = LoginForm
 from garpix_user.views import (
     EmailConfirmationView, PhoneConfirmationView,
     RestorePasswordView,
-    EmailConfirmationLinkView
+    EmailConfirmationLinkView,
+    ReferralStatView
 )
 
 app_name = 'garpix_user'
@@ -35,6 +37,8 @@ if GARPIX_USER_SETTINGS.get('USE_PHONE_CONFIRMATION', False):
     router.register(r'confirm_phone', PhoneConfirmationView, basename='api_confirm_phone')
 if GARPIX_USER_SETTINGS.get('USE_RESTORE_PASSWORD', False):
     router.register(r'restore_password', RestorePasswordView, basename='api_restore_password')
+if GARPIX_USER_SETTINGS.get('USE_REFERRAL_LINKS', False):
+    router.register(r'referral_stats', ReferralStatView, basename='api_referral_stats')
 
 api_urlpatterns = [
     path('login/', obtain_auth_token, name='api_login'),
@@ -50,6 +54,9 @@ urlpatterns = [
 if GARPIX_USER_SETTINGS.get('USE_REGISTRATIONS', True):
     api_urlpatterns.append(path('register/', registration_view, name='api_registration'))
 
+if GARPIX_USER_SETTINGS.get('USE_BULK_REGISTRATION', False):
+    api_urlpatterns.append(path('register/bulk/', bulk_registration_view, name='api_bulk_registration'))
+
 if GARPIX_USER_SETTINGS.get('USE_REFERRAL_LINKS', False):
     urlpatterns += [
         re_path(r'invite_link/(?P<hash>.*?)/$', ReferralLinkView.as_view(), name='referral_link'),
@@ -0,0 +1,120 @@
+import functools
+import logging
+
+from django.conf import settings
+from django.db import close_old_connections
+from garpix_utils.logs.services.logger_iso import LoggerIso
+
+from garpix_user.utils.batch_sink import BatchSink
+
+logger = logging.getLogger(__name__)
+
+
+class AuditLogSink(BatchSink):
+    """
+    Per-process queue of IB log records written to the logger by a background thread in batches,
+    see BatchSink for the AUDIT_LOG_DURABILITY levels
+    """
+
+    settings_prefix = 'AUDIT_LOG'
+    thread_name = 'garpix_user_audit_log'
+
+    def __init__(self, logger, store=None):
+        super().__init__()
+        self.logger = logger
+        self.store = store
+        self.written = 0
+        self.store_errors = 0
+
+    def write_batch(self, batch):
+        for log in batch:
+            self.logger.info(log)
+            self.written += 1
+
+        if self.store is not None:
+            close_old_connections()
+            try:
+                self.store(batch)
+            except Exception:
+                self.store_errors += 1
+                logger.exception('Could not store %s audit events, the events are dropped', len(batch))
+
+    def get_stats(self):
+        return dict(super().get_stats(), written=self.written, store_errors=self.store_errors)
+
+
+class BufferedLoggerIso(LoggerIso):
+    """
+    LoggerIso that resolves the host once and, with USE_ASYNC_AUDIT_LOG, hands records to AuditLogSink
+    instead of writing the file under the request. With USE_AUDIT_EVENT_STORE records are also saved to AuditEvent.
+    """
+
+    def __init__(self, logger_name):
+        super().__init__(logger_name)
+        self.sink = AuditLogSink(self.logger, store=self.store_events)
+
+    @staticmethod
+    def store_events(logs):
+        from garpix_user.models import AuditEvent
+
+        if AuditEvent.is_enabled():
+            AuditEvent.store(logs)
+
+    @staticmethod
+    @functools.lru_cache(maxsize=None)
+    def get_host_info():
+        return LoggerIso.get_host_info()
+
+    def write(self, action, obj, obj_address, result, params=None, sbj=None, sbj_address=None, msg=''):
+        self.write_string(self.create_log(action, obj, obj_address, result, params, sbj, sbj_address, msg))
+
+    def write_string(self, string):
+        if settings.GARPIX_USER.get('USE_ASYNC_AUDIT_LOG', False):
+            self.sink.put(string)
+        else:
+            super().write_string(string)
+            try:
+                self.store_events([string])
+            except Exception:
+                # the record is already in the file, the request must not fail because of the copy
+                self.sink.store_errors += 1
+                logger.exception('Could not store the audit event, the event is dropped')
+
+
+ib_logger = BufferedLoggerIso(settings.IB_ISO_LOGS_NAME)
+
+
+def get_audit_log_stats():
+    return ib_logger.sink.get_stats()
+
+
+class AuditEventRouter:
+    """
+    Keeps AuditEvent in the AUDIT_EVENT_DATABASE database, e.g. a local SQLite file
+    """
+
+    @staticmethod
+    def get_database():
+        return settings.GARPIX_USER.get('AUDIT_EVENT_DATABASE', 'default')
+
+    def _is_audit_event(self, model):
+        return model._meta.app_label == 'garpix_user' and model._meta.model_name == 'auditevent'
+
+    def db_for_read(self, model, **hints):
+        return self.get_database() if self._is_audit_event(model) else None
+
+    def db_for_write(self, model, **hints):
+        return self.get_database() if self._is_audit_event(model) else None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if app_label == 'garpix_user' and model_name == 'auditevent':
+            return db == self.get_database()
+        return None
+
+
+def enable_sqlite_wal(sender, connection, **kwargs):
+    if not settings.GARPIX_USER.get('USE_AUDIT_EVENT_STORE', False):
+        return
+    if connection.vendor == 'sqlite' and connection.alias == AuditEventRouter.get_database():
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA journal_mode=WAL')
@@ -1,10 +1,12 @@
 from django.contrib.auth import get_user_model
-from django.db.models import Q
+from django.contrib.auth.backends import ModelBackend
 from garpix_utils.logs.enums.get_enums import Action, ActionResult
-from garpix_utils.logs.loggers import ib_logger
+from garpix_user.utils.audit_log import ib_logger
 from garpix_utils.logs.services.logger_iso import LoggerIso
 
+from garpix_user.models.user_identifier import UserIdentifier
 from garpix_user.utils.get_password_settings import get_password_settings
+from garpix_user.utils.permission_cache import get_cached_permissions, is_permission_cache_enabled
 
 
 class CustomAuthenticationBackend:
@@ -14,10 +16,7 @@ class CustomAuthenticationBackend:
         if username is None or password is None:
             return None
         try:
-            query = Q()
-            for field in get_user_model().USERNAME_FIELDS:
-                query |= Q(**{field: username.lower()})
-            user = get_user_model().active_objects.get(query)
+            user = get_user_model().active_objects.get(UserIdentifier.user_filter(username))
             pwd_valid = user.check_password(password)
             if pwd_valid:
                 user.login_attempts_count = 0
@@ -50,3 +49,26 @@ class CustomAuthenticationBackend:
             return get_user_model().active_objects.get(pk=user_id)
         except get_user_model().DoesNotExist:
             return None
+
+
+class CachedModelBackend(ModelBackend):
+    """
+    ModelBackend that, with USE_PERMISSION_CACHE, keeps the user and group permission sets of every user
+    in the Django cache between requests instead of querying them for each new user instance
+    """
+
+    def _get_cached_permissions(self, user_obj, obj, from_name):
+        if not is_permission_cache_enabled() or not user_obj.is_active or user_obj.is_anonymous or obj is not None:
+            return None
+        if not hasattr(user_obj, '_garpix_perm_cache'):
+            user_obj._garpix_perm_cache = get_cached_permissions(
+                user_obj, lambda name: self._get_permissions(user_obj, obj, name))
+        return user_obj._garpix_perm_cache[from_name]
+
+    def get_user_permissions(self, user_obj, obj=None):
+        permissions = self._get_cached_permissions(user_obj, obj, 'user')
+        return permissions if permissions is not None else super().get_user_permissions(user_obj, obj)
+
+    def get_group_permissions(self, user_obj, obj=None):
+        permissions = self._get_cached_permissions(user_obj, obj, 'group')
+        return permissions if permissions is not None else super().get_group_permissions(user_obj, obj)
@@ -0,0 +1,112 @@
+import atexit
+import os
+import queue
+import threading
+import time
+
+from django.conf import settings
+
+
+class BatchSink:
+    """
+    Per-process queue of items written by a background thread in batches with `write_batch`.
+    A batch is written when it has BATCH_SIZE items or FLUSH_INTERVAL seconds after its first item (0 - as soon as
+    the queue is empty). Settings are read with the `settings_prefix`, e.g. AUDIT_LOG_DURABILITY:
+        'low' - items are dropped when the queue is full and the queue is not flushed on exit;
+        'medium' - items are dropped when the queue is full, the queue is flushed on exit;
+        'high' - the caller waits when the queue is full, the queue is flushed on exit.
+    """
+
+    _STOP = object()
+    settings_prefix = None
+    thread_name = None
+
+    def __init__(self):
+        self.dropped = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+        self._pid = None
+        self._queue = None
+        self._thread = None
+        self._flush_on_exit = False
+        if hasattr(os, 'register_at_fork'):
+            # the lock may be held by a thread of the parent that does not exist in the child
+            os.register_at_fork(after_in_child=self._reset_after_fork)
+
+    def _reset_after_fork(self):
+        self._lock = threading.Lock()
+        self._pid = None
+
+    def get_setting(self, name, default):
+        return settings.GARPIX_USER.get(f'{self.settings_prefix}_{name}', default)
+
+    def get_durability(self):
+        return self.get_setting('DURABILITY', 'medium')
+
+    def write_batch(self, batch):
+        raise NotImplementedError
+
+    def _start(self):
+        # called under the lock; a forked worker inherits the queue but not the thread, so it gets its own pair
+        self._queue = queue.Queue(maxsize=self.get_setting('QUEUE_SIZE', 10000))
+        self._thread = threading.Thread(target=self._run, args=(self._queue,), name=self.thread_name, daemon=True)
+        self._thread.start()
+        self._pid = os.getpid()
+        if self.get_durability() != 'low' and not self._flush_on_exit:
+            atexit.register(self.flush)
+            self._flush_on_exit = True
+
+    def put(self, item):
+        # under the flush lock, so no item lands in a queue after its stop marker
+        with self._lock:
+            if self._pid != os.getpid():
+                self._start()
+            try:
+                self._queue.put(item, block=self.get_durability() == 'high')
+            except queue.Full:
+                self.dropped += 1
+
+    def _get_batch(self, items, batch_size, flush_interval):
+        batch = [items.get()]
+        deadline = time.monotonic() + flush_interval
+        while len(batch) < batch_size and batch[-1] is not self._STOP:
+            try:
+                batch.append(items.get(timeout=max(deadline - time.monotonic(), 0)))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self, items):
+        batch_size = self.get_setting('BATCH_SIZE', 100)
+        flush_interval = self.get_setting('FLUSH_INTERVAL', 0)
+        while True:
+            batch = self._get_batch(items, batch_size, flush_interval)
+
+            stop = self._STOP in batch
+            batch = [item for item in batch if item is not self._STOP]
+            if batch:
+                try:
+                    self.write_batch(batch)
+                except Exception:
+                    self.errors += 1
+
+            if stop:
+                return
+
+    def flush(self):
+        """
+        Writes out everything queued so far and stops the thread; the next item starts a new one
+        """
+        with self._lock:
+            if self._pid != os.getpid():
+                return
+            self._queue.put(self._STOP)
+            self._thread.join(self.get_setting('SHUTDOWN_TIMEOUT', 5))
+            self._pid = None
+
+    def get_stats(self):
+        return {
+            'queue_depth': self._queue.qsize() if self._pid == os.getpid() else 0,
+            'dropped': self.dropped,
+            'errors': self.errors,
+        }
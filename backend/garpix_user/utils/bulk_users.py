@@ -0,0 +1,57 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+
+from garpix_user.models import PasswordHistory, UserIdentifier
+from garpix_user.utils.current_date import set_current_date
+from garpix_user.utils.get_password_settings import get_password_settings
+from garpix_user.utils.registered_identifiers import registered_identifiers
+
+
+def get_identifiers(user):
+    return {(kind, value) for kind, value in UserIdentifier.get_user_values(user) if value}
+
+
+def get_taken_identifiers(identifiers):
+    """
+    Returns the (kind, value) pairs of `identifiers` that belong to existing users, with one query per kind
+    """
+    taken = set()
+    for kind in UserIdentifier.KIND.values:
+        values = {value for _kind, value in identifiers if _kind == kind}
+        if values:
+            taken |= {(kind, value) for value in UserIdentifier.objects.filter(
+                kind=kind, value__in=values).values_list('value', flat=True)}
+    return taken
+
+
+def bulk_create_users(users, password_settings=None, needs_password_update=False):
+    """
+    Inserts new users with already hashed passwords, their identifiers and password history
+    with one bulk_create per table in one transaction. Users without a password get an unusable one.
+    Identifiers must be checked with get_taken_identifiers before: one taken meanwhile raises IntegrityError
+    and rolls the whole batch back.
+    """
+    password_settings = password_settings or get_password_settings()
+    now = set_current_date()
+    password_expires_at = get_user_model().get_password_expires_at(now, password_settings['password_validity_period'])
+    for user in users:
+        if not user.password:
+            user.set_unusable_password()
+        user.password_updated_date = now
+        user.password_expires_at = password_expires_at
+        user.needs_password_update = needs_password_update or password_settings['password_first_change']
+
+    with transaction.atomic():
+        get_user_model().objects.bulk_create(users)
+        UserIdentifier.objects.bulk_create([
+            UserIdentifier(user=user, kind=kind, value=value, is_login=UserIdentifier.is_login_kind(kind))
+            for user in users for kind, value in get_identifiers(user)
+        ])
+        PasswordHistory.objects.bulk_create([
+            PasswordHistory(user=user, password=user.password) for user in users if user.has_usable_password()
+        ])
+
+    # bulk_create sends no post_save, so the registration filter of this process is fed here
+    for user in users:
+        registered_identifiers.add_user(user)
+    return users
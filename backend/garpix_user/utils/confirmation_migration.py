@@ -0,0 +1,67 @@
+import hashlib
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Q
+
+
+def get_challenge_lifetime(channel):
+    """
+    Frozen copy of the code lifetime the pending codes were sent with, shared with the
+    0022_confirmationchallenge migration. It must not drift from what the migrations have already copied.
+    """
+    GARPIX_USER_SETTINGS = getattr(settings, 'GARPIX_USER', {})
+    if channel == 'email':
+        life_time = GARPIX_USER_SETTINGS.get('CONFIRM_EMAIL_CODE_LIFE_TIME', 6)
+        if GARPIX_USER_SETTINGS.get('CONFIRM_EMAIL_CODE_LIFE_TIME_TYPE', 'days') == 'days':
+            return timedelta(days=life_time)
+        return timedelta(minutes=life_time)
+    return timedelta(minutes=GARPIX_USER_SETTINGS.get('CONFIRM_PHONE_CODE_LIFE_TIME', 6))
+
+
+def make_link_hash(email, code):
+    """
+    Frozen copy of the link hash the confirmation email was sent with, shared with the
+    0022_confirmationchallenge migration. It must not drift from what the migrations have already copied.
+    """
+    return str(hashlib.sha512(f'{email}+{code}'.encode("utf-8")).hexdigest()).lower()
+
+
+def copy_user_confirmation_challenges(app_label, model_name):
+    """
+    Returns a RunPython function that copies pending email/phone codes from the columns that were removed from
+    GarpixUser (email_confirmation_code, email_code_send_date, new_email, phone_confirmation_code,
+    phone_code_send_date, new_phone) of your user model to ConfirmationChallenge. Run it in your user app migration
+    depending on ('garpix_user', '0022_confirmationchallenge'), before the migration that removes the columns.
+    """
+
+    def copy_pending_challenges(apps, schema_editor):
+        User = apps.get_model(app_label, model_name)
+        ConfirmationChallenge = apps.get_model('garpix_user', 'ConfirmationChallenge')
+
+        challenges = []
+        pending = User.objects.filter(Q(email_confirmation_code__isnull=False) | Q(phone_confirmation_code__isnull=False))
+        for user in pending.iterator(chunk_size=2000):
+            if user.email_confirmation_code and user.email_code_send_date:
+                challenges.append(ConfirmationChallenge(
+                    subject_type='user', subject_id=user.pk, channel='email',
+                    code=user.email_confirmation_code,
+                    target=user.new_email or user.email or '',
+                    link_hash=make_link_hash(user.email, user.email_confirmation_code),
+                    sent_at=user.email_code_send_date,
+                    expires_at=user.email_code_send_date + get_challenge_lifetime('email')
+                ))
+            if user.phone_confirmation_code and user.phone_code_send_date:
+                challenges.append(ConfirmationChallenge(
+                    subject_type='user', subject_id=user.pk, channel='phone',
+                    code=user.phone_confirmation_code,
+                    target=str(user.new_phone or user.phone or ''),
+                    sent_at=user.phone_code_send_date,
+                    expires_at=user.phone_code_send_date + get_challenge_lifetime('phone')
+                ))
+            if len(challenges) >= 2000:
+                ConfirmationChallenge.objects.bulk_create(challenges)
+                challenges = []
+        ConfirmationChallenge.objects.bulk_create(challenges)
+
+    return copy_pending_challenges
@@ -0,0 +1,93 @@
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+PERMISSION_VERSION_KEY = 'garpix_user:perm_version'
+USER_PERMISSION_VERSION_KEY = 'garpix_user:perm_version:{pk}'
+USER_PERMISSIONS_KEY = 'garpix_user:perms:{version}:{user_version}:{pk}:{is_superuser}'
+
+
+def is_permission_cache_enabled():
+    return settings.GARPIX_USER.get('USE_PERMISSION_CACHE', False)
+
+
+def _get_permission_cache():
+    return caches[settings.GARPIX_USER.get('PERMISSION_CACHE', 'default')]
+
+
+def _get_versions(cache, pk):
+    """
+    Global version (bumped when group permissions change) and the user version; a missing version gets a new
+    random token, so an evicted version never brings back entries stored under an older one
+    """
+    keys = [PERMISSION_VERSION_KEY, USER_PERMISSION_VERSION_KEY.format(pk=pk)]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, uuid.uuid4().hex[:12], timeout=None)
+            versions[key] = cache.get(key)
+    return versions[keys[0]], versions[keys[1]]
+
+
+def get_cached_permissions(user, load):
+    """
+    Returns {'user': frozenset, 'group': frozenset} of "app_label.codename" permissions of the user.
+    `load(from_name)` computes one set from the database on a cache miss.
+    """
+    cache = _get_permission_cache()
+    version, user_version = _get_versions(cache, user.pk)
+    key = USER_PERMISSIONS_KEY.format(version=version, user_version=user_version, pk=user.pk,
+                                      is_superuser=int(user.is_superuser))
+    permissions = cache.get(key)
+    if permissions is None:
+        permissions = {from_name: frozenset(load(from_name)) for from_name in ('user', 'group')}
+        cache.set(key, permissions, timeout=settings.GARPIX_USER.get('PERMISSION_CACHE_TIMEOUT', 3600))
+    return permissions
+
+
+def _bump(keys):
+    cache = _get_permission_cache()
+    cache.set_many({key: uuid.uuid4().hex[:12] for key in keys}, timeout=None)
+
+
+def invalidate_user_permissions(pks):
+    """
+    Bumps the permission version of the given users once the current transaction commits,
+    so a concurrent miss cannot store the old permissions under the new version
+    """
+    if not is_permission_cache_enabled() or not pks:
+        return
+    keys = [USER_PERMISSION_VERSION_KEY.format(pk=pk) for pk in pks]
+    transaction.on_commit(lambda: _bump(keys))
+
+
+def invalidate_all_permissions():
+    """
+    Bumps the global version, e.g. after group permissions or membership of a deleted group changed
+    """
+    if not is_permission_cache_enabled():
+        return
+    transaction.on_commit(lambda: _bump([PERMISSION_VERSION_KEY]))
+
+
+def invalidate_on_m2m_changed(sender, instance, action, reverse, model, pk_set, **kwargs):
+    from django.contrib.auth import get_user_model
+
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not isinstance(instance, get_user_model()) and model is not get_user_model():
+        # permissions of a group
+        invalidate_all_permissions()
+    elif not reverse:
+        invalidate_user_permissions([instance.pk])
+    elif pk_set:
+        invalidate_user_permissions(pk_set)
+    else:
+        # clear() from the group or permission side does not report the users
+        invalidate_all_permissions()
+
+
+def invalidate_on_delete(sender, **kwargs):
+    invalidate_all_permissions()
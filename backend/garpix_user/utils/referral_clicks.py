@@ -0,0 +1,59 @@
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections, transaction
+
+from garpix_user.utils.batch_sink import BatchSink
+
+
+class ReferralClickSink(BatchSink):
+    """
+    Referral link clicks saved by a background thread with one bulk INSERT and one counter UPDATE per referral type
+    per batch, see BatchSink for the REFERRAL_CLICK_DURABILITY levels
+    """
+
+    settings_prefix = 'REFERRAL_CLICK'
+    thread_name = 'garpix_user_referral_clicks'
+
+    def __init__(self):
+        super().__init__()
+        self.written = 0
+
+    def write_batch(self, batch):
+        from garpix_user.models import ReferralUserLink
+
+        close_old_connections()
+        ReferralUserLink.record_clicks(batch)
+        self.written += len(batch)
+
+    def get_stats(self):
+        return dict(super().get_stats(), written=self.written)
+
+
+referral_click_sink = ReferralClickSink()
+
+
+def record_referral_click(user_session, referral_type_id):
+    """
+    With USE_REFERRAL_CLICK_BUFFER the click is queued and the caller does not wait for the insert.
+    Otherwise the link is inserted right away and only the click counter is queued: the counter row of the day
+    is shared by every click of the referral type, so it is updated once per batch instead of once per redirect.
+    Returns False when the referral type turned out to be deleted.
+    """
+    if settings.GARPIX_USER.get('USE_REFERRAL_CLICK_BUFFER', False):
+        referral_click_sink.put((user_session, referral_type_id))
+        return True
+
+    from garpix_user.models import ReferralUserLink
+
+    link = ReferralUserLink(user=user_session.materialize(), referral_type_id=referral_type_id)
+    try:
+        with transaction.atomic():
+            ReferralUserLink.objects.bulk_create([link], ignore_conflicts=True)
+    except IntegrityError:
+        # the type was deleted by another process while its hash was still cached here
+        return False
+    referral_click_sink.put((None, referral_type_id))
+    return True
+
+
+def get_referral_click_stats():
+    return referral_click_sink.get_stats()
@@ -0,0 +1,162 @@
+import hashlib
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.db import connection
+
+from garpix_user.models import UserIdentifier
+
+
+class BloomFilter:
+    """
+    Bloom filter over str values: `in` answers either "definitely not added" or "possibly added"
+    """
+
+    def __init__(self, capacity, error_rate=0.01):
+        capacity = max(capacity, 1)
+        self.size = max(int(-capacity * math.log(error_rate) / math.log(2) ** 2), 8)
+        self.hash_count = max(int(round(self.size / capacity * math.log(2))), 1)
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, value):
+        digest = hashlib.blake2b(value.encode('utf-8'), digest_size=16).digest()
+        h1, h2 = int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little') | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hash_count))
+
+    def add(self, value):
+        for position in self._positions(value):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, value):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(value))
+
+
+class RegisteredIdentifiers:
+    """
+    Per-process Bloom filters of registered emails and phones, filled from UserIdentifier.
+
+    A changed email or phone is written to UserIdentifier as a new row, so the filters are pulled forward by the
+    UserIdentifier id watermark at most every REGISTRATION_FILTER_REFRESH_INTERVAL seconds (re-reading the last
+    REGISTRATION_FILTER_REFRESH_OVERLAP ids for rows committed out of id order) and fed by post_save of the user model
+    in between. Deleted or replaced identifiers only leave the filters on rebuild, which costs a query but never
+    a wrong answer. Filters are built and rebuilt every REGISTRATION_FILTER_REBUILD_INTERVAL seconds in a background
+    thread; until the first build is done every probe goes to the database.
+    """
+
+    FIELDS = ('email', 'phone')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._filters = None
+        self._last_pk = 0
+        self._built_at = 0
+        self._refreshed_at = 0
+        self._rebuilding = False
+
+    @staticmethod
+    def normalize(field, value):
+        """
+        Brings the value to the form stored in UserIdentifier
+        """
+        return UserIdentifier.normalize(field, value)
+
+    @staticmethod
+    def _values(queryset):
+        return queryset.filter(kind__in=RegisteredIdentifiers.FIELDS).order_by().values_list(
+            'pk', 'kind', 'value').iterator(chunk_size=5000)
+
+    @staticmethod
+    def _add(filters, pk, kind, value):
+        filters[kind].add(value)
+        return pk
+
+    def rebuild(self):
+        error_rate = settings.GARPIX_USER.get('REGISTRATION_FILTER_ERROR_RATE', 0.01)
+
+        # the new filters are filled aside, so probes keep using the old ones until the swap
+        capacity = max(UserIdentifier.objects.filter(kind__in=self.FIELDS).count(), 10000)
+        filters = {field: BloomFilter(capacity, error_rate) for field in self.FIELDS}
+        last_pk = 0
+        for pk, kind, value in self._values(UserIdentifier.objects.all()):
+            last_pk = max(last_pk, self._add(filters, pk, kind, value))
+
+        with self._lock:
+            # identifiers written while the filters were filled
+            for pk, kind, value in self._values(UserIdentifier.objects.filter(pk__gt=self._get_watermark(last_pk))):
+                last_pk = max(last_pk, self._add(filters, pk, kind, value))
+            self._filters, self._last_pk = filters, last_pk
+            self._built_at = self._refreshed_at = time.monotonic()
+
+    def _rebuild_in_background(self):
+        try:
+            self.rebuild()
+        finally:
+            with self._lock:
+                self._rebuilding = False
+            connection.close()
+
+    def schedule_rebuild(self):
+        with self._lock:
+            if self._rebuilding:
+                return
+            self._rebuilding = True
+        threading.Thread(target=self._rebuild_in_background, name='garpix_user_registration_filter',
+                         daemon=True).start()
+
+    def _get_watermark(self, last_pk):
+        return max(last_pk - settings.GARPIX_USER.get('REGISTRATION_FILTER_REFRESH_OVERLAP', 1000), 0)
+
+    def refresh(self):
+        with self._lock:
+            # another thread may have refreshed while this one waited for the lock
+            if time.monotonic() - self._refreshed_at <= settings.GARPIX_USER.get(
+                    'REGISTRATION_FILTER_REFRESH_INTERVAL', 10):
+                return
+            for pk, kind, value in self._values(
+                    UserIdentifier.objects.filter(pk__gt=self._get_watermark(self._last_pk))):
+                self._last_pk = max(self._last_pk, self._add(self._filters, pk, kind, value))
+            self._refreshed_at = time.monotonic()
+
+    def add_user(self, user):
+        if self._filters is None:
+            return
+        with self._lock:
+            for field in self.FIELDS:
+                value = self.normalize(field, getattr(user, field, None))
+                if value:
+                    self._filters[field].add(value)
+
+    def might_exist(self, field, value):
+        now = time.monotonic()
+        if self._filters is None or now - self._built_at > settings.GARPIX_USER.get(
+                'REGISTRATION_FILTER_REBUILD_INTERVAL', 3600):
+            self.schedule_rebuild()
+            if self._filters is None:
+                return True
+        if now - self._refreshed_at > settings.GARPIX_USER.get('REGISTRATION_FILTER_REFRESH_INTERVAL', 10):
+            self.refresh()
+        return self.normalize(field, value) in self._filters[field]
+
+
+registered_identifiers = RegisteredIdentifiers()
+
+
+def is_identifier_registered(field, value, exclude_pk=None):
+    """
+    Checks whether a user with this email/phone exists by the normalized value in UserIdentifier;
+    with USE_REGISTRATION_FILTER a Bloom filter miss skips the query
+    """
+    if settings.GARPIX_USER.get('USE_REGISTRATION_FILTER', False) and not registered_identifiers.might_exist(field, value):
+        return False
+
+    queryset = UserIdentifier.objects.filter(kind=field, value=UserIdentifier.normalize(field, value))
+    if exclude_pk is not None:
+        queryset = queryset.exclude(user_id=exclude_pk)
+    return queryset.exists()
+
+
+def add_registered_user(sender, instance, **kwargs):
+    if settings.GARPIX_USER.get('USE_REGISTRATION_FILTER', False):
+        registered_identifiers.add_user(instance)
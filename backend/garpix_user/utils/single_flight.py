@@ -0,0 +1,94 @@
+import functools
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+
+TASK_LOCK_KEY = 'garpix_user:task_lock:{name}'
+TASK_METRIC_KEY = 'garpix_user:task_metrics:{name}:{metric}'
+TASK_METRICS = ('skipped', 'overrun')
+
+
+def _get_task_cache():
+    return caches[settings.GARPIX_USER.get('TASK_LOCK_CACHE', 'default')]
+
+
+class TaskLock:
+    """
+    Cache lock with a lease: the holder keeps extending the lease from a heartbeat thread,
+    so a crashed worker frees the lock after TASK_LOCK_LEASE seconds at most
+    """
+
+    def __init__(self, name, lease=None):
+        self.key = TASK_LOCK_KEY.format(name=name)
+        self.lease = lease or settings.GARPIX_USER.get('TASK_LOCK_LEASE', 300)
+        self.token = uuid.uuid4().hex
+        self._cache = _get_task_cache()
+        self._stopped = threading.Event()
+        self._heartbeat = None
+
+    def acquire(self):
+        if not self._cache.add(self.key, self.token, timeout=self.lease):
+            return False
+        self._heartbeat = threading.Thread(target=self._beat, daemon=True)
+        self._heartbeat.start()
+        return True
+
+    def _beat(self):
+        while not self._stopped.wait(self.lease / 3):
+            if self._cache.get(self.key) != self.token:
+                return
+            self._cache.touch(self.key, self.lease)
+
+    def release(self):
+        self._stopped.set()
+        if self._heartbeat is not None:
+            self._heartbeat.join()
+        if self._cache.get(self.key) == self.token:
+            self._cache.delete(self.key)
+
+
+def increment_task_metric(name, metric):
+    cache = _get_task_cache()
+    key = TASK_METRIC_KEY.format(name=name, metric=metric)
+    cache.add(key, 0, timeout=None)
+    cache.incr(key)
+
+
+def get_task_metrics(name):
+    cache = _get_task_cache()
+    return {metric: cache.get(TASK_METRIC_KEY.format(name=name, metric=metric), 0) for metric in TASK_METRICS}
+
+
+def single_flight(name=None, lease=None, interval=None, key=None):
+    """
+    Runs the decorated task only if no other run of it holds the lock, on any host.
+    With `key`, a callable taking the task arguments, only runs with the same key exclude each other
+    (chunk tasks: a redelivered chunk is skipped while other chunks run in parallel).
+    Skipped runs are counted in the `skipped` metric, runs longer than `interval` seconds
+    (the beat schedule of the task) in the `overrun` metric.
+    """
+
+    def decorator(func):
+        task_name = name or f'{func.__module__}.{func.__name__}'
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            lock = TaskLock(task_name if key is None else f'{task_name}:{key(*args, **kwargs)}', lease)
+            if not lock.acquire():
+                increment_task_metric(task_name, 'skipped')
+                return None
+
+            started_at = time.monotonic()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                lock.release()
+                if interval is not None and time.monotonic() - started_at > interval:
+                    increment_task_metric(task_name, 'overrun')
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,88 @@
+import functools
+import resource
+import sys
+import threading
+import time
+import tracemalloc
+
+from django.conf import settings
+
+from garpix_user.utils.current_date import set_current_date
+
+_local = threading.local()
+
+
+class TaskRunStats:
+    """
+    Counters of the running task, filled by the task body through `get_task_run_stats().add(...)`
+    """
+
+    def __init__(self):
+        self.rows_scanned = 0
+        self.rows_affected = 0
+        self.batches = 0
+
+    def add(self, rows_scanned=0, rows_affected=0, batches=0):
+        self.rows_scanned += rows_scanned
+        self.rows_affected += rows_affected
+        self.batches += batches
+
+
+def get_task_run_stats():
+    """
+    Stats of the task run in progress in this thread; outside a tracked run the counters are simply discarded
+    """
+    return getattr(_local, 'stats', None) or TaskRunStats()
+
+
+def _get_peak_rss():
+    # ru_maxrss is the lifetime high-water mark of the worker process, in kilobytes on Linux and in bytes on macOS
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak_rss if sys.platform == 'darwin' else peak_rss * 1024
+
+
+def track_task_run(name=None):
+    """
+    Records every run of the decorated task in the TaskRun ledger.
+    With TASK_RUN_TRACEMALLOC the Python allocations peak of the run is traced too (slows the task down noticeably).
+    """
+
+    def decorator(func):
+        task_name = name or f'{func.__module__}.{func.__name__}'
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            from garpix_user.models import TaskRun
+
+            use_tracemalloc = settings.GARPIX_USER.get('TASK_RUN_TRACEMALLOC', False) and not tracemalloc.is_tracing()
+            if use_tracemalloc:
+                tracemalloc.start()
+
+            run = TaskRun(task=task_name, started_at=set_current_date())
+            _local.stats = stats = TaskRunStats()
+            peak_rss = _get_peak_rss()
+            started_at = time.monotonic()
+            try:
+                return func(*args, **kwargs)
+            except Exception as e:
+                run.status = TaskRun.STATUS.FAILED
+                run.error = repr(e)
+                raise
+            finally:
+                _local.stats = None
+                run.duration = time.monotonic() - started_at
+                run.finished_at = set_current_date()
+                run.rows_scanned = stats.rows_scanned
+                run.rows_affected = stats.rows_affected
+                run.batches = stats.batches
+                # how far the run pushed the high-water mark up, 0 if it stayed below the peak of earlier tasks
+                run.peak_rss_growth = _get_peak_rss() - peak_rss
+                if use_tracemalloc:
+                    run.tracemalloc_peak = tracemalloc.get_traced_memory()[1]
+                    tracemalloc.stop()
+                run.save()
+                TaskRun.delete_expired(task_name)
+
+        return wrapper
+
+    return decorator
@@ -1,4 +1,5 @@
 from .registration_view import RegistrationView  # noqa
+from .bulk_registration_view import BulkRegistrationView  # noqa
 from .logout_view import LogoutView, logout_view  # noqa
 from .obtain_auth_token import ObtainAuthToken, obtain_auth_token  # noqa
 from .refresh_token_view import RefreshTokenView, refresh_token_view  # noqa
@@ -8,3 +9,4 @@ from .email_confirmation_view import EmailConfirmationView, EmailConfirmationLin
 from .phone_confirmation_view import PhoneConfirmationView  # noqa
 from .restore_password_view import RestorePasswordView # noqa
 from .change_password_view import ChangePasswordView # noqa
+from .referral_stat_view import ReferralStatView # noqa
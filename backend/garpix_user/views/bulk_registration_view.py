@@ -0,0 +1,117 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils.module_loading import import_string
+from django.utils.translation import gettext_lazy as _
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import extend_schema
+from garpix_utils.string import get_random_string
+from rest_framework import permissions, status
+from rest_framework.generics import GenericAPIView
+from rest_framework.response import Response
+
+from garpix_user.tasks import resend_confirmations
+from garpix_user.utils.bulk_users import bulk_create_users, get_identifiers, get_taken_identifiers
+from garpix_user.utils.get_password_settings import get_password_settings
+
+User = get_user_model()
+BulkRegistrationSerializer = import_string(settings.GARPIX_USER.get(
+    'BULK_REGISTRATION_SERIALIZER', 'garpix_user.serializers.BulkRegistrationSerializer'))
+
+IN_USE_MESSAGES = {
+    'username': _('A user with that username already exists.'),
+    'email': _('This email is already in use'),
+    'phone': _('This phone is already in use'),
+}
+
+
+class BulkRegistrationView(GenericAPIView):
+    """
+    Registers a list of users in one request, for staff users only.
+    Every item is validated separately, the response holds the id or the errors of each item in the request order.
+    """
+    queryset = User.objects.all()
+    serializer_class = BulkRegistrationSerializer
+    permission_classes = (permissions.IsAdminUser,)
+
+    def get_user(self, validated_data):
+        user_data = dict(validated_data)
+        user_data.pop('password')
+
+        if 'username' not in User.USERNAME_FIELDS and 'username' not in user_data.keys():
+            user_data.update({'username': get_random_string(25)})
+
+        if settings.GARPIX_USER.get('USE_PHONE_CONFIRMATION', False):
+            user_data.update({'is_phone_confirmed': False})
+
+        if settings.GARPIX_USER.get('USE_EMAIL_CONFIRMATION', False):
+            user_data.update({'is_email_confirmed': False})
+
+        return User(**user_data)
+
+    @staticmethod
+    def send_confirmations(pks):
+        """
+        The users are created unconfirmed and would be removed by delete_unconfirmed_users, so their confirmation
+        codes are sent by a task once the insert commits
+        """
+        use_confirmation = any(settings.GARPIX_USER.get(name, False)
+                               for name in ('USE_EMAIL_CONFIRMATION', 'USE_PHONE_CONFIRMATION'))
+        if pks and use_confirmation:
+            transaction.on_commit(lambda: resend_confirmations.delay(pks))
+
+    @extend_schema(request=BulkRegistrationSerializer(many=True), responses=OpenApiTypes.OBJECT)
+    def post(self, request, *args, **kwargs):
+        max_items = settings.GARPIX_USER.get('BULK_REGISTRATION_MAX_ITEMS', 1000)
+        if not isinstance(request.data, list):
+            return Response({'non_field_errors': [_('Expected a list of registrations')]},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if len(request.data) > max_items:
+            return Response({'non_field_errors': [_('No more than {max_items} registrations per request').format(
+                max_items=max_items)]}, status=status.HTTP_400_BAD_REQUEST)
+
+        password_settings = get_password_settings()
+        context = dict(self.get_serializer_context(), password_settings=password_settings)
+
+        results, items = [], []
+        for index, data in enumerate(request.data):
+            serializer = self.get_serializer(data=data, context=context)
+            if serializer.is_valid():
+                user = self.get_user(serializer.validated_data)
+                items.append((index, user, serializer.validated_data['password'], get_identifiers(user)))
+            results.append({'index': index, 'errors': serializer.errors})
+
+        # one query per identifier kind for the whole batch, the first item wins inside the batch
+        taken = get_taken_identifiers(set().union(*(identifiers for *_item, identifiers in items)))
+        accepted = []
+        for index, user, password, identifiers in items:
+            duplicates = identifiers & taken
+            if duplicates:
+                results[index]['errors'] = {kind: [IN_USE_MESSAGES[kind]] for kind, _value in duplicates}
+            else:
+                accepted.append((index, user, password))
+            taken |= identifiers
+
+        with ThreadPoolExecutor(max_workers=settings.GARPIX_USER.get(
+                'BULK_REGISTRATION_HASH_WORKERS', os.cpu_count())) as executor:
+            hashes = executor.map(make_password, [password for _index, _user, password in accepted])
+            for (index, user, _password), password_hash in zip(accepted, hashes):
+                user.password = password_hash
+
+        bulk_create_users([user for _index, user, _password in accepted], password_settings)
+        for index, user, _password in accepted:
+            results[index] = {'index': index, 'id': user.pk}
+        self.send_confirmations(sorted(user.pk for _index, user, _password in accepted))
+
+        return Response({
+            'created': len(accepted),
+            'failed': len(results) - len(accepted),
+            'results': results,
+        }, status=status.HTTP_200_OK)
+
+
+bulk_registration_view = BulkRegistrationView.as_view()
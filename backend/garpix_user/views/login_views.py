@@ -8,7 +8,7 @@ from django.views.generic.base import RedirectView
 from django.views.generic import FormView
 from django.http import HttpResponse
 from garpix_utils.logs.enums.get_enums import Action, ActionResult
-from garpix_utils.logs.loggers import ib_logger
+from garpix_user.utils.audit_log import ib_logger
 from garpix_utils.logs.services.logger_iso import LoggerIso
 
 from garpix_user.forms import LoginForm
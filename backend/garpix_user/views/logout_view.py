@@ -1,6 +1,6 @@
 from django.contrib.auth import get_user_model
 from garpix_utils.logs.enums.get_enums import Action, ActionResult
-from garpix_utils.logs.loggers import ib_logger
+from garpix_user.utils.audit_log import ib_logger
 from garpix_utils.logs.services.logger_iso import LoggerIso
 from rest_framework import parsers, renderers
 from garpix_user.models.access_token import AccessToken as Token
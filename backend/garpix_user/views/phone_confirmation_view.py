@@ -47,7 +47,7 @@ class PhoneConfirmationView(viewsets.GenericViewSet):
             return Response({'result': 'success'})
         else:
             if settings.GARPIX_USER.get('USE_PREREGISTRATION_PHONE_CONFIRMATION', False):
-                user = UserSession.get_or_create_user_session(request)
+                user = UserSession.get_or_create_user_session(request).materialize()
                 serializer = self.get_serializer(data=request.data)
                 serializer.is_valid(raise_exception=True)
 
@@ -64,7 +64,7 @@ class PhoneConfirmationView(viewsets.GenericViewSet):
         user = request.user
         if not user.is_authenticated:
             if settings.GARPIX_USER.get('USE_PREREGISTRATION_PHONE_CONFIRMATION', False):
-                user = UserSession.get_or_create_user_session(request)
+                user = UserSession.get_or_create_user_session(request).materialize()
             else:
                 raise NotAuthenticateException().raise_exception(exception_class=NotAuthenticated)
 
@@ -1,19 +1,20 @@
 from django.conf import settings
 from django.views.generic import RedirectView
 
-from garpix_user.models import UserSession, ReferralType, ReferralUserLink
+from garpix_user.models import UserSession, ReferralType
+from garpix_user.utils.referral_clicks import record_referral_click
 
 
 class ReferralLinkView(RedirectView):
 
     def get_redirect_url(self, *args, **kwargs):
-        hash = self.kwargs.get('hash', None)
-        user = UserSession.get_or_create_user_session(self.request)
-        status = 'success'
-        try:
-            referral_instance = ReferralType.objects.get(referral_hash=hash)
-            ReferralUserLink.objects.create(user=user, referral_type=referral_instance)
-        except Exception:
-            status = 'error'
+        referral_hash = self.kwargs.get('hash', None)
+        referral_type_id = ReferralType.get_id_by_hash(referral_hash)
+        status = 'error'
+        if referral_type_id is not None:
+            if record_referral_click(UserSession.get_or_create_user_session(self.request), referral_type_id):
+                status = 'success'
+            else:
+                ReferralType.forget_hash(referral_hash)
 
         return f"{settings.GARPIX_USER.get('REFERRAL_REDIRECT_URL', '/')}?status={status}"
@@ -0,0 +1,36 @@
+from django.utils.dateparse import parse_date
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import OpenApiParameter, extend_schema
+from rest_framework import permissions, viewsets
+from rest_framework.pagination import LimitOffsetPagination
+
+from garpix_user.models import ReferralStat
+from ..serializers import ReferralStatSerializer
+
+
+@extend_schema(
+    parameters=[
+        OpenApiParameter('referral_type', OpenApiTypes.INT, description='Referral type id'),
+        OpenApiParameter('date_from', OpenApiTypes.DATE),
+        OpenApiParameter('date_to', OpenApiTypes.DATE),
+    ]
+)
+class ReferralStatView(viewsets.ReadOnlyModelViewSet):
+    """
+    Daily referral statistics read from the rollup table, for staff users only
+    """
+    serializer_class = ReferralStatSerializer
+    permission_classes = (permissions.IsAdminUser,)
+    pagination_class = LimitOffsetPagination
+
+    def get_queryset(self):
+        queryset = ReferralStat.objects.order_by('-date', 'referral_type_id')
+        params = self.request.query_params
+        if params.get('referral_type', '').isdigit():
+            queryset = queryset.filter(referral_type_id=params['referral_type'])
+        date_from, date_to = parse_date(params.get('date_from', '')), parse_date(params.get('date_to', ''))
+        if date_from:
+            queryset = queryset.filter(date__gte=date_from)
+        if date_to:
+            queryset = queryset.filter(date__lte=date_to)
+        return queryset
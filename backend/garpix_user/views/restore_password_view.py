@@ -1,3 +1,4 @@
+from django.conf import settings
 from drf_spectacular.utils import extend_schema
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
@@ -35,6 +36,8 @@ class RestorePasswordView(viewsets.ViewSet):
         if not user:
             return Response({"non_field_errors": [_("user-session-token not set")]}, status=status.HTTP_400_BAD_REQUEST)
 
+        user = user.materialize()
+
         result, error = user.send_restore_code(username=serializer.validated_data['username'])
 
         if not result:
@@ -53,17 +56,33 @@ class RestorePasswordView(viewsets.ViewSet):
         serializer = self.get_serializer_class()(data=request.data)
         serializer.is_valid(raise_exception=True)
 
-        result, error = user.check_restore_code(username=serializer.validated_data['username'],
-                                                restore_password_confirm_code=serializer.data[
-                                                    'restore_password_confirm_code'])
+        user = user.materialize()
+
+        result, data = user.check_restore_code(username=serializer.validated_data['username'],
+                                               restore_password_confirm_code=serializer.data[
+                                                   'restore_password_confirm_code'])
         if not result:
-            error.raise_exception(exception_class=ValidationError)
+            data.raise_exception(exception_class=ValidationError)
+        if data:
+            return Response({"result": "success", "restore_ticket": data})
         return Response({"result": "success"})
 
     @extend_schema(summary=_('Restore password. Step 3'))
     @action(methods=['POST'], detail=False)
     def set_password(self, request, *args, **kwargs):
 
+        if settings.GARPIX_USER.get('USE_RESTORE_PASSWORD_TICKET', False):
+            serializer = self.get_serializer_class()(data=request.data)
+            serializer.is_valid(raise_exception=True)
+
+            result, error = UserSession.restore_password_by_ticket(
+                restore_ticket=serializer.validated_data['restore_ticket'],
+                new_password=serializer.validated_data['new_password'])
+
+            if not result:
+                error.raise_exception(exception_class=ValidationError)
+            return Response({"result": "success"})
+
         user = UserSession.get_from_request(request)
 
         if not user:
@@ -72,6 +91,8 @@ class RestorePasswordView(viewsets.ViewSet):
         serializer = self.get_serializer_class()(data=request.data)
         serializer.is_valid(raise_exception=True)
 
+        user = user.materialize()
+
         result, error = user.restore_password(new_password=serializer.data['new_password'],
                                               username=serializer.validated_data['username'],
                                               restore_password_confirm_code=serializer.data[
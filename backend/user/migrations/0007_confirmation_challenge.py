@@ -0,0 +1,41 @@
+# Generated by Django 4.2 on 2026-10-19 17:35
+
+from django.db import migrations
+
+from garpix_user.utils.confirmation_migration import copy_user_confirmation_challenges
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0006_user_keycloak_auth_only'),
+        ('garpix_user', '0022_confirmationchallenge'),
+    ]
+
+    operations = [
+        migrations.RunPython(copy_user_confirmation_challenges('user', 'User'), migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='user',
+            name='email_code_send_date',
+        ),
+        migrations.RemoveField(
+            model_name='user',
+            name='email_confirmation_code',
+        ),
+        migrations.RemoveField(
+            model_name='user',
+            name='new_email',
+        ),
+        migrations.RemoveField(
+            model_name='user',
+            name='new_phone',
+        ),
+        migrations.RemoveField(
+            model_name='user',
+            name='phone_code_send_date',
+        ),
+        migrations.RemoveField(
+            model_name='user',
+            name='phone_confirmation_code',
+        ),
+    ]
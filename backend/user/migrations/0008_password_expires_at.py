@@ -0,0 +1,46 @@
+# Generated by Django 4.2 on 2026-10-19 17:49
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def _get_password_validity_period(apps):
+    GARPIX_USER_SETTINGS = getattr(settings, 'GARPIX_USER', {})
+    if GARPIX_USER_SETTINGS.get('ADMIN_PASSWORD_SETTINGS', False):
+        GarpixUserPasswordConfiguration = apps.get_model('garpix_user', 'GarpixUserPasswordConfiguration')
+        config = GarpixUserPasswordConfiguration.objects.first()
+        return config.password_validity_period if config else -1
+    return GARPIX_USER_SETTINGS.get('PASSWORD_VALIDITY_PERIOD', -1)
+
+
+def fill_password_expires_at(apps, schema_editor):
+    User = apps.get_model('user', 'User')
+
+    password_validity_period = _get_password_validity_period(apps)
+    if password_validity_period == -1:
+        return
+    User.objects.update(password_expires_at=models.F('password_updated_date') + timedelta(
+        days=password_validity_period))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0007_confirmation_challenge'),
+        ('garpix_user', '0024_useridentifier'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='password_expires_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Password expires at'),
+        ),
+        migrations.RunPython(fill_password_expires_at, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(condition=models.Q(('is_active', True), ('keycloak_auth_only', False)), fields=['password_expires_at'], name='garpix_user_pwd_exp'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 4.2 on 2026-10-19 17:56
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def fill_deleted_at(apps, schema_editor):
+    User = apps.get_model('user', 'User')
+    # the real deletion date is unknown, so the archive retention starts now
+    User.objects.filter(is_deleted=True).update(deleted_at=timezone.now())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0008_password_expires_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='deleted_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Deleted at'),
+        ),
+        migrations.RunPython(fill_deleted_at, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2 on 2026-10-19 18:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0009_user_deleted_at'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(condition=models.Q(('email_confirmed_date__isnull', False)), fields=['email_confirmed_date'], name='garpix_user_email_conf'),
+        ),
+    ]
@@ -5,6 +5,6 @@ class User(GarpixUser):
 
     USERNAME_FIELDS = ('phone', 'email', 'username')
 
-    class Meta:
+    class Meta(GarpixUser.Meta):
         verbose_name = 'Пользователь'
         verbose_name_plural = 'Пользователи'